@@ -1,5 +1,20 @@
+import re
 import sqlite3
-from typing import List, Optional, Callable
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Callable, Tuple, Union
+
+#Perfiles de PRAGMAs, con los mismos valores que app/repository/perfiles.py. Se copian acá para que
+#este archivo siga sin depender del paquete app (importarlo carga todo el repositorio de nutrición)
+PERFILES: Dict[str, Tuple[Tuple[str, Union[int, str]], ...]] = {
+    'bulk_load': (('page_size', 8192), ('journal_mode', 'WAL'), ('synchronous', 'OFF'),
+                  ('cache_size', -262144), ('temp_store', 'MEMORY'), ('mmap_size', 268435456)),
+    'read_heavy': (('page_size', 4096), ('journal_mode', 'WAL'), ('synchronous', 'NORMAL'),
+                   ('cache_size', -65536), ('temp_store', 'MEMORY'), ('mmap_size', 1073741824)),
+    'low_memory': (('page_size', 4096), ('journal_mode', 'DELETE'), ('synchronous', 'FULL'),
+                   ('cache_size', -2048), ('temp_store', 'FILE'), ('mmap_size', 0)),
+}
+
+
 class Libro:
     def __init__(self, titulo: str, autor: str, anio: int, libro_id: Optional[int] = None):
         self.id = libro_id
@@ -22,12 +37,38 @@ class Libro:
 
 
 class RepositorioLibros:
-    def __init__(self, db_path: str = "libros.db"):
+    def __init__(self, db_path: str = "libros.db", perfil: Optional[str] = None):
+        if perfil is not None and perfil not in PERFILES:
+            raise ValueError(f"Perfil desconocido: {perfil!r} (se espera uno de {', '.join(PERFILES)})")
         # Por defecto sqlite3 abre en modo transactions#
         self.conn = sqlite3.connect(db_path)       #conn es de tipo Connection
         self.conn.row_factory = sqlite3.Row        #configura el cursor para indexar por nombre de columna
+        self.perfil = perfil                       #PRAGMAs de rendimiento, los mismos que NutricionistaRepo
+        for pragma, valor in PERFILES.get(perfil, ()):
+            self.conn.execute(f'PRAGMA {pragma} = {valor}')
+        self._profundidad = 0                      #transacciones anidadas abiertas con _transaccion
         self._create_table()
 
+    @contextmanager
+    def _transaccion(self) -> Iterator[sqlite3.Connection]:
+        """
+        Igual que 'with self.conn:' pero anidable: solo la transacción más externa hace commit
+        o rollback. Así add_libro dentro de ejecutar_transaccion no confirma antes de tiempo.
+        """
+        if self._profundidad:
+            self._profundidad += 1
+            try:
+                yield self.conn
+            finally:
+                self._profundidad -= 1
+            return
+        self._profundidad = 1
+        try:
+            with self.conn:
+                yield self.conn
+        finally:
+            self._profundidad = 0
+
     def _create_table(self):                       #protegido por convención- uso interno
         sql = """
         CREATE TABLE IF NOT EXISTS libros (
@@ -39,12 +80,46 @@ class RepositorioLibros:
         """
         with self.conn:
             self.conn.execute(sql)
+        self._create_fts()
+
+    def _create_fts(self):
+        """
+        Índice de texto completo sobre titulo y autor para no recorrer toda la tabla con LIKE '%x%'.
+        Es de contenido externo (no duplica el texto) y se mantiene al día con triggers.
+        remove_diacritics 2 hace que "Martin" encuentre "Martín".
+        """
+        existe = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'libros_fts';"
+        ).fetchone()
+        if existe:
+            return
+        with self.conn:
+            self.conn.execute("""
+            CREATE VIRTUAL TABLE libros_fts USING fts5(
+                titulo, autor, content='libros', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            );""")
+            self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_libros_insert_fts AFTER INSERT ON libros BEGIN
+                INSERT INTO libros_fts (rowid, titulo, autor) VALUES (NEW.id, NEW.titulo, NEW.autor);
+            END;""")
+            self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_libros_delete_fts AFTER DELETE ON libros BEGIN
+                INSERT INTO libros_fts (libros_fts, rowid, titulo, autor) VALUES ('delete', OLD.id, OLD.titulo, OLD.autor);
+            END;""")
+            self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_libros_update_fts AFTER UPDATE OF titulo, autor ON libros BEGIN
+                INSERT INTO libros_fts (libros_fts, rowid, titulo, autor) VALUES ('delete', OLD.id, OLD.titulo, OLD.autor);
+                INSERT INTO libros_fts (rowid, titulo, autor) VALUES (NEW.id, NEW.titulo, NEW.autor);
+            END;""")
+            #indexa los libros que ya estaban en una base creada antes del índice
+            self.conn.execute("INSERT INTO libros_fts (libros_fts) VALUES ('rebuild');")
 
     def add_libro(self, libro: Libro) -> int:
         """
         Inserta un libro; si falla, se revierte automáticamente.
         """
-        with self.conn:
+        with self._transaccion():
             cursor = self.conn.execute(
                 "INSERT INTO libros (titulo, autor, anio) VALUES (?, ?, ?);",
                 (libro.titulo, libro.autor, libro.anio)
@@ -66,22 +141,41 @@ class RepositorioLibros:
         cursor = self.conn.execute("SELECT * FROM libros;")
         return [Libro.from_row(row) for row in cursor.fetchall()]  #lista por convencion de filas de la tabla libros
 
-    def buscar_por_autor(self, autor: str) -> List[Libro]:
+    def _buscar_fts(self, texto: str, columna: Optional[str], limite: Optional[int]) -> List[Libro]:
+        """
+        Cada palabra se busca como prefijo ("mart fie" encuentra "Martín Fierro"), sin importar
+        acentos ni mayúsculas. Los resultados vienen ordenados por relevancia (bm25).
+        """
+        palabras = re.findall(r"\w+", texto)
+        if not palabras:
+            return []
+        consulta = " ".join(f'"{p}"*' for p in palabras)   #las comillas evitan que OR/NEAR se lean como operadores
+        if columna:
+            consulta = f"{columna} : ({consulta})"
         cursor = self.conn.execute(
-            "SELECT * FROM libros WHERE autor LIKE ?;",
-            (f"%{autor}%",)
+            """
+            SELECT l.* FROM libros_fts
+            JOIN libros l ON l.id = libros_fts.rowid
+            WHERE libros_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?;
+            """,
+            (consulta, limite if limite is not None else -1)
         )
         return [Libro.from_row(row) for row in cursor.fetchall()]
 
-    def buscar_por_titulo(self, titulo: str) -> List[Libro]:
-        cursor = self.conn.execute(
-            "SELECT * FROM libros WHERE titulo LIKE ?;",
-            (f"%{titulo}%",)
-        )
-        return [Libro.from_row(row) for row in cursor.fetchall()]
+    def buscar(self, texto: str, limite: Optional[int] = 20) -> List[Libro]:
+        """Busca en título y autor a la vez."""
+        return self._buscar_fts(texto, None, limite)
+
+    def buscar_por_autor(self, autor: str, limite: Optional[int] = None) -> List[Libro]:
+        return self._buscar_fts(autor, "autor", limite)
+
+    def buscar_por_titulo(self, titulo: str, limite: Optional[int] = None) -> List[Libro]:
+        return self._buscar_fts(titulo, "titulo", limite)
 
     def update_libro(self, libro: Libro) -> bool:
-        with self.conn:
+        with self._transaccion():
             cursor = self.conn.execute(
                 "UPDATE libros SET titulo = ?, autor = ?, anio = ? WHERE id = ?;",
                 (libro.titulo, libro.autor, libro.anio, libro.id)
@@ -89,7 +183,7 @@ class RepositorioLibros:
             return cursor.rowcount > 0         #cantidad de filas afectadas por un UPDATE > 0
 
     def delete_libro(self, libro_id: int) -> bool:
-        with self.conn:
+        with self._transaccion():
             cursor = self.conn.execute(
                 "DELETE FROM libros WHERE id = ?;",
                 (libro_id,)
@@ -103,15 +197,117 @@ class RepositorioLibros:
         si alguna falla se revierteó
         """
         try:
-            with self.conn:
+            with self._transaccion():
                 operaciones(self)
             return True
         except sqlite3.Error as e:
             print("Transacción abortada por error:", e)
             return False
 
+    def unidad_de_trabajo(self) -> "UnidadDeTrabajoLibros":
+        """
+        Devuelve una unidad de trabajo: acumula altas, cambios y bajas y las aplica juntas
+        con executemany en una sola transacción al salir del 'with'.
+        """
+        return UnidadDeTrabajoLibros(self)
+
     def __del__(self):
-        self.conn.close()         #No olvidar cerrar la conexion
+        conn = getattr(self, 'conn', None)   #None si el constructor falló antes de conectar
+        if conn is None:
+            return
+        try:
+            #Estadísticas al día para el planificador; con bulk_load se recalculan todas
+            conn.execute('ANALYZE' if self.perfil == 'bulk_load' else 'PRAGMA optimize')
+        except sqlite3.Error:
+            pass                  #base ocupada o conexión ya cerrada: queda para el próximo cierre
+        conn.close()              #No olvidar cerrar la conexion
+
+class UnidadDeTrabajoLibros:
+    """
+    Uso:
+        with repo.unidad_de_trabajo() as uow:
+            uow.agregar(Libro(...))
+            with uow.grupo("opcionales"):      #si falla solo se revierte este grupo (SAVEPOINT)
+                uow.agregar(Libro(...))
+    Si el bloque 'with' lanza una excepción no se escribe nada.
+    """
+    def __init__(self, repo: RepositorioLibros):
+        self.repo = repo
+        self._grupos: List[Tuple[Optional[str], bool, List[Libro], List[Libro], List[int]]] = []
+        self._nuevo_grupo(None, False)
+        self.errores: List[Tuple[Optional[str], sqlite3.Error]] = []  #(nombre del grupo, error)
+
+    def _nuevo_grupo(self, nombre: Optional[str], savepoint: bool):
+        self._grupos.append((nombre, savepoint, [], [], []))   #(nombre, savepoint, altas, cambios, bajas)
+
+    def agregar(self, libro: Libro) -> Libro:
+        self._grupos[-1][2].append(libro)
+        return libro
+
+    def actualizar(self, libro: Libro) -> Libro:
+        self._grupos[-1][3].append(libro)
+        return libro
+
+    def eliminar(self, libro_id: int):
+        self._grupos[-1][4].append(libro_id)
+
+    @contextmanager
+    def grupo(self, nombre: Optional[str] = None):
+        self._nuevo_grupo(nombre, True)
+        try:
+            yield self
+        finally:
+            self._nuevo_grupo(None, False)
+
+    def _aplicar(self, altas: List[Libro], cambios: List[Libro], bajas: List[int]):
+        conn = self.repo.conn
+        if altas:
+            conn.executemany("INSERT INTO libros (titulo, autor, anio) VALUES (?, ?, ?);",
+                             [(l.titulo, l.autor, l.anio) for l in altas])
+            #dentro de la transacción los ids de AUTOINCREMENT son consecutivos
+            ultimo = conn.execute("SELECT last_insert_rowid();").fetchone()[0]
+            for nuevo_id, libro in enumerate(altas, start=ultimo - len(altas) + 1):
+                libro.id = nuevo_id
+        if cambios:
+            conn.executemany("UPDATE libros SET titulo = ?, autor = ?, anio = ? WHERE id = ?;",
+                             [(l.titulo, l.autor, l.anio, l.id) for l in cambios])
+        if bajas:
+            conn.executemany("DELETE FROM libros WHERE id = ?;", [(i,) for i in bajas])
+
+    def confirmar(self):
+        conn = self.repo.conn
+        try:
+            with self.repo._transaccion():
+                for i, (nombre, savepoint, altas, cambios, bajas) in enumerate(self._grupos):
+                    if not (altas or cambios or bajas):
+                        continue
+                    if not savepoint:
+                        self._aplicar(altas, cambios, bajas)
+                        continue
+                    conn.execute(f"SAVEPOINT uow_libros_{i};")
+                    try:
+                        self._aplicar(altas, cambios, bajas)
+                    except sqlite3.Error as e:
+                        conn.execute(f"ROLLBACK TO uow_libros_{i};")
+                        for libro in altas:
+                            libro.id = None
+                        self.errores.append((nombre, e))
+                    finally:
+                        conn.execute(f"RELEASE uow_libros_{i};")
+        except sqlite3.Error:
+            for _, _, altas, _, _ in self._grupos:   #se revirtió todo: los ids asignados no valen
+                for libro in altas:
+                    libro.id = None
+            raise
+
+    def __enter__(self) -> "UnidadDeTrabajoLibros":
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.confirmar()
+        return False
+
 
 if __name__ == "__main__":
     repo = RepositorioLibros()
@@ -152,4 +348,16 @@ if __name__ == "__main__":
     print(f"\nTransacción con error forzado: {ok_err}")
     print("Después de transacción fallida:", [b.titulo for b in repo.list_libros()])  # lista sin Libro con error
 
+    #Unidad de trabajo: un grupo con error se revierte sin afectar al resto
+    with repo.unidad_de_trabajo() as uow:
+        uow.agregar(Libro("Rayuela", "Julio Cortázar", 1963))
+        with uow.grupo("con error"):
+            uow.agregar(Libro("Libro con error", "Autor", "texto"))  # anio debería ser entero
+    print(f"\nUnidad de trabajo, errores: {[nombre for nombre, _ in uow.errores]}")
+    print("Después de la unidad de trabajo:", [b.titulo for b in repo.list_libros()])
+
+    #Búsqueda de texto completo: sin acentos y por prefijo
+    print("\nBuscar autor 'cortazar':", repo.buscar_por_autor("cortazar"))
+    print("Buscar 'princ':", repo.buscar("princ"))
+
 
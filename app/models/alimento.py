@@ -1,12 +1,21 @@
 from typing import Optional
-from sqlite3 import Row
+from sqlite3 import Row, Cursor
 
 class Alimento:
+    __slots__ = ('id', 'nombre', 'calorias')
+    
+    COLUMNAS = __slots__
+    
     def __init__(self, id: Optional[int] = None, nombre: str = "", calorias: int = 0):
         self.id = id
         self.nombre = nombre
         self.calorias = calorias
     
+    @classmethod
+    def row_factory(cls, cursor: Cursor, row: tuple) -> "Alimento":
+        """Fábrica de filas para instalar en un cursor que selecciona COLUMNAS en orden."""
+        return cls(*row)
+    
     @classmethod
     def from_row(cls, row: Row) -> "Alimento":
         return cls(
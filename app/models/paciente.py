@@ -1,13 +1,24 @@
 from typing import Optional
-from sqlite3 import Row
+from sqlite3 import Row, Cursor
 
 class Paciente:
+    # Sin __dict__ por instancia: los listados grandes crean un objeto chico por fila
+    __slots__ = ('id', 'nombre', 'edad', 'peso_actual')
+    
+    # Orden de columnas que espera row_factory; coincide con el orden de __init__
+    COLUMNAS = __slots__
+    
     def __init__(self, id: Optional[int] = None, nombre: str = "", edad: int = 0, peso_actual: float = 0.0):
         self.id = id
         self.nombre = nombre
         self.edad = edad
         self.peso_actual = peso_actual
     
+    @classmethod
+    def row_factory(cls, cursor: Cursor, row: tuple) -> "Paciente":
+        """Fábrica de filas para instalar en un cursor que selecciona COLUMNAS en orden."""
+        return cls(*row)
+    
     @classmethod
     def from_row(cls, row: Row) -> "Paciente":
         return cls(
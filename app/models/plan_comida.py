@@ -1,7 +1,11 @@
 from typing import Optional
-from sqlite3 import Row
+from sqlite3 import Row, Cursor
 
 class PlanComida:
+    __slots__ = ('id', 'paciente_id', 'alimento_id', 'fecha', 'cantidad')
+    
+    COLUMNAS = __slots__
+    
     def __init__(self, id: Optional[int] = None, paciente_id: int = 0, alimento_id: int = 0, 
                  fecha: str = "", cantidad: float = 0.0):
         self.id = id
@@ -10,6 +14,11 @@ class PlanComida:
         self.fecha = fecha
         self.cantidad = cantidad
     
+    @classmethod
+    def row_factory(cls, cursor: Cursor, row: tuple) -> "PlanComida":
+        """Fábrica de filas para instalar en un cursor que selecciona COLUMNAS en orden."""
+        return cls(*row)
+    
     @classmethod
     def from_row(cls, row: Row) -> "PlanComida":
         return cls(
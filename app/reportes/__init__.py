@@ -0,0 +1,4 @@
+from app.reportes.analitica import AnaliticaPlanes
+from app.reportes.mensual import ResumenPaciente, generar_resumenes, generar_resumenes_mes
+
+__all__ = ['AnaliticaPlanes', 'ResumenPaciente', 'generar_resumenes', 'generar_resumenes_mes']
\ No newline at end of file
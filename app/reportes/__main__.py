@@ -0,0 +1,44 @@
+"""Genera el resumen mensual de calorías y planes de todos los pacientes.
+
+Uso:
+    python -m app.reportes 2024 12 --trabajadores 4 > resumen.csv
+    python -m app.reportes 2024 12 --salida resumen.jsonl
+
+Cada fila es un paciente (también los que no tuvieron planes en el mes). El trabajo se
+reparte por rangos de ids entre varios procesos con conexiones de solo lectura.
+"""
+import argparse
+import sys
+
+from app.reportes.mensual import RANGOS_POR_TRABAJADOR, ResumenPaciente, generar_resumenes_mes
+from app.transferencia.formatos import FORMATOS, EscritorFilas, detectar_formato
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m app.reportes',
+                                     description='Resumen mensual de calorías y planes por paciente.')
+    parser.add_argument('anio', type=int)
+    parser.add_argument('mes', type=int, choices=range(1, 13), metavar='mes')
+    parser.add_argument('--db', nargs='+', default=['database/nutricion.db'],
+                        help='base de datos, o las bases de cada fragmento (por defecto: database/nutricion.db)')
+    parser.add_argument('--trabajadores', type=int, help='procesos en paralelo (por defecto: uno por núcleo)')
+    parser.add_argument('--rangos', type=int, default=RANGOS_POR_TRABAJADOR,
+                        help='rangos de ids por proceso (por defecto: %(default)s)')
+    parser.add_argument('--salida', help='archivo CSV o JSONL (por defecto, CSV por la salida estándar)')
+    parser.add_argument('--formato', choices=FORMATOS)
+    args = parser.parse_args(argv)
+
+    resumenes = generar_resumenes_mes(args.db, args.anio, args.mes, args.trabajadores, args.rangos)
+    columnas = list(ResumenPaciente.__slots__)
+    filas = [tuple(getattr(resumen, columna) for columna in columnas) for resumen in resumenes.values()]
+    if args.salida is None:
+        EscritorFilas(sys.stdout, args.formato or 'csv', columnas).escribir(filas)
+    else:
+        with open(args.salida, 'w', encoding='utf-8', newline='') as archivo:
+            EscritorFilas(archivo, detectar_formato(args.salida, args.formato), columnas).escribir(filas)
+    print(f"{len(filas)} pacientes", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
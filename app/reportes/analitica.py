@@ -0,0 +1,191 @@
+import sqlite3
+from array import array
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usa array.array y bucles en Python
+    np = None
+
+# Días entre el ordinal de datetime.date y la época Unix (1970-01-01)
+_ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+
+SQL_COLUMNAS_PLANES = '''
+    SELECT
+        pc.paciente_id,
+        CAST(julianday(pc.fecha) - 2440587.5 AS INTEGER) AS dia,
+        pc.alimento_id,
+        a.calorias * pc.cantidad AS calorias
+    FROM plan_comidas pc
+    JOIN alimentos a ON pc.alimento_id = a.id
+    WHERE julianday(pc.fecha) IS NOT NULL
+'''
+
+
+@lru_cache(maxsize=4096)
+def dia_a_fecha(dia: int) -> str:
+    """Convierte un número de día (días desde 1970-01-01) a texto YYYY-MM-DD."""
+    return date.fromordinal(int(dia) + _ORDINAL_EPOCA).isoformat()
+
+
+def fecha_a_dia(fecha: str) -> int:
+    return date.fromisoformat(fecha).toordinal() - _ORDINAL_EPOCA
+
+
+class AnaliticaPlanes:
+    """Agregados nutricionales calculados sobre columnas en memoria.
+    
+    Los planes se leen una sola vez en lotes y se guardan por columnas (paciente, día,
+    alimento, calorías). Con NumPy los agrupamientos son operaciones vectorizadas
+    (unique + bincount); sin NumPy se usan las mismas columnas con bucles simples.
+    """
+    
+    __slots__ = ('paciente_id', 'dia', 'alimento_id', 'calorias')
+    
+    def __init__(self, paciente_id, dia, alimento_id, calorias):
+        self.paciente_id = paciente_id
+        self.dia = dia
+        self.alimento_id = alimento_id
+        self.calorias = calorias
+    
+    @classmethod
+    def cargar(cls, conn: sqlite3.Connection, desde: Optional[str] = None, hasta: Optional[str] = None,
+               tamano_lote: int = 50000) -> "AnaliticaPlanes":
+        sql = SQL_COLUMNAS_PLANES
+        parametros: Tuple = ()
+        if desde is not None:
+            sql += ' AND pc.fecha >= ?'
+            parametros += (desde,)
+        if hasta is not None:
+            sql += ' AND pc.fecha <= ?'
+            parametros += (hasta,)
+        
+        pacientes, dias, alimentos, calorias = array('q'), array('q'), array('q'), array('d')
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql, parametros)
+        try:
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                col_pacientes, col_dias, col_alimentos, col_calorias = zip(*filas)
+                pacientes.extend(col_pacientes)
+                dias.extend(col_dias)
+                alimentos.extend(col_alimentos)
+                calorias.extend(col_calorias)
+        finally:
+            cursor.close()
+        
+        if np is not None:
+            # frombuffer no copia: el array de NumPy usa la memoria del array.array
+            return cls(np.frombuffer(pacientes, dtype=np.int64), np.frombuffer(dias, dtype=np.int64),
+                       np.frombuffer(alimentos, dtype=np.int64), np.frombuffer(calorias, dtype=np.float64))
+        return cls(pacientes, dias, alimentos, calorias)
+    
+    def __len__(self) -> int:
+        return len(self.calorias)
+    
+    def _sumar_por_clave(self, claves) -> Dict[int, float]:
+        if np is not None:
+            unicas, inversa = np.unique(claves, return_inverse=True)
+            totales = np.bincount(inversa, weights=self.calorias)
+            return dict(zip(unicas.tolist(), totales.tolist()))
+        totales: Dict[int, float] = {}
+        for clave, calorias in zip(claves, self.calorias):
+            totales[clave] = totales.get(clave, 0.0) + calorias
+        return totales
+    
+    def _claves_paciente_periodo(self, periodos) -> Tuple[Dict[int, float], int]:
+        # Se combina (paciente, período) en un único entero para agrupar por una sola clave
+        if np is not None:
+            base = int(periodos.max()) + 1
+            claves = self.paciente_id * base + periodos
+        else:
+            base = max(periodos) + 1
+            claves = [p * base + d for p, d in zip(self.paciente_id, periodos)]
+        return self._sumar_por_clave(claves), base
+    
+    def calorias_por_paciente_dia(self) -> Dict[Tuple[int, str], float]:
+        """Calorías totales por (paciente_id, fecha)."""
+        if len(self) == 0:
+            return {}
+        if np is not None:
+            minimo = int(self.dia.min())
+            dias = self.dia - minimo
+        else:
+            minimo = min(self.dia)
+            dias = [d - minimo for d in self.dia]
+        totales, base = self._claves_paciente_periodo(dias)
+        return {(clave // base, dia_a_fecha(clave % base + minimo)): total for clave, total in totales.items()}
+    
+    def calorias_por_paciente_semana(self) -> Dict[Tuple[int, str], float]:
+        """Calorías totales por (paciente_id, lunes de la semana)."""
+        if len(self) == 0:
+            return {}
+        # 1970-01-01 fue jueves: sumando 3 las semanas empiezan en lunes
+        if np is not None:
+            semanas = (self.dia + 3) // 7
+            minimo = int(semanas.min())
+            semanas = semanas - minimo
+        else:
+            semanas = [(d + 3) // 7 for d in self.dia]
+            minimo = min(semanas)
+            semanas = [s - minimo for s in semanas]
+        totales, base = self._claves_paciente_periodo(semanas)
+        return {(clave // base, dia_a_fecha((clave % base + minimo) * 7 - 3)): total
+                for clave, total in totales.items()}
+    
+    def top_alimentos(self, n: int = 10) -> List[Tuple[int, float, int]]:
+        """Los n alimentos que más calorías aportan: (alimento_id, calorias_totales, apariciones)."""
+        if len(self) == 0:
+            return []
+        if np is not None:
+            totales = np.bincount(self.alimento_id, weights=self.calorias)
+            apariciones = np.bincount(self.alimento_id)
+            orden = np.argsort(totales)[::-1][:n]
+            return [(int(i), float(totales[i]), int(apariciones[i])) for i in orden if apariciones[i]]
+        acumulado: Dict[int, List] = {}
+        for alimento_id, calorias in zip(self.alimento_id, self.calorias):
+            item = acumulado.setdefault(alimento_id, [0.0, 0])
+            item[0] += calorias
+            item[1] += 1
+        mejores = sorted(acumulado.items(), key=lambda item: item[1][0], reverse=True)[:n]
+        return [(alimento_id, total, cantidad) for alimento_id, (total, cantidad) in mejores]
+    
+    def promedio_movil(self, paciente_id: int, ventana: int = 7) -> List[Tuple[str, float]]:
+        """Promedio móvil de calorías diarias del paciente sobre `ventana` días consecutivos.
+        
+        Los días sin planes cuentan como 0 calorías. Cada valor se asocia al último día de la ventana.
+        """
+        if ventana < 1:
+            raise ValueError("ventana debe ser mayor que cero")
+        if np is not None:
+            mascara = self.paciente_id == paciente_id
+            if not mascara.any():
+                return []
+            dias = self.dia[mascara]
+            primero = int(dias.min())
+            diarias = np.bincount(dias - primero, weights=self.calorias[mascara])
+            if len(diarias) < ventana:
+                return []
+            promedios = np.convolve(diarias, np.ones(ventana) / ventana, mode='valid')
+            return [(dia_a_fecha(primero + ventana - 1 + i), float(valor)) for i, valor in enumerate(promedios)]
+        
+        por_dia: Dict[int, float] = {}
+        for p, d, calorias in zip(self.paciente_id, self.dia, self.calorias):
+            if p == paciente_id:
+                por_dia[d] = por_dia.get(d, 0.0) + calorias
+        if not por_dia:
+            return []
+        primero, ultimo = min(por_dia), max(por_dia)
+        diarias = [por_dia.get(d, 0.0) for d in range(primero, ultimo + 1)]
+        resultado = []
+        suma = sum(diarias[:ventana - 1])
+        for i in range(ventana - 1, len(diarias)):
+            suma += diarias[i]
+            resultado.append((dia_a_fecha(primero + i), suma / ventana))
+            suma -= diarias[i - ventana + 1]
+        return resultado
@@ -0,0 +1,175 @@
+import calendar
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from app.repository.pool import abrir_conexion
+from app.utils import normalizar_fecha
+
+# Rangos de ids en que se divide el trabajo por cada proceso: con más rangos que procesos,
+# uno que termina antes toma otro en lugar de quedarse esperando al más lento
+RANGOS_POR_TRABAJADOR = 4
+
+SQL_RANGO_IDS = 'SELECT MIN(id), MAX(id) FROM pacientes'
+
+SQL_PACIENTES_RANGO = 'SELECT id, nombre FROM pacientes WHERE id BETWEEN ? AND ? ORDER BY id'
+
+# calorias_diarias ya tiene un total por paciente y día. Con MAX() como único agregado de
+# ese tipo, SQLite devuelve en fecha la del día con más calorías.
+SQL_DIAS_RANGO = '''
+    SELECT paciente_id, COUNT(*), SUM(cantidad_items), SUM(total_calorias), MAX(total_calorias), fecha
+    FROM calorias_diarias
+    WHERE paciente_id BETWEEN ? AND ? AND fecha BETWEEN ? AND ?
+    GROUP BY paciente_id
+'''
+
+# planes_paciente_detalle ya trae las calorías de cada plan: se agrupa sin JOIN
+SQL_ALIMENTOS_RANGO = '''
+    SELECT paciente_id, alimento_id, alimento_nombre, SUM(calorias_totales)
+    FROM planes_paciente_detalle
+    WHERE paciente_id BETWEEN ? AND ? AND fecha BETWEEN ? AND ?
+    GROUP BY paciente_id, alimento_id
+'''
+
+
+class ResumenPaciente:
+    """Resumen de calorías y planes de un paciente en un período."""
+
+    __slots__ = ('paciente_id', 'nombre', 'dias_con_planes', 'cantidad_planes', 'calorias_totales',
+                 'promedio_diario', 'fecha_maxima', 'calorias_dia_maximo', 'alimentos_distintos',
+                 'alimento_principal')
+
+    def __init__(self, paciente_id: int, nombre: str, dias_con_planes: int = 0, cantidad_planes: int = 0,
+                 calorias_totales: float = 0.0, fecha_maxima: Optional[str] = None,
+                 calorias_dia_maximo: float = 0.0, alimentos_distintos: int = 0,
+                 alimento_principal: Optional[str] = None):
+        self.paciente_id = paciente_id
+        self.nombre = nombre
+        self.dias_con_planes = dias_con_planes
+        self.cantidad_planes = cantidad_planes
+        self.calorias_totales = calorias_totales
+        # Promedio sobre los días con planes, no sobre los días del período
+        self.promedio_diario = calorias_totales / dias_con_planes if dias_con_planes else 0.0
+        self.fecha_maxima = fecha_maxima
+        self.calorias_dia_maximo = calorias_dia_maximo
+        self.alimentos_distintos = alimentos_distintos
+        self.alimento_principal = alimento_principal
+
+    def como_dict(self) -> Dict:
+        return {columna: getattr(self, columna) for columna in self.__slots__}
+
+    def __repr__(self):
+        return (f"ResumenPaciente(paciente_id={self.paciente_id}, nombre={self.nombre!r}, "
+                f"planes={self.cantidad_planes}, calorias_totales={self.calorias_totales:.1f})")
+
+
+def dividir_rangos(minimo: int, maximo: int, cantidad: int) -> List[Tuple[int, int]]:
+    """Parte [minimo, maximo] en hasta `cantidad` rangos contiguos de ids de igual ancho."""
+    if maximo < minimo:
+        return []
+    cantidad = max(1, min(cantidad, maximo - minimo + 1))
+    ancho, resto = divmod(maximo - minimo + 1, cantidad)
+    rangos = []
+    inicio = minimo
+    for i in range(cantidad):
+        fin = inicio + ancho - 1 + (1 if i < resto else 0)
+        rangos.append((inicio, fin))
+        inicio = fin + 1
+    return rangos
+
+
+def resumir_rango(conn: sqlite3.Connection, desde_id: int, hasta_id: int,
+                  desde: str, hasta: str) -> List[ResumenPaciente]:
+    """Resume a los pacientes con id entre desde_id y hasta_id (inclusive), ordenados por id.
+
+    Los pacientes sin planes en el período aparecen igual, con todo en cero.
+    """
+    dias = {fila[0]: fila[1:] for fila in conn.execute(SQL_DIAS_RANGO, (desde_id, hasta_id, desde, hasta))}
+    alimentos: Dict[int, Tuple[int, str, float]] = {}
+    for paciente_id, _, alimento_nombre, calorias in conn.execute(SQL_ALIMENTOS_RANGO,
+                                                                  (desde_id, hasta_id, desde, hasta)):
+        distintos, principal, maximo = alimentos.get(paciente_id, (0, None, -1.0))
+        if calorias > maximo:
+            principal, maximo = alimento_nombre, calorias
+        alimentos[paciente_id] = (distintos + 1, principal, maximo)
+
+    resumenes = []
+    for paciente_id, nombre in conn.execute(SQL_PACIENTES_RANGO, (desde_id, hasta_id)):
+        distintos, principal, _ = alimentos.get(paciente_id, (0, None, 0.0))
+        if paciente_id in dias:
+            dias_con_planes, planes, total, maximo, fecha_maxima = dias[paciente_id]
+            resumenes.append(ResumenPaciente(paciente_id, nombre, dias_con_planes, planes, total,
+                                             fecha_maxima, maximo, distintos, principal))
+        else:
+            resumenes.append(ResumenPaciente(paciente_id, nombre, alimentos_distintos=distintos,
+                                             alimento_principal=principal))
+    return resumenes
+
+
+# Conexiones de solo lectura de cada proceso del pool, una por base, abiertas la primera
+# vez que el proceso resume un rango de esa base
+_conexiones_trabajador: Dict[str, sqlite3.Connection] = {}
+
+
+def _resumir_en_trabajador(db_path: str, rango: Tuple[int, int], desde: str, hasta: str) -> List[ResumenPaciente]:
+    conn = _conexiones_trabajador.get(db_path)
+    if conn is None:
+        conn = _conexiones_trabajador[db_path] = abrir_conexion(db_path, solo_lectura=True)
+    return resumir_rango(conn, rango[0], rango[1], desde, hasta)
+
+
+def generar_resumenes(db_path: Union[str, Sequence[str]], desde: str, hasta: str,
+                      trabajadores: Optional[int] = None,
+                      rangos_por_trabajador: int = RANGOS_POR_TRABAJADOR) -> Dict[int, ResumenPaciente]:
+    """Resumen de cada paciente entre desde y hasta (inclusive), como dict id -> ResumenPaciente.
+
+    El espacio de ids se parte en rangos que se resumen en paralelo en `trabajadores`
+    procesos (por defecto, uno por núcleo), cada uno con su propia conexión de solo lectura.
+    Los resultados parciales se juntan en orden de id. Con trabajadores=1 todo corre en el
+    proceso actual, sin pool.
+
+    db_path puede ser una lista de bases, como las rutas de un NutricionistaRepoFragmentado:
+    los rangos de todas se reparten entre los mismos procesos y el resultado sale en el
+    orden de la lista.
+    """
+    desde_canonica = normalizar_fecha(desde)
+    hasta_canonica = normalizar_fecha(hasta)
+    if desde_canonica is None or hasta_canonica is None:
+        raise ValueError(f"Rango de fechas inválido: {desde!r} - {hasta!r}")
+    if trabajadores is None:
+        trabajadores = os.cpu_count() or 1
+    if trabajadores < 1:
+        raise ValueError("trabajadores debe ser mayor que cero")
+
+    rutas = [db_path] if isinstance(db_path, str) else list(db_path)
+    partes: List[List[ResumenPaciente]] = []
+    tareas: List[Tuple[str, Tuple[int, int]]] = []
+    for ruta in rutas:
+        conn = abrir_conexion(ruta, solo_lectura=True)
+        try:
+            minimo, maximo = conn.execute(SQL_RANGO_IDS).fetchone()
+            if minimo is None:
+                continue
+            if trabajadores == 1:
+                partes.append(resumir_rango(conn, minimo, maximo, desde_canonica, hasta_canonica))
+            else:
+                # Los rangos por proceso se reparten entre las bases
+                cantidad = -(-trabajadores * rangos_por_trabajador // len(rutas))
+                tareas.extend((ruta, rango) for rango in dividir_rangos(minimo, maximo, cantidad))
+        finally:
+            conn.close()
+    if tareas:
+        with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+            # map devuelve los resultados en el orden de las tareas, que ya están ordenadas por id
+            partes = list(pool.map(_resumir_en_trabajador, *zip(*tareas),
+                                   [desde_canonica] * len(tareas), [hasta_canonica] * len(tareas)))
+    return {resumen.paciente_id: resumen for parte in partes for resumen in parte}
+
+
+def generar_resumenes_mes(db_path: Union[str, Sequence[str]], anio: int, mes: int, trabajadores: Optional[int] = None,
+                          rangos_por_trabajador: int = RANGOS_POR_TRABAJADOR) -> Dict[int, ResumenPaciente]:
+    """generar_resumenes para un mes calendario completo."""
+    ultimo_dia = calendar.monthrange(anio, mes)[1]
+    return generar_resumenes(db_path, f"{anio:04d}-{mes:02d}-01", f"{anio:04d}-{mes:02d}-{ultimo_dia:02d}",
+                             trabajadores, rangos_por_trabajador)
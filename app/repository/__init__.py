@@ -1,3 +1,15 @@
 from app.repository.nutricionista_repo import NutricionistaRepo
 
-__all__ = ['NutricionistaRepo']
\ No newline at end of file
+__all__ = ['NutricionistaRepo', 'NutricionistaRepoFragmentado', 'AsyncNutricionistaRepo']
+
+
+def __getattr__(nombre):
+    # async_repo importa asyncio, que pesa en el arranque de los procesos que no lo usan
+    if nombre == 'AsyncNutricionistaRepo':
+        from app.repository.async_repo import AsyncNutricionistaRepo
+        return AsyncNutricionistaRepo
+    # Lo mismo con fragmentado, que solo necesitan quienes reparten los datos en varias bases
+    if nombre == 'NutricionistaRepoFragmentado':
+        from app.repository.fragmentado import NutricionistaRepoFragmentado
+        return NutricionistaRepoFragmentado
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
\ No newline at end of file
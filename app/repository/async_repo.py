@@ -0,0 +1,153 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from app.models import Paciente, Alimento
+from app.repository import respaldo
+from app.repository.nutricionista_repo import NutricionistaRepo, TAMANO_LECTURA_POR_DEFECTO
+from app.repository.pool import abrir_conexion
+from app.repository.respaldo import PAGINAS_POR_PASO_POR_DEFECTO, PAUSA_POR_DEFECTO
+
+
+def _delegar(nombre: str) -> Callable:
+    """Crea una corrutina que ejecuta el método homónimo de NutricionistaRepo en el executor."""
+    async def metodo(self: "AsyncNutricionistaRepo", *args, **kwargs) -> Any:
+        return await self._ejecutar(getattr(self._repo, nombre), *args, **kwargs)
+    metodo.__name__ = nombre
+    metodo.__qualname__ = f"AsyncNutricionistaRepo.{nombre}"
+    metodo.__doc__ = getattr(NutricionistaRepo, nombre).__doc__
+    return metodo
+
+
+def _respaldar_con_conexion_propia(db_path: str, destino: str, paginas_por_paso: int, pausa: float,
+                                   progreso: Optional[Callable[[int, int], None]]) -> Dict[str, float]:
+    origen = abrir_conexion(db_path, solo_lectura=True)
+    try:
+        return respaldo.respaldar(origen, destino, paginas_por_paso, pausa, progreso)
+    finally:
+        origen.close()
+
+
+class AsyncNutricionistaRepo:
+    """Fachada asyncio de NutricionistaRepo.
+    
+    Todas las llamadas a SQLite corren en un executor propio cuyos hilos son los únicos
+    que tocan las conexiones, así el event loop nunca se bloquea esperando al disco.
+    Con hilos=1 se usa una sola conexión; con más hilos se usa el pool en modo WAL
+    para que las lecturas corran en paralelo con las escrituras.
+    """
+    
+    def __init__(self, db_path: str = "database/nutricion.db", hilos: int = 1, timeout: float = 5.0,
+                 tamano_cache: Optional[int] = None, ttl_cache: Optional[float] = None,
+                 solo_lectura: bool = False, perfil: Optional[str] = None):
+        if hilos < 1:
+            raise ValueError("hilos debe ser mayor que cero")
+        self._executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="nutricion-db")
+        tamano_pool = hilos if hilos > 1 else None
+        # El repositorio se crea dentro del executor para que la conexión pertenezca a su hilo
+        self._repo: NutricionistaRepo = self._executor.submit(
+            NutricionistaRepo, db_path, tamano_pool, timeout, tamano_cache, ttl_cache, solo_lectura,
+            perfil
+        ).result()
+    
+    async def _ejecutar(self, funcion: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(funcion, *args, **kwargs))
+    
+    async def close(self) -> None:
+        await self._ejecutar(self._repo.close)
+        self._executor.shutdown(wait=True)
+    
+    async def __aenter__(self) -> "AsyncNutricionistaRepo":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    # --- Métodos para Pacientes ---
+    crear_paciente = _delegar('crear_paciente')
+    crear_pacientes_bulk = _delegar('crear_pacientes_bulk')
+    obtener_paciente = _delegar('obtener_paciente')
+    obtener_pacientes = _delegar('obtener_pacientes')
+    listar_pacientes = _delegar('listar_pacientes')
+    buscar_pacientes = _delegar('buscar_pacientes')
+    actualizar_paciente = _delegar('actualizar_paciente')
+    eliminar_paciente = _delegar('eliminar_paciente')
+    actualizar_peso_paciente = _delegar('actualizar_peso_paciente')
+    
+    # --- Métodos para Alimentos ---
+    crear_alimento = _delegar('crear_alimento')
+    crear_alimentos_bulk = _delegar('crear_alimentos_bulk')
+    obtener_alimento = _delegar('obtener_alimento')
+    obtener_alimentos = _delegar('obtener_alimentos')
+    listar_alimentos = _delegar('listar_alimentos')
+    buscar_alimentos = _delegar('buscar_alimentos')
+    actualizar_alimento = _delegar('actualizar_alimento')
+    eliminar_alimento = _delegar('eliminar_alimento')
+    
+    # --- Metodos para Planes de Comida ---
+    crear_plan_comida = _delegar('crear_plan_comida')
+    crear_planes_comida_bulk = _delegar('crear_planes_comida_bulk')
+    obtener_plan_comida = _delegar('obtener_plan_comida')
+    obtener_planes_comida = _delegar('obtener_planes_comida')
+    listar_planes_paciente = _delegar('listar_planes_paciente')
+    planes_por_paciente_y_rango = _delegar('planes_por_paciente_y_rango')
+    plan_del_paciente = _delegar('plan_del_paciente')
+    planes_con_detalle = _delegar('planes_con_detalle')
+    calorias_por_dia = _delegar('calorias_por_dia')
+    listar_planes_comida = _delegar('listar_planes_comida')
+    actualizar_plan_comida = _delegar('actualizar_plan_comida')
+    eliminar_plan_comida = _delegar('eliminar_plan_comida')
+    
+    crear_todo_nuevo = _delegar('crear_todo_nuevo')
+    
+    async def respaldar(self, destino: str, paginas_por_paso: int = PAGINAS_POR_PASO_POR_DEFECTO,
+                        pausa: float = PAUSA_POR_DEFECTO,
+                        progreso: Optional[Callable[[int, int], None]] = None) -> Dict[str, float]:
+        """Copia la base a destino como NutricionistaRepo.respaldar, en un hilo aparte.
+        
+        No corre en el executor: con hilos=1 el respaldo ocuparía el único hilo y todas las
+        demás llamadas esperarían a que termine. Con hilos>1 se copia desde la conexión de
+        escritura del pool. Con hilos=1 la conexión del repositorio pertenece al hilo del
+        executor, así que se copia desde una conexión propia de solo lectura: si el
+        repositorio escribe mientras tanto, SQLite empieza la copia de nuevo (con
+        escrituras constantes conviene usar hilos>1).
+        """
+        if self._repo.pool is not None:
+            copiar = functools.partial(self._repo.respaldar, destino, paginas_por_paso, pausa, progreso)
+        elif self._repo.db_path == ':memory:':
+            # Otra conexión no vería esta base: se copia desde el executor como antes
+            return await self._ejecutar(self._repo.respaldar, destino, paginas_por_paso, pausa, progreso)
+        else:
+            copiar = functools.partial(_respaldar_con_conexion_propia, self._repo.db_path, destino,
+                                       paginas_por_paso, pausa, progreso)
+        return await asyncio.to_thread(copiar)
+    
+    def estadisticas_cache(self) -> Dict[str, Dict[str, int]]:
+        # Los contadores viven en memoria, no hace falta pasar por el executor
+        return self._repo.estadisticas_cache()
+    
+    # --- Iteración asíncrona ---
+    # Se recorre por páginas con paginación por clave en lugar de mantener un cursor abierto:
+    # cada página es una llamada independiente y puede correr en cualquier hilo del executor.
+    
+    async def _iterar_paginas(self, listar: Callable, obtener_id: Callable[[Any], int],
+                              tamano_lectura: int) -> AsyncIterator[Any]:
+        ultimo_id = 0
+        while True:
+            pagina = await self._ejecutar(listar, despues_de_id=ultimo_id, limite=tamano_lectura)
+            for fila in pagina:
+                yield fila
+            if len(pagina) < tamano_lectura:
+                break
+            ultimo_id = obtener_id(pagina[-1])
+    
+    def iter_pacientes(self, tamano_lectura: int = TAMANO_LECTURA_POR_DEFECTO) -> AsyncIterator[Paciente]:
+        return self._iterar_paginas(self._repo.listar_pacientes, lambda p: p.id, tamano_lectura)
+    
+    def iter_alimentos(self, tamano_lectura: int = TAMANO_LECTURA_POR_DEFECTO) -> AsyncIterator[Alimento]:
+        return self._iterar_paginas(self._repo.listar_alimentos, lambda a: a.id, tamano_lectura)
+    
+    def iter_planes_comida(self, tamano_lectura: int = TAMANO_LECTURA_POR_DEFECTO) -> AsyncIterator[Dict]:
+        return self._iterar_paginas(self._repo.listar_planes_comida, lambda pc: pc['id'], tamano_lectura)
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class CacheLRU:
+    """Cache acotado que desaloja la entrada usada menos recientemente, con TTL opcional.
+    
+    Es seguro para usar desde varios hilos y cuenta aciertos, fallos y desalojos
+    para poder monitorearlo.
+    
+    Para leer de la base y guardar sin pisar una invalidación que ocurra en el medio, se
+    toma generacion() antes de la lectura y se pasa a guardar: si hubo alguna invalidación
+    desde entonces el valor puede estar viejo y no se guarda.
+    """
+    
+    def __init__(self, tamano_maximo: int, ttl: Optional[float] = None):
+        if tamano_maximo < 1:
+            raise ValueError("tamano_maximo debe ser mayor que cero")
+        self.tamano_maximo = tamano_maximo
+        self.ttl = ttl
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+    
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            valor, vence = entrada
+            if vence is not None and vence < time.monotonic():
+                del self._datos[clave]
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+    
+    def generacion(self) -> int:
+        """Cantidad de invalidaciones hasta ahora; cambia con cada invalidar o limpiar."""
+        with self._lock:
+            return self._generacion
+    
+    def guardar(self, clave: Hashable, valor: Any, generacion: Optional[int] = None) -> None:
+        vence = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if generacion is not None and generacion != self._generacion:
+                return
+            self._datos[clave] = (valor, vence)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.tamano_maximo:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+    
+    def invalidar(self, clave: Hashable) -> None:
+        with self._lock:
+            self._generacion += 1
+            self._datos.pop(clave, None)
+    
+    def limpiar(self) -> None:
+        with self._lock:
+            self._generacion += 1
+            self._datos.clear()
+    
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entradas': len(self._datos),
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'desalojos': self.desalojos,
+            }
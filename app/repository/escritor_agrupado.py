@@ -0,0 +1,234 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+from app.models import Paciente, Alimento, PlanComida
+from app.utils import fecha_canonica
+from app.repository.perfiles import aplicar_perfil
+from app.repository.pool import abrir_conexion
+from app.repository.sentencias import (
+    SQL_ACTUALIZAR_ALIMENTO, SQL_ACTUALIZAR_PACIENTE, SQL_ACTUALIZAR_PESO_PACIENTE, SQL_ACTUALIZAR_PLAN,
+    SQL_ELIMINAR_ALIMENTO, SQL_ELIMINAR_PACIENTE, SQL_ELIMINAR_PLAN, SQL_INSERTAR_ALIMENTO,
+    SQL_INSERTAR_PACIENTE, SQL_INSERTAR_PLAN
+)
+
+if TYPE_CHECKING:
+    from app.repository.nutricionista_repo import NutricionistaRepo
+
+# Operaciones que se confirman juntas como máximo
+MAX_LOTE_POR_DEFECTO = 500
+
+# Segundos que se espera a que lleguen más operaciones después de la primera del lote. Las
+# que llegan mientras se confirma el lote anterior ya se juntan solas, así que alcanza con
+# una ventana corta: más larga solo suma latencia cuando el fsync es rápido
+VENTANA_POR_DEFECTO = 0.0002
+
+_FIN = object()
+
+
+class _Operacion:
+    __slots__ = ('sql', 'parametros', 'insercion', 'invalidar', 'futuro')
+
+    def __init__(self, sql: str, parametros: tuple, insercion: bool,
+                 invalidar: Callable[["NutricionistaRepo"], None]):
+        self.sql = sql
+        self.parametros = parametros
+        self.insercion = insercion
+        self.invalidar = invalidar
+        self.futuro: Future = Future()
+
+
+class EscritorAgrupado:
+    """Escritor en segundo plano que junta escrituras sueltas en una sola transacción.
+
+    Cada método encola la operación y devuelve enseguida un Future; un hilo propio toma las
+    operaciones pendientes (hasta max_lote, esperando como mucho ventana segundos desde la
+    primera) y las confirma con un único COMMIT, así el costo del fsync se reparte entre
+    todas. Cuando el lote se confirma, cada Future recibe el lastrowid (altas) o el
+    rowcount (cambios y bajas). Si una operación falla, solo su Future recibe la excepción:
+    SQLite deshace esa sentencia y el resto del lote sigue.
+
+    Se puede usar desde varios hilos y, con asyncio.wrap_future, desde corrutinas:
+
+        with repo.escritor_agrupado() as escritor:
+            plan_id = escritor.crear_plan_comida(plan).result()
+
+    El hilo usa su propia conexión a la base, con el mismo perfil que el repositorio.
+    """
+
+    def __init__(self, repo: "NutricionistaRepo", max_lote: int = MAX_LOTE_POR_DEFECTO,
+                 ventana: float = VENTANA_POR_DEFECTO):
+        if max_lote < 1:
+            raise ValueError("max_lote debe ser mayor que cero")
+        if ventana < 0:
+            raise ValueError("ventana no puede ser negativa")
+        self._repo = repo
+        self.max_lote = max_lote
+        self.ventana = ventana
+        self.transacciones = 0
+        self.operaciones = 0
+        self._pendientes: "queue.Queue" = queue.Queue()
+        self._cerrado = False
+        self._lock = threading.Lock()
+        self._listo = threading.Event()
+        self._error_inicio: Optional[BaseException] = None
+        self._hilo = threading.Thread(target=self._trabajar, name="nutricion-escritor", daemon=True)
+        self._hilo.start()
+        # Los errores al abrir la conexión se informan acá y no en el primer Future
+        self._listo.wait()
+        if self._error_inicio is not None:
+            raise self._error_inicio
+
+    # --- Operaciones ---
+
+    def crear_paciente(self, paciente: Paciente) -> Future:
+        return self._encolar(SQL_INSERTAR_PACIENTE, (paciente.nombre, paciente.edad, paciente.peso_actual),
+                             True, lambda repo: repo._invalidar_plan_del_paciente())
+
+    def actualizar_paciente(self, paciente: Paciente) -> Future:
+        return self._encolar(SQL_ACTUALIZAR_PACIENTE,
+                             (paciente.nombre, paciente.edad, paciente.peso_actual, paciente.id),
+                             False, lambda repo: repo._invalidar(Paciente, paciente.id))
+
+    def actualizar_peso_paciente(self, paciente_id: int, nuevo_peso: float) -> Future:
+        return self._encolar(SQL_ACTUALIZAR_PESO_PACIENTE, (nuevo_peso, paciente_id),
+                             False, lambda repo: repo._invalidar(Paciente, paciente_id))
+
+    def eliminar_paciente(self, paciente_id: int) -> Future:
+        return self._encolar(SQL_ELIMINAR_PACIENTE, (paciente_id,), False,
+                             lambda repo: _invalidar_todo(repo, Paciente, paciente_id))
+
+    def crear_alimento(self, alimento: Alimento) -> Future:
+        return self._encolar(SQL_INSERTAR_ALIMENTO, (alimento.nombre, alimento.calorias),
+                             True, lambda repo: repo._invalidar_plan_del_paciente())
+
+    def actualizar_alimento(self, alimento: Alimento) -> Future:
+        return self._encolar(SQL_ACTUALIZAR_ALIMENTO, (alimento.nombre, alimento.calorias, alimento.id),
+                             False, lambda repo: _invalidar_todo(repo, Alimento, alimento.id))
+
+    def eliminar_alimento(self, alimento_id: int) -> Future:
+        return self._encolar(SQL_ELIMINAR_ALIMENTO, (alimento_id,), False,
+                             lambda repo: _invalidar_todo(repo, Alimento, alimento_id))
+
+    def crear_plan_comida(self, plan: PlanComida) -> Future:
+        fecha = fecha_canonica(plan.fecha)
+        return self._encolar(SQL_INSERTAR_PLAN, (plan.paciente_id, plan.alimento_id, fecha, plan.cantidad),
+                             True, lambda repo: repo._invalidar_plan_del_paciente(plan.paciente_id, fecha))
+
+    def actualizar_plan_comida(self, plan: PlanComida) -> Future:
+        return self._encolar(SQL_ACTUALIZAR_PLAN,
+                             (plan.paciente_id, plan.alimento_id, fecha_canonica(plan.fecha), plan.cantidad, plan.id),
+                             False, lambda repo: _invalidar_todo(repo, PlanComida, plan.id))
+
+    def eliminar_plan_comida(self, plan_id: int) -> Future:
+        return self._encolar(SQL_ELIMINAR_PLAN, (plan_id,), False,
+                             lambda repo: _invalidar_todo(repo, PlanComida, plan_id))
+
+    def _encolar(self, sql: str, parametros: tuple, insercion: bool,
+                 invalidar: Callable[["NutricionistaRepo"], None]) -> Future:
+        operacion = _Operacion(sql, parametros, insercion, invalidar)
+        with self._lock:
+            if self._cerrado:
+                raise RuntimeError("El escritor agrupado ya está cerrado")
+            self._pendientes.put(operacion)
+        return operacion.futuro
+
+    # --- Cierre ---
+
+    def cerrar(self) -> None:
+        """Confirma lo que quedó encolado y termina el hilo; se puede llamar más de una vez."""
+        with self._lock:
+            if self._cerrado:
+                return
+            self._cerrado = True
+            self._pendientes.put(_FIN)
+        self._hilo.join()
+
+    def __enter__(self) -> "EscritorAgrupado":
+        return self
+
+    def __exit__(self, tipo, valor, traza) -> None:
+        self.cerrar()
+
+    # --- Hilo escritor ---
+
+    def _trabajar(self) -> None:
+        repo = self._repo
+        try:
+            # isolation_level=None: las transacciones las abre y cierra el hilo con BEGIN/COMMIT
+            conn = abrir_conexion(repo.db_path, repo.solo_lectura, timeout=repo.timeout, isolation_level=None)
+            aplicar_perfil(conn, repo.perfil, cambiar_archivo=False)
+        except BaseException as e:
+            self._error_inicio = e
+            self._listo.set()
+            return
+        self._listo.set()
+        try:
+            terminar = False
+            while not terminar:
+                lote, terminar = self._tomar_lote()
+                if lote:
+                    self._confirmar(conn, lote)
+        finally:
+            conn.close()
+
+    def _tomar_lote(self) -> Tuple[List[_Operacion], bool]:
+        """Espera la primera operación y junta las que lleguen dentro de la ventana."""
+        primera = self._pendientes.get()
+        if primera is _FIN:
+            return [], True
+        lote = [primera]
+        limite = time.monotonic() + self.ventana
+        while len(lote) < self.max_lote:
+            restante = limite - time.monotonic()
+            try:
+                siguiente = self._pendientes.get(timeout=restante) if restante > 0 else self._pendientes.get_nowait()
+            except queue.Empty:
+                break
+            if siguiente is _FIN:
+                return self._descartar_cancelados(lote), True
+            lote.append(siguiente)
+        return self._descartar_cancelados(lote), False
+
+    @staticmethod
+    def _descartar_cancelados(lote: List[_Operacion]) -> List[_Operacion]:
+        return [operacion for operacion in lote if operacion.futuro.set_running_or_notify_cancel()]
+
+    def _confirmar(self, conn: sqlite3.Connection, lote: List[_Operacion]) -> None:
+        resultados: List[Tuple[_Operacion, object, Optional[BaseException]]] = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for operacion in lote:
+                try:
+                    cursor = conn.execute(operacion.sql, operacion.parametros)
+                except sqlite3.Error as e:
+                    if not conn.in_transaction:
+                        # El error deshizo toda la transacción, no solo la sentencia
+                        raise
+                    resultados.append((operacion, None, e))
+                    continue
+                resultados.append((operacion, cursor.lastrowid if operacion.insercion else cursor.rowcount, None))
+            conn.execute('COMMIT')
+        except BaseException as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            for operacion in lote:
+                operacion.futuro.set_exception(e)
+            return
+
+        self.transacciones += 1
+        self.operaciones += len(lote)
+        for operacion, resultado, error in resultados:
+            if error is not None:
+                operacion.futuro.set_exception(error)
+                continue
+            operacion.invalidar(self._repo)
+            operacion.futuro.set_result(resultado)
+
+
+def _invalidar_todo(repo: "NutricionistaRepo", modelo: type, entidad_id: int) -> None:
+    repo._invalidar(modelo, entidad_id)
+    repo._invalidar_plan_del_paciente()
@@ -0,0 +1,386 @@
+import itertools
+import zlib
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.models import Paciente, Alimento, PlanComida
+from app.utils import fecha_canonica
+from app.repository.nutricionista_repo import (
+    LIMITE_BUSQUEDA_POR_DEFECTO, TAMANO_LECTURA_POR_DEFECTO, TAMANO_LOTE_POR_DEFECTO, NutricionistaRepo,
+    consulta_fts
+)
+from app.repository.sentencias import (
+    SQL_ACTUALIZAR_SECUENCIA, SQL_BUSCAR_PACIENTES_PUNTAJE, SQL_CATALOGO_ALIMENTOS, SQL_ELIMINAR_ALIMENTO,
+    SQL_INSERTAR_SECUENCIA, SQL_RANGO_IDS_PACIENTES, SQL_RANGO_IDS_PLANES, SQL_REPLICAR_ALIMENTO,
+    SQL_SECUENCIAS
+)
+
+# Ids que reserva cada fragmento: el fragmento k usa de k * ANCHO_RANGO_IDS + 1 a
+# (k + 1) * ANCHO_RANGO_IDS para pacientes y planes. El id alcanza para saber en qué base
+# está una fila (sin tabla de ubicaciones) y ordenar por id es recorrer un fragmento tras otro.
+ANCHO_RANGO_IDS = 1 << 40
+
+
+def fragmento_de_id(entidad_id: int) -> int:
+    """Número de fragmento al que pertenece el id de un paciente o de un plan."""
+    return (entidad_id - 1) // ANCHO_RANGO_IDS
+
+
+def _paciente_con_puntaje(cursor, row: tuple) -> Tuple[float, Paciente]:
+    return row[-1], Paciente.row_factory(cursor, row[:-1])
+
+
+class NutricionistaRepoFragmentado:
+    """NutricionistaRepo repartido en varias bases SQLite, una por fragmento.
+
+    Los pacientes se reparten entre los fragmentos y sus planes viven en la misma base que
+    el paciente, así cada base tiene su propio escritor y las escrituras de fragmentos
+    distintos no se esperan entre sí. El catálogo de alimentos se copia en todas las bases
+    con los mismos ids (lo usan los triggers de calorías): se lee del fragmento 0 y cada
+    cambio se aplica en todas.
+
+    Un paciente nuevo va al fragmento que indica clave_fragmento(paciente) (por ejemplo, la
+    clínica), pasada por un hash estable; sin clave se reparten por turnos. Después, sus
+    operaciones se dirigen por id: cada fragmento reserva un rango de ANCHO_RANGO_IDS ids.
+    Agregar un fragmento al final no mueve a nadie, y una base existente puede ser el
+    fragmento 0 tal como está.
+
+    Los métodos son los de NutricionistaRepo. Los listados y búsquedas consultan cada
+    fragmento y mezclan los resultados; una escritura que toca varias bases (el catálogo,
+    los bulk) va en una transacción por base, no en una sola. Para unidades de trabajo,
+    escritor agrupado o respaldos se usa el NutricionistaRepo del fragmento
+    (fragmento_de_paciente o fragmentos). Las opciones se pasan a cada NutricionistaRepo;
+    con tamano_pool se puede escribir desde varios hilos a la vez.
+    """
+
+    def __init__(self, rutas: Sequence[str], clave_fragmento: Optional[Callable[[Paciente], Hashable]] = None,
+                 **opciones):
+        if not rutas:
+            raise ValueError("Hace falta al menos una base")
+        if len(rutas) > (1 << 63) // ANCHO_RANGO_IDS:
+            raise ValueError("Demasiados fragmentos para el rango de ids de SQLite")
+        self.rutas = list(rutas)
+        self.clave_fragmento = clave_fragmento
+        self.solo_lectura = opciones.get('solo_lectura', False)
+        self.fragmentos: List[NutricionistaRepo] = []
+        self._turno = itertools.count()
+        try:
+            for numero, ruta in enumerate(self.rutas):
+                repo = NutricionistaRepo(ruta, **opciones)
+                self.fragmentos.append(repo)
+                self._preparar_fragmento(numero)
+            if not self.solo_lectura:
+                self.sincronizar_catalogo()
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def catalogo(self) -> NutricionistaRepo:
+        """Fragmento del que se lee el catálogo de alimentos."""
+        return self.fragmentos[0]
+
+    def _preparar_fragmento(self, numero: int) -> None:
+        """Verifica que los ids de la base sean los del fragmento y le reserva su rango."""
+        repo = self.fragmentos[numero]
+        primero = numero * ANCHO_RANGO_IDS + 1
+        ultimo = primero + ANCHO_RANGO_IDS - 1
+        with repo.lectura() as conn:
+            for sql in (SQL_RANGO_IDS_PACIENTES, SQL_RANGO_IDS_PLANES):
+                minimo, maximo = conn.execute(sql).fetchone()
+                if minimo is not None and (minimo < primero or maximo > ultimo):
+                    raise ValueError(f"{repo.db_path} tiene ids fuera del rango del fragmento {numero} "
+                                     f"({primero} a {ultimo})")
+            secuencias = {nombre: valor for nombre, valor in conn.execute(SQL_SECUENCIAS)}
+        # El fragmento 0 empieza en 1 como cualquier base; los demás se escriben una sola vez
+        pendientes = [tabla for tabla in ('pacientes', 'plan_comidas') if secuencias.get(tabla, 0) < primero - 1]
+        if not pendientes or self.solo_lectura:
+            return
+        with repo.escritura() as conn:
+            for tabla in pendientes:
+                if tabla in secuencias:
+                    conn.execute(SQL_ACTUALIZAR_SECUENCIA, (primero - 1, tabla))
+                else:
+                    conn.execute(SQL_INSERTAR_SECUENCIA, (tabla, primero - 1))
+
+    def sincronizar_catalogo(self) -> None:
+        """Copia en cada fragmento los alimentos del fragmento 0 que le falten o difieran.
+
+        Se llama al abrir, así una base recién agregada recibe el catálogo completo.
+        """
+        with self.catalogo.lectura() as conn:
+            catalogo = [tuple(fila) for fila in conn.execute(SQL_CATALOGO_ALIMENTOS)]
+        ids = {fila[0] for fila in catalogo}
+        for repo in self.fragmentos[1:]:
+            with repo.lectura() as conn:
+                propias = [tuple(fila) for fila in conn.execute(SQL_CATALOGO_ALIMENTOS)]
+            if propias == catalogo:
+                continue
+            distintas = set(catalogo).difference(propias)
+            sobrantes = [(fila[0],) for fila in propias if fila[0] not in ids]
+            with repo.escritura() as conn:
+                conn.executemany(SQL_REPLICAR_ALIMENTO, sorted(distintas))
+                conn.executemany(SQL_ELIMINAR_ALIMENTO, sobrantes)
+            repo.invalidar_caches()
+
+    def close(self) -> None:
+        for repo in self.fragmentos:
+            repo.close()
+
+    # --- Ubicación ---
+
+    def _fragmento(self, entidad_id: Optional[int]) -> Optional[NutricionistaRepo]:
+        if entidad_id is None or entidad_id < 1:
+            return None
+        numero = fragmento_de_id(entidad_id)
+        return self.fragmentos[numero] if numero < len(self.fragmentos) else None
+
+    def fragmento_de_paciente(self, paciente_id: int) -> NutricionistaRepo:
+        """NutricionistaRepo de la base donde vive el paciente (y sus planes)."""
+        repo = self._fragmento(paciente_id)
+        if repo is None:
+            raise ValueError(f"El id {paciente_id} no corresponde a ningún fragmento")
+        return repo
+
+    def _elegir_fragmento(self, paciente: Paciente) -> int:
+        if self.clave_fragmento is None:
+            return next(self._turno) % len(self.fragmentos)
+        # crc32 y no hash(): tiene que dar lo mismo en todos los procesos
+        clave = str(self.clave_fragmento(paciente)).encode('utf-8')
+        return zlib.crc32(clave) % len(self.fragmentos)
+
+    def _agrupar_ids(self, ids: Iterable[int]) -> Dict[int, List[int]]:
+        """Reparte los ids por fragmento, en orden de fragmento; los que no caen en ninguno se omiten."""
+        grupos: Dict[int, List[int]] = {}
+        for entidad_id in ids:
+            if self._fragmento(entidad_id) is not None:
+                grupos.setdefault(fragmento_de_id(entidad_id), []).append(entidad_id)
+        return dict(sorted(grupos.items()))
+
+    def _obtener_varios(self, metodo: str, ids: Iterable[int]) -> Dict[int, Any]:
+        pedidos = list(dict.fromkeys(ids))
+        encontrados: Dict[int, Any] = {}
+        for numero, grupo in self._agrupar_ids(pedidos).items():
+            encontrados.update(getattr(self.fragmentos[numero], metodo)(grupo))
+        return {entidad_id: encontrados[entidad_id] for entidad_id in pedidos if entidad_id in encontrados}
+
+    def _pagina(self, metodo: str, despues_de_id: Optional[int], limite: Optional[int]) -> List[Any]:
+        """Página por clave sobre todos los fragmentos: como cada uno tiene su rango de ids,
+        se empieza en el de despues_de_id y se sigue con los siguientes hasta llenar el límite.
+        """
+        primero = fragmento_de_id(despues_de_id + 1) if despues_de_id else 0
+        resultado: List[Any] = []
+        for repo in self.fragmentos[primero:]:
+            restante = None if limite is None else limite - len(resultado)
+            if restante is not None and restante <= 0:
+                break
+            resultado.extend(getattr(repo, metodo)(despues_de_id=despues_de_id or 0, limite=restante))
+        return resultado
+
+    def _iterar(self, metodo: str, tamano_lectura: int) -> Iterator[Any]:
+        for repo in self.fragmentos:
+            yield from getattr(repo, metodo)(tamano_lectura)
+
+    # --- Métodos para Pacientes ---
+
+    def crear_paciente(self, paciente: Paciente) -> int:
+        return self.fragmentos[self._elegir_fragmento(paciente)].crear_paciente(paciente)
+
+    def crear_pacientes_bulk(self, pacientes: Iterable[Paciente],
+                             tamano_lote: int = TAMANO_LOTE_POR_DEFECTO) -> List[int]:
+        """Como en NutricionistaRepo, pero los ids no son consecutivos: devuelve la lista en orden."""
+        lista = list(pacientes)
+        grupos: Dict[int, List[Paciente]] = {}
+        for paciente in lista:
+            grupos.setdefault(self._elegir_fragmento(paciente), []).append(paciente)
+        for numero, grupo in grupos.items():
+            self.fragmentos[numero].crear_pacientes_bulk(grupo, tamano_lote)
+        return [paciente.id for paciente in lista]
+
+    def obtener_paciente(self, paciente_id: int) -> Optional[Paciente]:
+        repo = self._fragmento(paciente_id)
+        return repo.obtener_paciente(paciente_id) if repo else None
+
+    def obtener_pacientes(self, paciente_ids: Iterable[int]) -> Dict[int, Paciente]:
+        return self._obtener_varios('obtener_pacientes', paciente_ids)
+
+    def listar_pacientes(self, despues_de_id: Optional[int] = None,
+                         limite: Optional[int] = None) -> List[Paciente]:
+        if despues_de_id is None and limite is None:
+            return list(self.iter_pacientes())
+        return self._pagina('listar_pacientes', despues_de_id, limite)
+
+    def iter_pacientes(self, tamano_lectura: int = TAMANO_LECTURA_POR_DEFECTO) -> Iterator[Paciente]:
+        return self._iterar('iter_pacientes', tamano_lectura)
+
+    def buscar_pacientes(self, texto: str, limite: int = LIMITE_BUSQUEDA_POR_DEFECTO) -> List[Paciente]:
+        """Busca en todos los fragmentos y mezcla por puntaje bm25.
+
+        Cada base calcula el puntaje con sus propias estadísticas de términos, así que con
+        fragmentos muy desparejos el orden puede diferir un poco del de una sola base.
+        """
+        consulta = consulta_fts(texto)
+        if not consulta:
+            return []
+        encontrados: List[Tuple[float, Paciente]] = []
+        for repo in self.fragmentos:
+            with repo.lectura() as conn:
+                encontrados.extend(repo.consultar(conn, _paciente_con_puntaje, SQL_BUSCAR_PACIENTES_PUNTAJE,
+                                                  (consulta, limite)).fetchall())
+        encontrados.sort(key=lambda par: par[0])
+        return [paciente for _, paciente in encontrados[:limite]]
+
+    def actualizar_paciente(self, paciente: Paciente) -> bool:
+        repo = self._fragmento(paciente.id)
+        return repo.actualizar_paciente(paciente) if repo else False
+
+    def actualizar_peso_paciente(self, paciente_id: int, nuevo_peso: float) -> bool:
+        repo = self._fragmento(paciente_id)
+        return repo.actualizar_peso_paciente(paciente_id, nuevo_peso) if repo else False
+
+    def eliminar_paciente(self, paciente_id: int) -> bool:
+        repo = self._fragmento(paciente_id)
+        return repo.eliminar_paciente(paciente_id) if repo else False
+
+    # --- Métodos para Alimentos ---
+
+    def _replicar(self, alimentos: Iterable[Alimento]) -> None:
+        filas = [(alimento.id, alimento.nombre, alimento.calorias) for alimento in alimentos]
+        for repo in self.fragmentos[1:]:
+            with repo.escritura() as conn:
+                conn.executemany(SQL_REPLICAR_ALIMENTO, filas)
+            repo.invalidar_caches()
+
+    def crear_alimento(self, alimento: Alimento) -> int:
+        alimento_id = self.catalogo.crear_alimento(alimento)
+        self._replicar([Alimento(alimento_id, alimento.nombre, alimento.calorias)])
+        return alimento_id
+
+    def crear_alimentos_bulk(self, alimentos: Iterable[Alimento],
+                             tamano_lote: int = TAMANO_LOTE_POR_DEFECTO) -> range:
+        lista = list(alimentos)
+        ids = self.catalogo.crear_alimentos_bulk(lista, tamano_lote)
+        self._replicar(lista)
+        return ids
+
+    def obtener_alimento(self, alimento_id: int) -> Optional[Alimento]:
+        return self.catalogo.obtener_alimento(alimento_id)
+
+    def obtener_alimentos(self, alimento_ids: Iterable[int]) -> Dict[int, Alimento]:
+        return self.catalogo.obtener_alimentos(alimento_ids)
+
+    def listar_alimentos(self, despues_de_id: Optional[int] = None,
+                         limite: Optional[int] = None) -> List[Alimento]:
+        return self.catalogo.listar_alimentos(despues_de_id, limite)
+
+    def iter_alimentos(self, tamano_lectura: int = TAMANO_LECTURA_POR_DEFECTO) -> Iterator[Alimento]:
+        return self.catalogo.iter_alimentos(tamano_lectura)
+
+    def buscar_alimentos(self, texto: str, limite: int = LIMITE_BUSQUEDA_POR_DEFECTO) -> List[Alimento]:
+        return self.catalogo.buscar_alimentos(texto, limite)
+
+    def actualizar_alimento(self, alimento: Alimento) -> bool:
+        modificado = self.catalogo.actualizar_alimento(alimento)
+        for repo in self.fragmentos[1:]:
+            repo.actualizar_alimento(alimento)
+        return modificado
+
+    def eliminar_alimento(self, alimento_id: int) -> bool:
+        modificado = self.catalogo.eliminar_alimento(alimento_id)
+        for repo in self.fragmentos[1:]:
+            repo.eliminar_alimento(alimento_id)
+        return modificado
+
+    # --- Metodos para Planes de Comida ---
+
+    def crear_plan_comida(self, plan: PlanComida) -> int:
+        return self.fragmento_de_paciente(plan.paciente_id).crear_plan_comida(plan)
+
+    def crear_planes_comida_bulk(self, planes: Iterable[PlanComida],
+                                 tamano_lote: int = TAMANO_LOTE_POR_DEFECTO) -> List[int]:
+        """Cada plan va al fragmento de su paciente; devuelve los ids en el orden recibido."""
+        lista = list(planes)
+        grupos: Dict[int, List[PlanComida]] = {}
+        for plan in lista:
+            self.fragmento_de_paciente(plan.paciente_id)
+            grupos.setdefault(fragmento_de_id(plan.paciente_id), []).append(plan)
+        for numero, grupo in grupos.items():
+            self.fragmentos[numero].crear_planes_comida_bulk(grupo, tamano_lote)
+        return [plan.id for plan in lista]
+
+    def obtener_plan_comida(self, plan_id: int) -> Optional[PlanComida]:
+        repo = self._fragmento(plan_id)
+        return repo.obtener_plan_comida(plan_id) if repo else None
+
+    def obtener_planes_comida(self, plan_ids: Iterable[int]) -> Dict[int, PlanComida]:
+        return self._obtener_varios('obtener_planes_comida', plan_ids)
+
+    def listar_planes_paciente(self, paciente_id: int) -> List[PlanComida]:
+        repo = self._fragmento(paciente_id)
+        return repo.listar_planes_paciente(paciente_id) if repo else []
+
+    def listar_planes_comida(self, despues_de_id: Optional[int] = None,
+                             limite: Optional[int] = None) -> List[Dict]:
+        if despues_de_id is None and limite is None:
+            return list(self.iter_planes_comida())
+        return self._pagina('listar_planes_comida', despues_de_id, limite)
+
+    def iter_planes_comida(self, tamano_lectura: int = TAMANO_LECTURA_POR_DEFECTO) -> Iterator[Dict]:
+        return self._iterar('iter_planes_comida', tamano_lectura)
+
+    def plan_del_paciente(self, paciente_id: int, fecha: str) -> List[Dict]:
+        repo = self._fragmento(paciente_id)
+        return repo.plan_del_paciente(paciente_id, fecha) if repo else []
+
+    def planes_por_paciente_y_rango(self, paciente_id: int, desde: str, hasta: str) -> List[PlanComida]:
+        repo = self._fragmento(paciente_id)
+        return repo.planes_por_paciente_y_rango(paciente_id, desde, hasta) if repo else []
+
+    def planes_con_detalle(self, paciente_ids: Iterable[int], desde: Optional[str] = None,
+                           hasta: Optional[str] = None) -> List[Tuple[PlanComida, Paciente, Alimento]]:
+        """Como en NutricionistaRepo: una consulta de planes por fragmento involucrado, en
+        orden de fragmento, que es también el orden por paciente.
+        """
+        resultado: List[Tuple[PlanComida, Paciente, Alimento]] = []
+        for numero, grupo in self._agrupar_ids(paciente_ids).items():
+            resultado.extend(self.fragmentos[numero].planes_con_detalle(grupo, desde, hasta))
+        return resultado
+
+    def calorias_por_dia(self, paciente_id: int, desde: Optional[str] = None,
+                         hasta: Optional[str] = None) -> List[Dict]:
+        repo = self._fragmento(paciente_id)
+        return repo.calorias_por_dia(paciente_id, desde, hasta) if repo else []
+
+    def actualizar_plan_comida(self, plan: PlanComida) -> bool:
+        repo = self._fragmento(plan.id)
+        if repo is None:
+            return False
+        if self._fragmento(plan.paciente_id) is not repo:
+            raise ValueError("Un plan no puede pasar a un paciente de otro fragmento")
+        return repo.actualizar_plan_comida(plan)
+
+    def eliminar_plan_comida(self, plan_id: int) -> bool:
+        repo = self._fragmento(plan_id)
+        return repo.eliminar_plan_comida(plan_id) if repo else False
+
+    def crear_todo_nuevo(self, paciente: Paciente, alimento: Alimento, plan: PlanComida) -> Tuple[int, int, int]:
+        """El alimento entra al catálogo primero; paciente y plan, juntos en su fragmento.
+
+        Como son transacciones en bases distintas, si paciente y plan fallan el alimento
+        se borra de todas; el plan se valida antes para no llegar a escribir nada.
+        """
+        try:
+            fecha_canonica(plan.fecha)
+            alimento.id = self.crear_alimento(alimento)
+            plan.alimento_id = alimento.id
+            try:
+                with self.fragmentos[self._elegir_fragmento(paciente)].unidad_de_trabajo() as uow:
+                    uow.crear(paciente)
+                    uow.crear(plan, paciente=paciente)
+            except Exception:
+                self.eliminar_alimento(alimento.id)
+                alimento.id = None
+                raise
+        except Exception as e:
+            print(f"Error en la transacción: {e}")
+            raise
+        return paciente.id, alimento.id, plan.id
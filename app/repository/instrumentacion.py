@@ -0,0 +1,180 @@
+import re
+import threading
+import time
+import types
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Logger de las consultas lentas. logging se importa con la primera consulta lenta y no
+# al arrancar: la mayoría de los procesos nunca la registra.
+NOMBRE_LOGGER = "app.repository.consultas_lentas"
+
+# Límites superiores (en segundos) de cada casillero del histograma de latencias;
+# el último casillero acumula todo lo que supera al último límite.
+LIMITES_HISTOGRAMA = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Máximo de sentencias distintas que se guardan por llamada para el log de consultas lentas
+MAX_SENTENCIAS_POR_LLAMADA = 20
+
+# Sentencias de control de transacciones que no vale la pena explicar
+_SIN_PLAN = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'PRAGMA')
+
+# Literales de SQL: textos ('O''Brien'), blobs (X'00ff') y números que no son parte de un
+# nombre (uow_3). El trace callback recibe la sentencia con los parámetros ya reemplazados.
+_LITERALES = re.compile(r"[xX]?'(?:[^']|'')*'|(?<![\w.])(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)")
+
+
+def sin_valores(sql: str) -> str:
+    """La sentencia con cada literal cambiado por ?, para no dejar nombres ni pesos en el log."""
+    return _LITERALES.sub('?', sql)
+
+
+class EstadisticasMetodo:
+    __slots__ = ('llamadas', 'filas', 'tiempo_total', 'tiempo_maximo', 'histograma')
+    
+    def __init__(self):
+        self.llamadas = 0
+        self.filas = 0
+        self.tiempo_total = 0.0
+        self.tiempo_maximo = 0.0
+        self.histograma = [0] * (len(LIMITES_HISTOGRAMA) + 1)
+    
+    def registrar(self, duracion: float, filas: int) -> None:
+        self.llamadas += 1
+        self.filas += filas
+        self.tiempo_total += duracion
+        if duracion > self.tiempo_maximo:
+            self.tiempo_maximo = duracion
+        self.histograma[bisect_left(LIMITES_HISTOGRAMA, duracion)] += 1
+    
+    def como_dict(self) -> Dict:
+        return {
+            'llamadas': self.llamadas,
+            'filas': self.filas,
+            'tiempo_total': self.tiempo_total,
+            'tiempo_promedio': self.tiempo_total / self.llamadas if self.llamadas else 0.0,
+            'tiempo_maximo': self.tiempo_maximo,
+            'histograma': dict(zip([*map(str, LIMITES_HISTOGRAMA), 'mas'], self.histograma)),
+        }
+
+
+class Instrumentacion:
+    """Mide llamadas, filas y latencia por método del repositorio.
+    
+    Mientras está desactivada no cuesta nada: el repositorio envuelve sus métodos recién
+    al activarla. Activada, además
+    captura las sentencias ejecutadas (con el trace callback de sqlite3) para registrar
+    en el log las llamadas que superan umbral_lento junto con su EXPLAIN QUERY PLAN.
+    """
+    
+    def __init__(self, umbral_lento: float = 0.1):
+        self.activa = False
+        self.umbral_lento = umbral_lento
+        self._estadisticas: Dict[str, EstadisticasMetodo] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def capturar_sentencia(self, sql: str) -> None:
+        """Trace callback para las conexiones: guarda la sentencia en la llamada en curso del hilo."""
+        # SQLite también informa las sentencias que corren dentro de triggers y de FTS5, con
+        # "-- " adelante: no son del repositorio ni se les puede pedir el plan
+        if sql.startswith('--'):
+            return
+        sentencias = getattr(self._local, 'sentencias', None)
+        if sentencias is not None and len(sentencias) < MAX_SENTENCIAS_POR_LLAMADA and sql not in sentencias:
+            sentencias.append(sql)
+    
+    def en_curso(self) -> bool:
+        return getattr(self._local, 'sentencias', None) is not None
+    
+    def iniciar(self) -> List[str]:
+        sentencias: List[str] = []
+        self._local.sentencias = sentencias
+        return sentencias
+    
+    def suspender(self) -> None:
+        self._local.sentencias = None
+    
+    def reanudar(self, sentencias: List[str]) -> None:
+        self._local.sentencias = sentencias
+    
+    def registrar(self, metodo: str, duracion: float, filas: int, sentencias: List[str],
+                  explicar: Callable[[str], List[str]]) -> None:
+        with self._lock:
+            estadisticas = self._estadisticas.get(metodo)
+            if estadisticas is None:
+                estadisticas = self._estadisticas[metodo] = EstadisticasMetodo()
+            estadisticas.registrar(duracion, filas)
+        
+        if duracion >= self.umbral_lento:
+            lineas = [f"Consulta lenta en {metodo}: {duracion * 1000:.1f} ms, {filas} filas"]
+            for sql in sentencias:
+                # El plan se pide con los valores reales, pero al log solo va el texto sin ellos
+                lineas.append(f"  {sin_valores(sql.strip())}")
+                if not sql.lstrip().upper().startswith(_SIN_PLAN):
+                    lineas.extend(f"    -> {detalle}" for detalle in explicar(sql))
+            import logging
+            logging.getLogger(NOMBRE_LOGGER).warning("\n".join(lineas))
+    
+    def estadisticas(self, metodo: Optional[str] = None) -> Dict:
+        with self._lock:
+            if metodo is not None:
+                estadisticas = self._estadisticas.get(metodo)
+                return estadisticas.como_dict() if estadisticas else {}
+            return {nombre: e.como_dict() for nombre, e in self._estadisticas.items()}
+    
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._estadisticas.clear()
+
+
+def contar_filas(resultado) -> int:
+    """Cantidad de filas que representa el valor devuelto por un método del repositorio."""
+    if resultado is None:
+        return 0
+    if isinstance(resultado, bool):
+        return int(resultado)
+    if isinstance(resultado, (list, tuple, range, Mapping)):
+        # Los dict de obtener_pacientes y similares tienen una fila por entrada
+        return len(resultado)
+    return 1
+
+
+def medir(nombre: str, instrumentacion: Instrumentacion, llamar: Callable,
+          explicar: Callable[[str], List[str]]):
+    inicio = time.perf_counter()
+    sentencias = instrumentacion.iniciar()
+    try:
+        resultado = llamar()
+    finally:
+        instrumentacion.suspender()
+    if isinstance(resultado, types.GeneratorType):
+        # Los listados perezosos se miden mientras se consumen
+        return medir_iterador(nombre, instrumentacion, resultado, explicar)
+    instrumentacion.registrar(nombre, time.perf_counter() - inicio, contar_filas(resultado),
+                              sentencias, explicar)
+    return resultado
+
+
+def medir_iterador(nombre: str, instrumentacion: Instrumentacion, iterador: Iterator[Any],
+                   explicar: Callable[[str], List[str]]) -> Iterator[Any]:
+    """Mide un listado perezoso: suma solo el tiempo pasado dentro del iterador, no el del consumidor."""
+    sentencias: List[str] = []
+    filas = 0
+    duracion = 0.0
+    try:
+        while True:
+            inicio = time.perf_counter()
+            instrumentacion.reanudar(sentencias)
+            try:
+                fila = next(iterador)
+            except StopIteration:
+                break
+            finally:
+                instrumentacion.suspender()
+                duracion += time.perf_counter() - inicio
+            filas += 1
+            yield fila
+    finally:
+        instrumentacion.registrar(nombre, duracion, filas, sentencias, explicar)
@@ -0,0 +1,449 @@
+import sqlite3
+from typing import Callable, List, Tuple, Union
+
+from app.utils import normalizar_fecha
+
+Paso = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+def _repetir(numero: int) -> Callable[[sqlite3.Connection], None]:
+    """Paso que vuelve a ejecutar las sentencias de una migración anterior (son idempotentes)."""
+    def paso(conn: sqlite3.Connection) -> None:
+        for sql in dict(MIGRACIONES)[numero]:
+            conn.execute(sql)
+    return paso
+
+
+def _normalizar_fechas_planes(conn: sqlite3.Connection) -> None:
+    """Lleva a YYYY-MM-DD las fechas de plan_comidas que no lo están.
+    
+    Las que no se pueden interpretar como fecha se mueven a plan_comidas_fechas_invalidas
+    para revisarlas a mano, en lugar de perderlas o de hacer fallar la migración.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS plan_comidas_fechas_invalidas (
+            id INTEGER PRIMARY KEY,
+            paciente_id INTEGER,
+            alimento_id INTEGER,
+            fecha,
+            cantidad REAL
+        )
+    ''')
+    no_canonicas = conn.execute(
+        "SELECT id, fecha FROM plan_comidas WHERE date(fecha, '+0 days') IS NOT fecha"
+    ).fetchall()
+    corregidas = []
+    invalidas = []
+    for plan_id, fecha in no_canonicas:
+        canonica = normalizar_fecha(fecha) if isinstance(fecha, str) else None
+        if canonica is None:
+            invalidas.append((plan_id,))
+        else:
+            corregidas.append((canonica, plan_id))
+    conn.executemany('UPDATE plan_comidas SET fecha = ? WHERE id = ?', corregidas)
+    conn.executemany('''
+        INSERT INTO plan_comidas_fechas_invalidas (id, paciente_id, alimento_id, fecha, cantidad)
+        SELECT id, paciente_id, alimento_id, fecha, cantidad FROM plan_comidas WHERE id = ?
+    ''', invalidas)
+    conn.executemany('DELETE FROM plan_comidas WHERE id = ?', invalidas)
+
+
+# Cada migración es (versión, pasos). Un paso es una sentencia SQL o una función que recibe la
+# conexión. La versión aplicada se guarda en PRAGMA user_version, así que solo se agregan
+# migraciones nuevas al final, nunca se modifican las existentes.
+MIGRACIONES: List[Tuple[int, List[Paso]]] = [
+    (1, [
+        'CREATE INDEX IF NOT EXISTS idx_plan_comidas_paciente_fecha ON plan_comidas (paciente_id, fecha)',
+        'CREATE INDEX IF NOT EXISTS idx_plan_comidas_alimento ON plan_comidas (alimento_id)',
+        'CREATE INDEX IF NOT EXISTS idx_plan_comidas_fecha ON plan_comidas (fecha)',
+    ]),
+    # Totales diarios de calorías por paciente, mantenidos por triggers para que todos los
+    # caminos de escritura (incluidas las cargas masivas) los dejen al día.
+    (2, [
+        '''
+        CREATE TABLE IF NOT EXISTS calorias_diarias (
+            paciente_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL,
+            total_calorias REAL NOT NULL,
+            cantidad_items INTEGER NOT NULL,
+            PRIMARY KEY (paciente_id, fecha)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        INSERT INTO calorias_diarias (paciente_id, fecha, total_calorias, cantidad_items)
+        SELECT pc.paciente_id, pc.fecha, SUM(COALESCE(a.calorias, 0) * pc.cantidad), COUNT(*)
+        FROM plan_comidas pc
+        LEFT JOIN alimentos a ON a.id = pc.alimento_id
+        GROUP BY pc.paciente_id, pc.fecha
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_plan_comidas_insert_calorias
+        AFTER INSERT ON plan_comidas
+        BEGIN
+            INSERT INTO calorias_diarias (paciente_id, fecha, total_calorias, cantidad_items)
+            VALUES (
+                NEW.paciente_id, NEW.fecha,
+                COALESCE((SELECT calorias FROM alimentos WHERE id = NEW.alimento_id), 0) * NEW.cantidad,
+                1
+            )
+            ON CONFLICT (paciente_id, fecha) DO UPDATE SET
+                total_calorias = total_calorias + excluded.total_calorias,
+                cantidad_items = cantidad_items + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_plan_comidas_delete_calorias
+        AFTER DELETE ON plan_comidas
+        BEGIN
+            UPDATE calorias_diarias SET
+                total_calorias = total_calorias
+                    - COALESCE((SELECT calorias FROM alimentos WHERE id = OLD.alimento_id), 0) * OLD.cantidad,
+                cantidad_items = cantidad_items - 1
+            WHERE paciente_id = OLD.paciente_id AND fecha = OLD.fecha;
+            DELETE FROM calorias_diarias
+            WHERE paciente_id = OLD.paciente_id AND fecha = OLD.fecha AND cantidad_items <= 0;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_plan_comidas_update_calorias
+        AFTER UPDATE OF paciente_id, alimento_id, fecha, cantidad ON plan_comidas
+        BEGIN
+            UPDATE calorias_diarias SET
+                total_calorias = total_calorias
+                    - COALESCE((SELECT calorias FROM alimentos WHERE id = OLD.alimento_id), 0) * OLD.cantidad,
+                cantidad_items = cantidad_items - 1
+            WHERE paciente_id = OLD.paciente_id AND fecha = OLD.fecha;
+            DELETE FROM calorias_diarias
+            WHERE paciente_id = OLD.paciente_id AND fecha = OLD.fecha AND cantidad_items <= 0;
+            INSERT INTO calorias_diarias (paciente_id, fecha, total_calorias, cantidad_items)
+            VALUES (
+                NEW.paciente_id, NEW.fecha,
+                COALESCE((SELECT calorias FROM alimentos WHERE id = NEW.alimento_id), 0) * NEW.cantidad,
+                1
+            )
+            ON CONFLICT (paciente_id, fecha) DO UPDATE SET
+                total_calorias = total_calorias + excluded.total_calorias,
+                cantidad_items = cantidad_items + 1;
+        END
+        ''',
+        # Si cambian las calorías de un alimento (o se elimina) se recalculan desde cero
+        # solo los días que lo usan, para no acumular error de redondeo.
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_alimentos_update_calorias
+        AFTER UPDATE OF calorias ON alimentos
+        WHEN NEW.calorias IS NOT OLD.calorias
+        BEGIN
+            UPDATE calorias_diarias SET total_calorias = (
+                SELECT COALESCE(SUM(COALESCE(a.calorias, 0) * pc.cantidad), 0)
+                FROM plan_comidas pc
+                LEFT JOIN alimentos a ON a.id = pc.alimento_id
+                WHERE pc.paciente_id = calorias_diarias.paciente_id AND pc.fecha = calorias_diarias.fecha
+            )
+            WHERE (paciente_id, fecha) IN (
+                SELECT paciente_id, fecha FROM plan_comidas WHERE alimento_id = NEW.id
+            );
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_alimentos_delete_calorias
+        AFTER DELETE ON alimentos
+        BEGIN
+            UPDATE calorias_diarias SET total_calorias = (
+                SELECT COALESCE(SUM(COALESCE(a.calorias, 0) * pc.cantidad), 0)
+                FROM plan_comidas pc
+                LEFT JOIN alimentos a ON a.id = pc.alimento_id
+                WHERE pc.paciente_id = calorias_diarias.paciente_id AND pc.fecha = calorias_diarias.fecha
+            )
+            WHERE (paciente_id, fecha) IN (
+                SELECT paciente_id, fecha FROM plan_comidas WHERE alimento_id = OLD.id
+            );
+        END
+        ''',
+    ]),
+    # Búsqueda de texto completo sobre nombres. Las tablas FTS5 son de contenido externo (no
+    # duplican el texto) y se mantienen con triggers. remove_diacritics 2 hace que "Martinez"
+    # encuentre "Martínez", y el índice de prefijos acelera las búsquedas mientras se tipea.
+    (3, [
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS alimentos_fts USING fts5(
+            nombre, content='alimentos', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        ''',
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS pacientes_fts USING fts5(
+            nombre, content='pacientes', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        ''',
+        "INSERT INTO alimentos_fts (alimentos_fts) VALUES ('rebuild')",
+        "INSERT INTO pacientes_fts (pacientes_fts) VALUES ('rebuild')",
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_alimentos_insert_fts
+        AFTER INSERT ON alimentos
+        BEGIN
+            INSERT INTO alimentos_fts (rowid, nombre) VALUES (NEW.id, NEW.nombre);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_alimentos_delete_fts
+        AFTER DELETE ON alimentos
+        BEGIN
+            INSERT INTO alimentos_fts (alimentos_fts, rowid, nombre) VALUES ('delete', OLD.id, OLD.nombre);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_alimentos_update_fts
+        AFTER UPDATE OF nombre ON alimentos
+        BEGIN
+            INSERT INTO alimentos_fts (alimentos_fts, rowid, nombre) VALUES ('delete', OLD.id, OLD.nombre);
+            INSERT INTO alimentos_fts (rowid, nombre) VALUES (NEW.id, NEW.nombre);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_pacientes_insert_fts
+        AFTER INSERT ON pacientes
+        BEGIN
+            INSERT INTO pacientes_fts (rowid, nombre) VALUES (NEW.id, NEW.nombre);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_pacientes_delete_fts
+        AFTER DELETE ON pacientes
+        BEGIN
+            INSERT INTO pacientes_fts (pacientes_fts, rowid, nombre) VALUES ('delete', OLD.id, OLD.nombre);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_pacientes_update_fts
+        AFTER UPDATE OF nombre ON pacientes
+        BEGIN
+            INSERT INTO pacientes_fts (pacientes_fts, rowid, nombre) VALUES ('delete', OLD.id, OLD.nombre);
+            INSERT INTO pacientes_fts (rowid, nombre) VALUES (NEW.id, NEW.nombre);
+        END
+        ''',
+    ]),
+    # Fechas canónicas: se corrigen las existentes y plan_comidas se reconstruye con un CHECK
+    # (SQLite no permite agregarlo a una tabla existente). date(fecha, '+0 days') devuelve NULL si
+    # el texto no es una fecha y corrige días fuera de rango ('2023-02-30' -> '2023-03-02'; sin el
+    # modificador, versiones anteriores a 3.42 lo devuelven tal cual), así que solo acepta
+    # YYYY-MM-DD válidas.
+    # Se conservan ids y la secuencia de AUTOINCREMENT, y se recrean índices, triggers y totales.
+    (4, [
+        'DROP TRIGGER IF EXISTS trg_plan_comidas_insert_calorias',
+        'DROP TRIGGER IF EXISTS trg_plan_comidas_delete_calorias',
+        'DROP TRIGGER IF EXISTS trg_plan_comidas_update_calorias',
+        'DROP TRIGGER IF EXISTS trg_alimentos_update_calorias',
+        'DROP TRIGGER IF EXISTS trg_alimentos_delete_calorias',
+        _normalizar_fechas_planes,
+        'ALTER TABLE plan_comidas RENAME TO plan_comidas_vieja',
+        '''
+        CREATE TABLE plan_comidas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            paciente_id INTEGER NOT NULL,
+            alimento_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL CHECK (date(fecha, '+0 days') IS fecha),
+            cantidad REAL NOT NULL,
+            FOREIGN KEY(paciente_id) REFERENCES pacientes(id),
+            FOREIGN KEY(alimento_id) REFERENCES alimentos(id)
+        )
+        ''',
+        '''
+        INSERT INTO plan_comidas (id, paciente_id, alimento_id, fecha, cantidad)
+        SELECT id, paciente_id, alimento_id, fecha, cantidad FROM plan_comidas_vieja
+        ''',
+        '''
+        UPDATE sqlite_sequence
+        SET seq = MAX(seq, (SELECT seq FROM sqlite_sequence WHERE name = 'plan_comidas_vieja'))
+        WHERE name = 'plan_comidas'
+          AND EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'plan_comidas_vieja')
+        ''',
+        '''
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT 'plan_comidas', seq FROM sqlite_sequence
+        WHERE name = 'plan_comidas_vieja'
+          AND NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'plan_comidas')
+        ''',
+        'DROP TABLE plan_comidas_vieja',
+        _repetir(1),
+        'DELETE FROM calorias_diarias',
+        _repetir(2),
+    ]),
+    # Detalle de los planes por paciente y día ya unido con el alimento, para que el plan de un
+    # paciente se lea con un solo recorrido de la clave primaria en lugar de un JOIN de tres
+    # tablas. Los triggers lo actualizan en la misma transacción que la escritura, así que nunca
+    # queda desactualizado. Guarda lo mismo que el JOIN: solo planes cuyo paciente y alimento existen.
+    (5, [
+        '''
+        CREATE TABLE IF NOT EXISTS planes_paciente_detalle (
+            paciente_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL,
+            plan_id INTEGER NOT NULL,
+            alimento_id INTEGER NOT NULL,
+            alimento_nombre TEXT NOT NULL,
+            cantidad REAL NOT NULL,
+            calorias_totales REAL,
+            PRIMARY KEY (paciente_id, fecha, plan_id)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_planes_paciente_detalle_alimento ON planes_paciente_detalle (alimento_id)',
+        '''
+        INSERT INTO planes_paciente_detalle
+            (paciente_id, fecha, plan_id, alimento_id, alimento_nombre, cantidad, calorias_totales)
+        SELECT pc.paciente_id, pc.fecha, pc.id, a.id, a.nombre, pc.cantidad, a.calorias * pc.cantidad
+        FROM plan_comidas pc
+        JOIN pacientes p ON pc.paciente_id = p.id
+        JOIN alimentos a ON pc.alimento_id = a.id
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_plan_comidas_insert_detalle
+        AFTER INSERT ON plan_comidas
+        BEGIN
+            INSERT INTO planes_paciente_detalle
+                (paciente_id, fecha, plan_id, alimento_id, alimento_nombre, cantidad, calorias_totales)
+            SELECT NEW.paciente_id, NEW.fecha, NEW.id, a.id, a.nombre, NEW.cantidad, a.calorias * NEW.cantidad
+            FROM alimentos a
+            WHERE a.id = NEW.alimento_id
+              AND EXISTS (SELECT 1 FROM pacientes WHERE id = NEW.paciente_id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_plan_comidas_delete_detalle
+        AFTER DELETE ON plan_comidas
+        BEGIN
+            DELETE FROM planes_paciente_detalle
+            WHERE paciente_id = OLD.paciente_id AND fecha = OLD.fecha AND plan_id = OLD.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_plan_comidas_update_detalle
+        AFTER UPDATE OF paciente_id, alimento_id, fecha, cantidad ON plan_comidas
+        BEGIN
+            DELETE FROM planes_paciente_detalle
+            WHERE paciente_id = OLD.paciente_id AND fecha = OLD.fecha AND plan_id = OLD.id;
+            INSERT INTO planes_paciente_detalle
+                (paciente_id, fecha, plan_id, alimento_id, alimento_nombre, cantidad, calorias_totales)
+            SELECT NEW.paciente_id, NEW.fecha, NEW.id, a.id, a.nombre, NEW.cantidad, a.calorias * NEW.cantidad
+            FROM alimentos a
+            WHERE a.id = NEW.alimento_id
+              AND EXISTS (SELECT 1 FROM pacientes WHERE id = NEW.paciente_id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_alimentos_update_detalle
+        AFTER UPDATE OF nombre, calorias ON alimentos
+        BEGIN
+            UPDATE planes_paciente_detalle
+            SET alimento_nombre = NEW.nombre, calorias_totales = NEW.calorias * cantidad
+            WHERE alimento_id = NEW.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_alimentos_delete_detalle
+        AFTER DELETE ON alimentos
+        BEGIN
+            DELETE FROM planes_paciente_detalle WHERE alimento_id = OLD.id;
+        END
+        ''',
+        # Un plan puede referirse a un paciente o alimento que todavía no existe (las claves
+        # foráneas no se verifican); cuando aparece, el plan pasa a verse como en el JOIN.
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_alimentos_insert_detalle
+        AFTER INSERT ON alimentos
+        BEGIN
+            INSERT OR IGNORE INTO planes_paciente_detalle
+                (paciente_id, fecha, plan_id, alimento_id, alimento_nombre, cantidad, calorias_totales)
+            SELECT pc.paciente_id, pc.fecha, pc.id, NEW.id, NEW.nombre, pc.cantidad, NEW.calorias * pc.cantidad
+            FROM plan_comidas pc
+            WHERE pc.alimento_id = NEW.id
+              AND EXISTS (SELECT 1 FROM pacientes WHERE id = pc.paciente_id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_pacientes_insert_detalle
+        AFTER INSERT ON pacientes
+        BEGIN
+            INSERT OR IGNORE INTO planes_paciente_detalle
+                (paciente_id, fecha, plan_id, alimento_id, alimento_nombre, cantidad, calorias_totales)
+            SELECT pc.paciente_id, pc.fecha, pc.id, a.id, a.nombre, pc.cantidad, a.calorias * pc.cantidad
+            FROM plan_comidas pc
+            JOIN alimentos a ON pc.alimento_id = a.id
+            WHERE pc.paciente_id = NEW.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_pacientes_delete_detalle
+        AFTER DELETE ON pacientes
+        BEGIN
+            DELETE FROM planes_paciente_detalle WHERE paciente_id = OLD.id;
+        END
+        ''',
+    ]),
+    # Un plan cuyo alimento todavía no existe suma 0 calorías a su día; cuando el alimento
+    # aparece, esos días se recalculan como en el UPDATE de calorías. Los totales que ya
+    # quedaron desfasados se corrigen una vez al aplicar la migración.
+    (6, [
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_alimentos_insert_calorias
+        AFTER INSERT ON alimentos
+        BEGIN
+            UPDATE calorias_diarias SET total_calorias = (
+                SELECT COALESCE(SUM(COALESCE(a.calorias, 0) * pc.cantidad), 0)
+                FROM plan_comidas pc
+                LEFT JOIN alimentos a ON a.id = pc.alimento_id
+                WHERE pc.paciente_id = calorias_diarias.paciente_id AND pc.fecha = calorias_diarias.fecha
+            )
+            WHERE (paciente_id, fecha) IN (
+                SELECT paciente_id, fecha FROM plan_comidas WHERE alimento_id = NEW.id
+            );
+        END
+        ''',
+        '''
+        UPDATE calorias_diarias SET total_calorias = (
+            SELECT COALESCE(SUM(COALESCE(a.calorias, 0) * pc.cantidad), 0)
+            FROM plan_comidas pc
+            LEFT JOIN alimentos a ON a.id = pc.alimento_id
+            WHERE pc.paciente_id = calorias_diarias.paciente_id AND pc.fecha = calorias_diarias.fecha
+        )
+        ''',
+    ]),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+
+def obtener_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def aplicar_migraciones(conn: sqlite3.Connection) -> int:
+    """Aplica en orden las migraciones pendientes y devuelve la versión final del esquema.
+    
+    Cada migración corre en su propia transacción junto con el cambio de user_version,
+    de modo que una falla deja la base en la última versión completa. La transacción es
+    BEGIN IMMEDIATE y la versión se vuelve a leer dentro de ella: si otro proceso abre la
+    misma base a la vez, espera a que termine y saltea lo que ese proceso ya aplicó.
+    """
+    version = obtener_version(conn)
+    for numero, pasos in MIGRACIONES:
+        if numero <= version:
+            continue
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            version = obtener_version(conn)
+            if numero <= version:
+                continue
+            for paso in pasos:
+                if callable(paso):
+                    paso(conn)
+                else:
+                    conn.execute(paso)
+            conn.execute(f'PRAGMA user_version = {numero}')
+        version = numero
+    return version
+
+
+def explicar_consulta(conn: sqlite3.Connection, sql: str, parametros: tuple = ()) -> List[str]:
+    """Devuelve el detalle de EXPLAIN QUERY PLAN para la consulta dada."""
+    cursor = conn.execute(f'EXPLAIN QUERY PLAN {sql}', parametros)
+    return [row[3] for row in cursor.fetchall()]
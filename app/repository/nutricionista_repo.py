@@ -1,229 +1,841 @@
 import sqlite3
 import os
-from typing import List, Optional, Dict, Tuple
+import functools
+import re
+from contextlib import contextmanager
+from itertools import islice
+from typing import List, Optional, Dict, Tuple, Iterable, Iterator, Callable, Any, ContextManager, TYPE_CHECKING
 from app.models import Paciente, Alimento, PlanComida
+from app.utils import fecha_canonica, normalizar_fecha
+from app.repository.migraciones import VERSION_ESQUEMA, aplicar_migraciones, explicar_consulta, obtener_version
+from app.repository.perfiles import aplicar_perfil, optimizar_al_cerrar, validar_perfil
+from app.repository.pool import PoolConexiones, abrir_conexion
+from app.repository.cache import CacheLRU
+from app.repository.instrumentacion import Instrumentacion, medir
+from app.repository.unidad_de_trabajo import UnidadDeTrabajo
+from app.repository.respaldo import PAGINAS_POR_PASO_POR_DEFECTO, PAUSA_POR_DEFECTO, respaldar
+from app.repository.sentencias import (
+    SQL_ACTUALIZAR_ALIMENTO, SQL_BUSCAR_ALIMENTOS, SQL_BUSCAR_PACIENTES, SQL_ACTUALIZAR_PACIENTE, SQL_ACTUALIZAR_PESO_PACIENTE,
+    SQL_ACTUALIZAR_PLAN, SQL_CALORIAS_DIA, SQL_CALORIAS_DIA_DESDE, SQL_CALORIAS_DIA_HASTA,
+    SQL_CALORIAS_DIA_RANGO, SQL_CREAR_ALIMENTOS, SQL_CREAR_PACIENTES, SQL_CREAR_PLAN_COMIDAS,
+    SQL_ELIMINAR_ALIMENTO, SQL_ELIMINAR_PACIENTE, SQL_ELIMINAR_PLAN, SQL_INSERTAR_ALIMENTO,
+    SQL_INSERTAR_PACIENTE, SQL_INSERTAR_PLAN, SQL_LISTAR_PLANES_DETALLE, SQL_OBTENER_ALIMENTO,
+    SQL_OBTENER_ALIMENTOS, SQL_OBTENER_PACIENTE, SQL_OBTENER_PACIENTES, SQL_OBTENER_PLAN, SQL_OBTENER_PLANES,
+    SQL_PAGINA_ALIMENTOS, SQL_PAGINA_PACIENTES, SQL_PAGINA_PLANES_DETALLE, SQL_PLAN_DEL_PACIENTE,
+    SQL_PLANES_PACIENTE, SQL_PLANES_PACIENTES_RANGO, SQL_PLANES_PACIENTE_RANGO, SQL_SELECT_ALIMENTOS, SQL_SELECT_PACIENTES,
+    SQL_ULTIMO_ID, TAMANO_CACHE_SENTENCIAS
+)
+
+if TYPE_CHECKING:
+    from app.repository.escritor_agrupado import EscritorAgrupado
+
+# Cantidad de filas que se envian por cada llamada a executemany en las cargas masivas
+TAMANO_LOTE_POR_DEFECTO = 1000
+
+# Cantidad de filas que se leen por cada fetchmany al recorrer un listado
+TAMANO_LECTURA_POR_DEFECTO = 500
+
+# Cantidad de resultados que devuelven las búsquedas si no se indica otra
+LIMITE_BUSQUEDA_POR_DEFECTO = 20
+
+_PALABRAS = re.compile(r'\w+')
+
+
+def consulta_fts(texto: str) -> str:
+    """Convierte lo que escribe el usuario en una consulta FTS5 de prefijos.
+    
+    Cada palabra se busca como prefijo ("mart lo" -> '"mart"* "lo"*') y deben aparecer
+    todas. Las comillas evitan que palabras como OR o NEAR se lean como operadores.
+    """
+    return ' '.join(f'"{palabra}"*' for palabra in _PALABRAS.findall(texto))
+
+def _lista_json(ids: List[int]) -> str:
+    """Arma el arreglo JSON que las consultas por muchos ids leen con json_each."""
+    # json se importa recién acá: pesa varios milisegundos en el arranque de cada proceso
+    import json
+    return json.dumps(ids)
+
+# Columnas que devuelve plan_del_paciente, en el orden de SQL_PLAN_DEL_PACIENTE
+_COLUMNAS_PLAN_DEL_PACIENTE = ('id', 'alimento_id', 'alimento_nombre', 'fecha', 'cantidad', 'calorias_totales')
+
+def _fila_a_dict(cursor: sqlite3.Cursor, row: tuple) -> Dict:
+    """Fábrica de filas que arma el dict directamente, sin pasar por sqlite3.Row."""
+    return {columna[0]: valor for columna, valor in zip(cursor.description, row)}
+
+
+def _instrumentado(metodo: Callable) -> Callable:
+    """Marca el método para que activar_instrumentacion registre su latencia, filas y llamadas.
+    
+    No lo envuelve: con la instrumentación desactivada la llamada no paga nada extra, y
+    en los caminos calientes (obtener_paciente) una capa más se nota.
+    """
+    metodo.instrumentado = True
+    return metodo
+
+
+def _medido(repo: "NutricionistaRepo", metodo: Callable) -> Callable:
+    """Envuelve el método ligado para medirlo; activar_instrumentacion lo instala en la instancia."""
+    nombre = metodo.__name__
+    instrumentacion = repo.instrumentacion
+    
+    @functools.wraps(metodo)
+    def envoltura(*args, **kwargs):
+        # Dentro de otro método ya medido la llamada pasa directo
+        if instrumentacion.en_curso():
+            return metodo(*args, **kwargs)
+        return medir(nombre, instrumentacion, lambda: metodo(*args, **kwargs), repo._explicar)
+    
+    return envoltura
+
 
 class NutricionistaRepo:
-    def __init__(self, db_path: str = "database/nutricion.db"):
+    def __init__(self, db_path: str = "database/nutricion.db", tamano_pool: Optional[int] = None,
+                 timeout: float = 5.0, tamano_cache: Optional[int] = None,
+                 ttl_cache: Optional[float] = None, solo_lectura: bool = False,
+                 perfil: Optional[str] = None):
+        """Con tamano_pool se usa un PoolConexiones en modo WAL (lectores concurrentes y un
+        escritor serializado) y el repositorio puede compartirse entre hilos. Sin él se usa
+        una única conexión, como siempre.
+        
+        Con tamano_cache se activa un cache LRU (con vencimiento opcional ttl_cache, en
+        segundos) para obtener_paciente, obtener_alimento, obtener_plan_comida y
+        plan_del_paciente.
+        
+        Con solo_lectura la base se abre con mode=ro: tiene que existir y estar al día (no
+        se crean tablas ni se migra) y cualquier escritura lanza sqlite3.OperationalError.
+        Conviene para procesos que solo consultan, como reportes o tareas programadas.
+        
+        perfil elige un juego de PRAGMAs de rendimiento ("bulk_load", "read_heavy" o
+        "low_memory", ver app.repository.perfiles); sin perfil se usan los valores de SQLite.
+        Con el pool el modo de journal sigue siendo WAL sea cual sea el perfil.
+        """
         # Asegurarse que la carpeta database existe
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        carpeta = os.path.dirname(db_path)
+        if carpeta and not solo_lectura and not os.path.isdir(carpeta):
+            os.makedirs(carpeta, exist_ok=True)
         
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
+        self.timeout = timeout
+        self.solo_lectura = solo_lectura
+        self.perfil = validar_perfil(perfil)
+        self.pool: Optional[PoolConexiones] = None
+        if tamano_pool is not None:
+            self.pool = PoolConexiones(db_path, tamano=tamano_pool, timeout=timeout,
+                                       cached_statements=TAMANO_CACHE_SENTENCIAS, solo_lectura=solo_lectura,
+                                       perfil=perfil)
+            self.conn = self.pool.escritor
+        else:
+            self.conn = abrir_conexion(db_path, solo_lectura, timeout=timeout,
+                                       cached_statements=TAMANO_CACHE_SENTENCIAS)
+            self.conn.row_factory = sqlite3.Row
+            aplicar_perfil(self.conn, perfil, cambiar_archivo=not solo_lectura)
+        
+        self.instrumentacion = Instrumentacion()
+        self._cursores: Dict[Tuple[sqlite3.Connection, Any], sqlite3.Cursor] = {}
+        self._caches: Dict[type, CacheLRU] = {}
+        self._cache_plan_del_paciente: Optional[CacheLRU] = None
+        if tamano_cache is not None:
+            for modelo in (Paciente, Alimento, PlanComida):
+                self._caches[modelo] = CacheLRU(tamano_cache, ttl_cache)
+            self._cache_plan_del_paciente = CacheLRU(tamano_cache, ttl_cache)
         self._crear_tablas()
     
     def _crear_tablas(self) -> None:
-        with self.conn:
-            self.conn.execute('''
-            CREATE TABLE IF NOT EXISTS pacientes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL,
-                edad INTEGER NOT NULL,
-                peso_actual REAL NOT NULL
-            )
-            ''')
-            
-            self.conn.execute('''
-            CREATE TABLE IF NOT EXISTS alimentos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL,
-                calorias INTEGER NOT NULL
+        # Con el esquema al día (todos los arranques salvo el primero) basta con leer
+        # user_version: no se ejecuta DDL ni se toma el lock de escritura
+        version = obtener_version(self.conn)
+        if version >= VERSION_ESQUEMA:
+            return
+        if self.solo_lectura:
+            self.close()
+            raise sqlite3.OperationalError(
+                f"La base {self.db_path} está en la versión de esquema {version} y se necesita la "
+                f"{VERSION_ESQUEMA}; ábrala una vez sin solo_lectura para migrarla"
             )
-            ''')
-            
-            self.conn.execute('''
-            CREATE TABLE IF NOT EXISTS plan_comidas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                paciente_id INTEGER NOT NULL,
-                alimento_id INTEGER NOT NULL,
-                fecha TEXT NOT NULL,
-                cantidad REAL NOT NULL,
-                FOREIGN KEY(paciente_id) REFERENCES pacientes(id),
-                FOREIGN KEY(alimento_id) REFERENCES alimentos(id)
-            )
-            ''')
+        
+        with self.conn:
+            self.conn.execute(SQL_CREAR_PACIENTES)
+            self.conn.execute(SQL_CREAR_ALIMENTOS)
+            self.conn.execute(SQL_CREAR_PLAN_COMIDAS)
+        
+        # Índices y demás cambios de esquema versionados con PRAGMA user_version
+        aplicar_migraciones(self.conn)
     
     def close(self) -> None:
-        if self.conn:
+        self._cursores.clear()
+        if not self.solo_lectura:
+            # Cada conexión conoce las consultas que hizo; PRAGMA optimize usa eso para decidir
+            for conn in (self.pool.conexiones() if self.pool else [self.conn]):
+                optimizar_al_cerrar(conn, self.perfil)
+        if self.pool:
+            self.pool.cerrar()
+        elif self.conn:
             self.conn.close()
     
+    # --- Instrumentación ---
+    
+    def activar_instrumentacion(self, umbral_lento: Optional[float] = None) -> None:
+        """Empieza a medir los métodos del repositorio; las llamadas que tardan más de
+        umbral_lento segundos se registran en el logger app.repository.consultas_lentas.
+        """
+        if umbral_lento is not None:
+            self.instrumentacion.umbral_lento = umbral_lento
+        self._instalar_trace(self.instrumentacion.capturar_sentencia)
+        if not self.instrumentacion.activa:
+            # Los atributos de la instancia tapan a los métodos de la clase hasta desactivarla
+            for nombre in self._metodos_instrumentados():
+                setattr(self, nombre, _medido(self, getattr(self, nombre)))
+        self.instrumentacion.activa = True
+    
+    def desactivar_instrumentacion(self) -> None:
+        self.instrumentacion.activa = False
+        for nombre in self._metodos_instrumentados():
+            self.__dict__.pop(nombre, None)
+        self._instalar_trace(None)
+    
+    @classmethod
+    def _metodos_instrumentados(cls) -> List[str]:
+        return [nombre for nombre in dir(cls) if getattr(getattr(cls, nombre), 'instrumentado', False)]
+    
+    def estadisticas_instrumentacion(self) -> Dict[str, Dict]:
+        return self.instrumentacion.estadisticas()
+    
+    def _instalar_trace(self, callback: Optional[Callable[[str], None]]) -> None:
+        if self.pool:
+            self.pool.al_conectar = (lambda conn: conn.set_trace_callback(callback)) if callback else None
+            for conn in self.pool.conexiones():
+                conn.set_trace_callback(callback)
+        else:
+            self.conn.set_trace_callback(callback)
+    
+    def _explicar(self, sql: str) -> List[str]:
+        try:
+            with self._lectura() as conn:
+                return explicar_consulta(conn, sql)
+        except sqlite3.Error as e:
+            return [f"(sin plan: {e})"]
+    
+    @contextmanager
+    def _lectura(self) -> Iterator[sqlite3.Connection]:
+        if self.pool:
+            with self.pool.lectura() as conn:
+                yield conn
+        else:
+            yield self.conn
+    
+    def _escritura(self) -> ContextManager[sqlite3.Connection]:
+        """Entrega la conexión de escritura dentro de una transacción (commit o rollback al salir)."""
+        if self.pool:
+            return self._escritura_pool()
+        # La conexión ya es un context manager que se entrega a sí misma; evita el costo
+        # de un generador en cada escritura de los caminos calientes
+        return self.conn
+    
+    @contextmanager
+    def _escritura_pool(self) -> Iterator[sqlite3.Connection]:
+        with self.pool.escritura() as conn, conn:
+            yield conn
+    
+    def _insertar_en_lotes(self, sql: str, objetos: Iterable, a_fila, tamano_lote: int) -> range:
+        """Inserta los objetos en lotes con executemany dentro de una única transacción.
+        
+        Asigna el id generado a cada objeto y devuelve el rango de ids asignados.
+        """
+        if tamano_lote < 1:
+            raise ValueError("tamano_lote debe ser mayor que cero")
+        with self._escritura() as conn:
+            return self._insertar_lotes_en(conn, sql, objetos, a_fila, tamano_lote)
+    
+    def _insertar_lotes_en(self, conn: sqlite3.Connection, sql: str, objetos: Iterable, a_fila,
+                           tamano_lote: int) -> range:
+        """Igual que _insertar_en_lotes pero dentro de una transacción ya abierta por el llamador."""
+        iterador = iter(objetos)
+        primer_id = None
+        ultimo_id = None
+        while True:
+            lote = list(islice(iterador, tamano_lote))
+            if not lote:
+                break
+            conn.executemany(sql, (a_fila(obj) for obj in lote))
+            # Dentro de la transacción los ids de AUTOINCREMENT son consecutivos
+            ultimo_id = self._ejecutar(conn, SQL_ULTIMO_ID).fetchone()[0]
+            inicio_lote = ultimo_id - len(lote) + 1
+            for nuevo_id, obj in enumerate(lote, start=inicio_lote):
+                obj.id = nuevo_id
+            if primer_id is None:
+                primer_id = inicio_lote
+        
+        if primer_id is None:
+            return range(0)
+        return range(primer_id, ultimo_id + 1)
+    
+    def _ejecutar(self, conn: sqlite3.Connection, sql: str, parametros: tuple = (),
+                  fabrica: Optional[Callable[[sqlite3.Cursor, tuple], Any]] = None) -> sqlite3.Cursor:
+        """Ejecuta la sentencia en un cursor reutilizable de la conexión.
+        
+        Reutilizar el cursor evita crearlo y configurarlo en cada llamada de los caminos
+        calientes. Solo sirve para sentencias cuyo resultado se consume enseguida
+        (fetchone, lastrowid, rowcount): los listados perezosos usan su propio cursor.
+        """
+        clave = (conn, fabrica)
+        cursor = self._cursores.get(clave)
+        if cursor is None:
+            cursor = conn.cursor()
+            cursor.row_factory = fabrica
+            self._cursores[clave] = cursor
+        return cursor.execute(sql, parametros)
+    
+    @staticmethod
+    def consultar(conn: sqlite3.Connection, fabrica: Callable[[sqlite3.Cursor, tuple], Any], sql: str,
+                  parametros: tuple = ()) -> sqlite3.Cursor:
+        """Ejecuta la consulta en un cursor propio con la fábrica de filas indicada.
+        
+        Así cada fila se convierte una sola vez en el objeto final (modelo o dict)
+        sin crear antes un sqlite3.Row intermedio. La usan también las consultas propias
+        hechas sobre lectura().
+        """
+        cursor = conn.cursor()
+        cursor.row_factory = fabrica
+        return cursor.execute(sql, parametros)
+    
+    def _obtener_por_id(self, modelo: type, sql: str, entidad_id: int) -> Optional[Any]:
+        """Busca una fila por id pasando por el cache del modelo si está activo.
+        
+        El cache guarda la tupla de valores y no la instancia, así cada llamada devuelve
+        un objeto nuevo que el llamador puede modificar sin ensuciar el cache.
+        """
+        cache = self._caches.get(modelo)
+        generacion = None
+        if cache is not None:
+            valores = cache.obtener(entidad_id)
+            if valores is not None:
+                return modelo(*valores)
+            # Con pool, una escritura puede confirmarse e invalidar mientras se lee
+            generacion = cache.generacion()
+        if self.pool is None:
+            # Camino caliente sin pool: se evita el costo del context manager de _lectura
+            obj = self._ejecutar(self.conn, sql, (entidad_id,), modelo.row_factory).fetchone()
+        else:
+            with self.pool.lectura() as conn:
+                obj = self._ejecutar(conn, sql, (entidad_id,), modelo.row_factory).fetchone()
+        if obj is not None and cache is not None:
+            cache.guardar(entidad_id, tuple(getattr(obj, columna) for columna in modelo.COLUMNAS), generacion)
+        return obj
+    
+    def _obtener_varios(self, modelo: type, sql: str, ids: Iterable[int]) -> Dict[int, Any]:
+        """Busca muchos ids con una sola consulta, pasando por el cache del modelo si está activo.
+        
+        Devuelve un dict id -> objeto en el orden en que se pidieron los ids; los que no
+        existen no aparecen.
+        """
+        pedidos = list(dict.fromkeys(ids))
+        encontrados: Dict[int, Any] = {}
+        pendientes = pedidos
+        cache = self._caches.get(modelo)
+        generacion = None
+        if cache is not None:
+            generacion = cache.generacion()
+            pendientes = []
+            for entidad_id in pedidos:
+                valores = cache.obtener(entidad_id)
+                if valores is None:
+                    pendientes.append(entidad_id)
+                else:
+                    encontrados[entidad_id] = modelo(*valores)
+        if pendientes:
+            with self._lectura() as conn:
+                objetos = self.consultar(conn, modelo.row_factory, sql, (_lista_json(pendientes),)).fetchall()
+            for obj in objetos:
+                encontrados[obj.id] = obj
+                if cache is not None:
+                    cache.guardar(obj.id, tuple(getattr(obj, columna) for columna in modelo.COLUMNAS),
+                                  generacion)
+        return {entidad_id: encontrados[entidad_id] for entidad_id in pedidos if entidad_id in encontrados}
+    
+    def _invalidar(self, modelo: type, entidad_id: Optional[int]) -> None:
+        cache = self._caches.get(modelo)
+        if cache is not None:
+            cache.invalidar(entidad_id)
+    
+    def _invalidar_plan_del_paciente(self, paciente_id: Optional[int] = None,
+                                     fecha: Optional[str] = None) -> None:
+        """Descarta del cache el plan de ese paciente y fecha, o todos si no se indican.
+        
+        Solo el alta de un plan sabe exactamente qué día cambia; las demás escrituras (un
+        alimento que cambia de calorías, un plan que se mueve de fecha) vacían el cache entero.
+        """
+        cache = self._cache_plan_del_paciente
+        if cache is None:
+            return
+        if paciente_id is None:
+            cache.limpiar()
+        else:
+            cache.invalidar((paciente_id, fecha))
+    
+    def estadisticas_cache(self) -> Dict[str, Dict[str, int]]:
+        """Aciertos, fallos, desalojos y entradas de cada cache (vacío si el cache está desactivado)."""
+        estadisticas = {modelo.__name__: cache.estadisticas() for modelo, cache in self._caches.items()}
+        if self._cache_plan_del_paciente is not None:
+            estadisticas['plan_del_paciente'] = self._cache_plan_del_paciente.estadisticas()
+        return estadisticas
+    
+    def _pagina(self, fabrica: Callable[[sqlite3.Cursor, tuple], Any], sql: str,
+                despues_de_id: Optional[int], limite: Optional[int]) -> List[Any]:
+        """Ejecuta una consulta paginada por clave con parámetros (despues_de_id, limite)."""
+        with self._lectura() as conn:
+            cursor = self.consultar(
+                conn, fabrica, sql,
+                (despues_de_id if despues_de_id is not None else 0,
+                 limite if limite is not None else -1)
+            )
+            return cursor.fetchall()
+    
+    def _buscar(self, fabrica: Callable[[sqlite3.Cursor, tuple], Any], sql: str,
+                texto: str, limite: int) -> List[Any]:
+        consulta = consulta_fts(texto)
+        if not consulta:
+            return []
+        with self._lectura() as conn:
+            return self.consultar(conn, fabrica, sql, (consulta, limite)).fetchall()
+    
+    def _iterar(self, fabrica: Callable[[sqlite3.Cursor, tuple], Any], sql: str,
+                tamano_lectura: int, parametros: tuple = ()) -> Iterator[Any]:
+        """Recorre la consulta de a tamano_lectura filas sin materializar el resultado completo.
+        
+        La conexión de lectura queda tomada hasta que se agota o se descarta el iterador.
+        """
+        with self._lectura() as conn:
+            cursor = self.consultar(conn, fabrica, sql, parametros)
+            try:
+                while True:
+                    filas = cursor.fetchmany(tamano_lectura)
+                    if not filas:
+                        break
+                    yield from filas
+            finally:
+                cursor.close()
+    
+    # --- Acceso directo a la base ---
+    
+    def lectura(self) -> ContextManager[sqlite3.Connection]:
+        """Conexión para consultas que el repositorio no ofrece (exportaciones, fragmentos).
+        
+        Con pool es una conexión de lectura prestada al hilo hasta salir del bloque; sin
+        pool, la conexión única.
+        """
+        return self._lectura()
+    
+    def escritura(self) -> ContextManager[sqlite3.Connection]:
+        """Conexión de escritura dentro de una transacción: commit al salir, rollback si falla.
+        
+        Lo que se escribe por acá no pasa por los caches del repositorio: al terminar hay
+        que llamar a invalidar_caches().
+        """
+        return self._escritura()
+    
+    def invalidar_caches(self) -> None:
+        """Vacía los caches de pacientes, alimentos, planes y plan_del_paciente."""
+        for cache in self._caches.values():
+            cache.limpiar()
+        self._invalidar_plan_del_paciente()
+    
     # --- Métodos para Pacientes ---
     
+    @_instrumentado
     def crear_paciente(self, paciente: Paciente) -> int:
-        with self.conn:
-            cursor = self.conn.execute(
-                'INSERT INTO pacientes (nombre, edad, peso_actual) VALUES (?, ?, ?)',
+        with self._escritura() as conn:
+            cursor = self._ejecutar(
+                conn, SQL_INSERTAR_PACIENTE,
                 (paciente.nombre, paciente.edad, paciente.peso_actual)
             )
-            return cursor.lastrowid
+            # Dentro del bloque: el cursor es compartido y, sin el lock, otro hilo podría pisar lastrowid
+            nuevo_id = cursor.lastrowid
+        self._invalidar_plan_del_paciente()
+        return nuevo_id
+    
+    @_instrumentado
+    def crear_pacientes_bulk(self, pacientes: Iterable[Paciente],
+                             tamano_lote: int = TAMANO_LOTE_POR_DEFECTO) -> range:
+        ids = self._insertar_en_lotes(
+            SQL_INSERTAR_PACIENTE,
+            pacientes,
+            lambda p: (p.nombre, p.edad, p.peso_actual),
+            tamano_lote
+        )
+        self._invalidar_plan_del_paciente()
+        return ids
     
+    @_instrumentado
     def obtener_paciente(self, paciente_id: int) -> Optional[Paciente]:
-        cursor = self.conn.execute('SELECT * FROM pacientes WHERE id = ?', (paciente_id,))
-        row = cursor.fetchone()
-        if row:
-            return Paciente(
-                id=row['id'],
-                nombre=row['nombre'],
-                edad=row['edad'],
-                peso_actual=row['peso_actual']
-            )
-        return None
+        return self._obtener_por_id(Paciente, SQL_OBTENER_PACIENTE, paciente_id)
+    
+    @_instrumentado
+    def obtener_pacientes(self, paciente_ids: Iterable[int]) -> Dict[int, Paciente]:
+        """Varios pacientes en una consulta: dict id -> Paciente, sin los ids que no existen."""
+        return self._obtener_varios(Paciente, SQL_OBTENER_PACIENTES, paciente_ids)
     
-    def listar_pacientes(self) -> List[Paciente]:
-        cursor = self.conn.execute('SELECT * FROM pacientes')
-        return [Paciente(
-            id=row['id'],
-            nombre=row['nombre'],
-            edad=row['edad'],
-            peso_actual=row['peso_actual']
-        ) for row in cursor.fetchall()]
+    @_instrumentado
+    def listar_pacientes(self, despues_de_id: Optional[int] = None,
+                         limite: Optional[int] = None) -> List[Paciente]:
+        if despues_de_id is None and limite is None:
+            return list(self.iter_pacientes())
+        return self._pagina(Paciente.row_factory, SQL_PAGINA_PACIENTES, despues_de_id, limite)
     
+    @_instrumentado
+    def iter_pacientes(self, tamano_lectura: int = TAMANO_LECTURA_POR_DEFECTO) -> Iterator[Paciente]:
+        return self._iterar(Paciente.row_factory, SQL_SELECT_PACIENTES, tamano_lectura)
+    
+    @_instrumentado
+    def buscar_pacientes(self, texto: str, limite: int = LIMITE_BUSQUEDA_POR_DEFECTO) -> List[Paciente]:
+        """Busca pacientes por nombre o apellido, sin distinguir acentos ni mayúsculas."""
+        return self._buscar(Paciente.row_factory, SQL_BUSCAR_PACIENTES, texto, limite)
+    
+    @_instrumentado
     def actualizar_paciente(self, paciente: Paciente) -> bool:
-        with self.conn:
-            cursor = self.conn.execute(
-                'UPDATE pacientes SET nombre = ?, edad = ?, peso_actual = ? WHERE id = ?',
+        with self._escritura() as conn:
+            cursor = self._ejecutar(
+                conn, SQL_ACTUALIZAR_PACIENTE,
                 (paciente.nombre, paciente.edad, paciente.peso_actual, paciente.id)
             )
-            return cursor.rowcount > 0
+            modificado = cursor.rowcount > 0
+        self._invalidar(Paciente, paciente.id)
+        return modificado
     
+    @_instrumentado
     def eliminar_paciente(self, paciente_id: int) -> bool:
-        with self.conn:
-            cursor = self.conn.execute('DELETE FROM pacientes WHERE id = ?', (paciente_id,))
-            return cursor.rowcount > 0
+        with self._escritura() as conn:
+            cursor = self._ejecutar(conn, SQL_ELIMINAR_PACIENTE, (paciente_id,))
+            modificado = cursor.rowcount > 0
+        self._invalidar(Paciente, paciente_id)
+        self._invalidar_plan_del_paciente()
+        return modificado
     
     # --- Métodos para Alimentos ---
     
+    @_instrumentado
     def crear_alimento(self, alimento: Alimento) -> int:
-        with self.conn:
-            cursor = self.conn.execute(
-                'INSERT INTO alimentos (nombre, calorias) VALUES (?, ?)',
+        with self._escritura() as conn:
+            cursor = self._ejecutar(
+                conn, SQL_INSERTAR_ALIMENTO,
                 (alimento.nombre, alimento.calorias)
             )
-            return cursor.lastrowid
+            nuevo_id = cursor.lastrowid
+        self._invalidar_plan_del_paciente()
+        return nuevo_id
     
+    @_instrumentado
+    def crear_alimentos_bulk(self, alimentos: Iterable[Alimento],
+                             tamano_lote: int = TAMANO_LOTE_POR_DEFECTO) -> range:
+        ids = self._insertar_en_lotes(
+            SQL_INSERTAR_ALIMENTO,
+            alimentos,
+            lambda a: (a.nombre, a.calorias),
+            tamano_lote
+        )
+        self._invalidar_plan_del_paciente()
+        return ids
+    
+    @_instrumentado
     def obtener_alimento(self, alimento_id: int) -> Optional[Alimento]:
-        cursor = self.conn.execute('SELECT * FROM alimentos WHERE id = ?', (alimento_id,))
-        row = cursor.fetchone()
-        if row:
-            return Alimento(
-                id=row['id'],
-                nombre=row['nombre'],
-                calorias=row['calorias']
-            )
-        return None
+        return self._obtener_por_id(Alimento, SQL_OBTENER_ALIMENTO, alimento_id)
     
-    def listar_alimentos(self) -> List[Alimento]:
-        cursor = self.conn.execute('SELECT * FROM alimentos')
-        return [Alimento(
-            id=row['id'],
-            nombre=row['nombre'],
-            calorias=row['calorias']
-        ) for row in cursor.fetchall()]
+    @_instrumentado
+    def obtener_alimentos(self, alimento_ids: Iterable[int]) -> Dict[int, Alimento]:
+        """Varios alimentos en una consulta: dict id -> Alimento, sin los ids que no existen."""
+        return self._obtener_varios(Alimento, SQL_OBTENER_ALIMENTOS, alimento_ids)
     
+    @_instrumentado
+    def listar_alimentos(self, despues_de_id: Optional[int] = None,
+                         limite: Optional[int] = None) -> List[Alimento]:
+        if despues_de_id is None and limite is None:
+            return list(self.iter_alimentos())
+        return self._pagina(Alimento.row_factory, SQL_PAGINA_ALIMENTOS, despues_de_id, limite)
+    
+    @_instrumentado
+    def iter_alimentos(self, tamano_lectura: int = TAMANO_LECTURA_POR_DEFECTO) -> Iterator[Alimento]:
+        return self._iterar(Alimento.row_factory, SQL_SELECT_ALIMENTOS, tamano_lectura)
+    
+    @_instrumentado
+    def buscar_alimentos(self, texto: str, limite: int = LIMITE_BUSQUEDA_POR_DEFECTO) -> List[Alimento]:
+        """Busca alimentos por nombre; los más relevantes primero."""
+        return self._buscar(Alimento.row_factory, SQL_BUSCAR_ALIMENTOS, texto, limite)
+    
+    @_instrumentado
     def actualizar_alimento(self, alimento: Alimento) -> bool:
-        with self.conn:
-            cursor = self.conn.execute(
-                'UPDATE alimentos SET nombre = ?, calorias = ? WHERE id = ?',
+        with self._escritura() as conn:
+            cursor = self._ejecutar(
+                conn, SQL_ACTUALIZAR_ALIMENTO,
                 (alimento.nombre, alimento.calorias, alimento.id)
             )
-            return cursor.rowcount > 0
+            modificado = cursor.rowcount > 0
+        self._invalidar(Alimento, alimento.id)
+        self._invalidar_plan_del_paciente()
+        return modificado
     
+    @_instrumentado
     def eliminar_alimento(self, alimento_id: int) -> bool:
-        with self.conn:
-            cursor = self.conn.execute('DELETE FROM alimentos WHERE id = ?', (alimento_id,))
-            return cursor.rowcount > 0
+        with self._escritura() as conn:
+            cursor = self._ejecutar(conn, SQL_ELIMINAR_ALIMENTO, (alimento_id,))
+            modificado = cursor.rowcount > 0
+        self._invalidar(Alimento, alimento_id)
+        self._invalidar_plan_del_paciente()
+        return modificado
     
     # --- Metodos para Planes de Comida ---
     
+    @_instrumentado
     def crear_plan_comida(self, plan: PlanComida) -> int:
-        with self.conn:
-            cursor = self.conn.execute(
-                'INSERT INTO plan_comidas (paciente_id, alimento_id, fecha, cantidad) VALUES (?, ?, ?, ?)',
-                (plan.paciente_id, plan.alimento_id, plan.fecha, plan.cantidad)
+        """Acepta la fecha en cualquier forma válida ("2023-6-5") y la guarda canónica."""
+        fecha = fecha_canonica(plan.fecha)
+        with self._escritura() as conn:
+            cursor = self._ejecutar(
+                conn, SQL_INSERTAR_PLAN,
+                (plan.paciente_id, plan.alimento_id, fecha, plan.cantidad)
             )
-            return cursor.lastrowid
+            nuevo_id = cursor.lastrowid
+        self._invalidar_plan_del_paciente(plan.paciente_id, fecha)
+        return nuevo_id
     
+    @_instrumentado
+    def crear_planes_comida_bulk(self, planes: Iterable[PlanComida],
+                                 tamano_lote: int = TAMANO_LOTE_POR_DEFECTO) -> range:
+        ids = self._insertar_en_lotes(
+            SQL_INSERTAR_PLAN,
+            planes,
+            lambda pc: (pc.paciente_id, pc.alimento_id, fecha_canonica(pc.fecha), pc.cantidad),
+            tamano_lote
+        )
+        self._invalidar_plan_del_paciente()
+        return ids
+    
+    @_instrumentado
     def obtener_plan_comida(self, plan_id: int) -> Optional[PlanComida]:
-        cursor = self.conn.execute('SELECT * FROM plan_comidas WHERE id = ?', (plan_id,))
-        row = cursor.fetchone()
-        if row:
-            return PlanComida(
-                id=row['id'],
-                paciente_id=row['paciente_id'],
-                alimento_id=row['alimento_id'],
-                fecha=row['fecha'],
-                cantidad=row['cantidad']
-            )
-        return None
-    
-    def listar_planes_comida(self) -> List[Dict]:
-        cursor = self.conn.execute('''
-            SELECT 
-                pc.id, 
-                p.nombre AS paciente_nombre, 
-                a.nombre AS alimento_nombre,
-                pc.fecha, 
-                pc.cantidad,
-                a.calorias * pc.cantidad AS calorias_totales
-            FROM plan_comidas pc
-            JOIN pacientes p ON pc.paciente_id = p.id
-            JOIN alimentos a ON pc.alimento_id = a.id
-        ''')
-        return [dict(row) for row in cursor.fetchall()]
+        return self._obtener_por_id(PlanComida, SQL_OBTENER_PLAN, plan_id)
     
+    @_instrumentado
+    def obtener_planes_comida(self, plan_ids: Iterable[int]) -> Dict[int, PlanComida]:
+        """Varios planes en una consulta: dict id -> PlanComida, sin los ids que no existen."""
+        return self._obtener_varios(PlanComida, SQL_OBTENER_PLANES, plan_ids)
+    
+    @_instrumentado
+    def listar_planes_paciente(self, paciente_id: int) -> List[PlanComida]:
+        """Planes de un paciente ordenados por fecha (usa el índice (paciente_id, fecha))."""
+        with self._lectura() as conn:
+            cursor = self.consultar(conn, PlanComida.row_factory, SQL_PLANES_PACIENTE, (paciente_id,))
+            return cursor.fetchall()
+    
+    @_instrumentado
+    def listar_planes_comida(self, despues_de_id: Optional[int] = None,
+                             limite: Optional[int] = None) -> List[Dict]:
+        """Lista los planes con detalle ordenados por id.
+        
+        Para paginar se pasa como despues_de_id el último id de la página anterior
+        (paginación por clave): cada página cuesta lo mismo sin importar su posición.
+        """
+        if despues_de_id is None and limite is None:
+            return list(self.iter_planes_comida())
+        return self._pagina(_fila_a_dict, SQL_PAGINA_PLANES_DETALLE, despues_de_id, limite)
+    
+    @_instrumentado
+    def iter_planes_comida(self, tamano_lectura: int = TAMANO_LECTURA_POR_DEFECTO) -> Iterator[Dict]:
+        return self._iterar(_fila_a_dict, SQL_LISTAR_PLANES_DETALLE, tamano_lectura)
+    
+    @_instrumentado
+    def plan_del_paciente(self, paciente_id: int, fecha: str) -> List[Dict]:
+        """Plan del paciente para un día, con nombre del alimento y calorías de cada ítem.
+        
+        Devuelve lo mismo que listar_planes_comida filtrado por paciente y fecha, pero leído
+        de planes_paciente_detalle, una copia ya unida que los triggers actualizan en la misma
+        transacción que cada cambio de planes, alimentos o pacientes. Esa tabla nunca está
+        desactualizada: una lectura ve el plan tal como quedó tras la última escritura confirmada.
+        
+        Con tamano_cache el resultado además se guarda en memoria. Las escrituras hechas por
+        este repositorio lo invalidan enseguida; las de otros procesos o conexiones no se
+        enteran, así que en ese caso el plan puede estar atrasado hasta ttl_cache segundos
+        (sin ttl_cache, hasta que se desaloje la entrada).
+        """
+        fecha_canonica = normalizar_fecha(fecha)
+        if fecha_canonica is None:
+            raise ValueError(f"Fecha inválida: {fecha!r}")
+        cache = self._cache_plan_del_paciente
+        clave = (paciente_id, fecha_canonica)
+        generacion = None
+        if cache is not None:
+            filas = cache.obtener(clave)
+            if filas is not None:
+                return [dict(zip(_COLUMNAS_PLAN_DEL_PACIENTE, fila)) for fila in filas]
+            generacion = cache.generacion()
+        with self._lectura() as conn:
+            filas = self._ejecutar(conn, SQL_PLAN_DEL_PACIENTE, clave).fetchall()
+        if cache is not None:
+            cache.guardar(clave, tuple(tuple(fila) for fila in filas), generacion)
+        return [dict(zip(_COLUMNAS_PLAN_DEL_PACIENTE, fila)) for fila in filas]
+    
+    @_instrumentado
+    def planes_por_paciente_y_rango(self, paciente_id: int, desde: str, hasta: str) -> List[PlanComida]:
+        """Planes del paciente con fecha entre desde y hasta (inclusive), ordenados por fecha.
+        
+        Como las fechas se guardan como YYYY-MM-DD, el rango se resuelve recorriendo solo
+        ese tramo del índice (paciente_id, fecha). Los límites se aceptan en cualquier forma
+        válida ("2023-6-1") y se normalizan antes de comparar.
+        """
+        desde_canonica = normalizar_fecha(desde)
+        hasta_canonica = normalizar_fecha(hasta)
+        if desde_canonica is None or hasta_canonica is None:
+            raise ValueError(f"Rango de fechas inválido: {desde!r} - {hasta!r}")
+        with self._lectura() as conn:
+            cursor = self.consultar(conn, PlanComida.row_factory, SQL_PLANES_PACIENTE_RANGO,
+                                    (paciente_id, desde_canonica, hasta_canonica))
+            return cursor.fetchall()
+    
+    @_instrumentado
+    def planes_con_detalle(self, paciente_ids: Iterable[int], desde: Optional[str] = None,
+                           hasta: Optional[str] = None) -> List[Tuple[PlanComida, Paciente, Alimento]]:
+        """Planes de varios pacientes, entre desde y hasta (inclusive), con su paciente y su alimento.
+        
+        Son tres consultas en total, sin importar cuántos planes haya: los planes de todos los
+        pacientes (un recorrido del índice (paciente_id, fecha) por paciente) y después sus
+        pacientes y alimentos por id, con obtener_pacientes y obtener_alimentos. Sale más
+        barato que un JOIN, que busca paciente y alimento otra vez en cada fila. Cada paciente
+        y cada alimento se arma una sola vez: los planes que los comparten reciben el mismo
+        objeto. Ordenados por paciente, fecha e id; los planes cuyo paciente o alimento ya no
+        existe no aparecen.
+        """
+        desde_canonica = normalizar_fecha(desde) if desde is not None else '0001-01-01'
+        hasta_canonica = normalizar_fecha(hasta) if hasta is not None else '9999-12-31'
+        if desde_canonica is None or hasta_canonica is None:
+            raise ValueError(f"Rango de fechas inválido: {desde!r} - {hasta!r}")
+        with self._lectura() as conn:
+            planes = self.consultar(
+                conn, PlanComida.row_factory, SQL_PLANES_PACIENTES_RANGO,
+                (_lista_json(list(dict.fromkeys(paciente_ids))), desde_canonica, hasta_canonica)
+            ).fetchall()
+            pacientes = self.obtener_pacientes(plan.paciente_id for plan in planes)
+            alimentos = self.obtener_alimentos(plan.alimento_id for plan in planes)
+        return [
+            (plan, pacientes[plan.paciente_id], alimentos[plan.alimento_id])
+            for plan in planes
+            if plan.paciente_id in pacientes and plan.alimento_id in alimentos
+        ]
+    
+    @_instrumentado
+    def calorias_por_dia(self, paciente_id: int, desde: Optional[str] = None,
+                         hasta: Optional[str] = None) -> List[Dict]:
+        """Devuelve las calorías totales por día del paciente entre desde y hasta (inclusive).
+        
+        Se responde desde la tabla calorias_diarias, que los triggers mantienen al día,
+        así que el costo depende de la cantidad de días y no de la cantidad de planes.
+        Los límites se normalizan como en planes_por_paciente_y_rango.
+        """
+        desde_canonica = normalizar_fecha(desde) if desde is not None else None
+        hasta_canonica = normalizar_fecha(hasta) if hasta is not None else None
+        if (desde is not None and desde_canonica is None) or (hasta is not None and hasta_canonica is None):
+            raise ValueError(f"Rango de fechas inválido: {desde!r} - {hasta!r}")
+        desde, hasta = desde_canonica, hasta_canonica
+        if desde is not None and hasta is not None:
+            sql, parametros = SQL_CALORIAS_DIA_RANGO, (paciente_id, desde, hasta)
+        elif desde is not None:
+            sql, parametros = SQL_CALORIAS_DIA_DESDE, (paciente_id, desde)
+        elif hasta is not None:
+            sql, parametros = SQL_CALORIAS_DIA_HASTA, (paciente_id, hasta)
+        else:
+            sql, parametros = SQL_CALORIAS_DIA, (paciente_id,)
+        with self._lectura() as conn:
+            cursor = self.consultar(conn, _fila_a_dict, sql, parametros)
+            return cursor.fetchall()
+    
+    @_instrumentado
     def actualizar_plan_comida(self, plan: PlanComida) -> bool:
-        with self.conn:
-            cursor = self.conn.execute(
-                'UPDATE plan_comidas SET paciente_id = ?, alimento_id = ?, fecha = ?, cantidad = ? WHERE id = ?',
-                (plan.paciente_id, plan.alimento_id, plan.fecha, plan.cantidad, plan.id)
+        with self._escritura() as conn:
+            cursor = self._ejecutar(
+                conn, SQL_ACTUALIZAR_PLAN,
+                (plan.paciente_id, plan.alimento_id, fecha_canonica(plan.fecha), plan.cantidad, plan.id)
             )
-            return cursor.rowcount > 0
+            modificado = cursor.rowcount > 0
+        self._invalidar(PlanComida, plan.id)
+        self._invalidar_plan_del_paciente()
+        return modificado
     
+    @_instrumentado
     def eliminar_plan_comida(self, plan_id: int) -> bool:
-        with self.conn:
-            cursor = self.conn.execute('DELETE FROM plan_comidas WHERE id = ?', (plan_id,))
-            return cursor.rowcount > 0
+        with self._escritura() as conn:
+            cursor = self._ejecutar(conn, SQL_ELIMINAR_PLAN, (plan_id,))
+            modificado = cursor.rowcount > 0
+        self._invalidar(PlanComida, plan_id)
+        self._invalidar_plan_del_paciente()
+        return modificado
     
+    @_instrumentado
     def actualizar_peso_paciente(self, paciente_id: int, nuevo_peso: float) -> bool:
-        with self.conn:
-            cursor = self.conn.execute(
-                'UPDATE pacientes SET peso_actual = ? WHERE id = ?',
+        with self._escritura() as conn:
+            cursor = self._ejecutar(
+                conn, SQL_ACTUALIZAR_PESO_PACIENTE,
                 (nuevo_peso, paciente_id)
             )
-            return cursor.rowcount > 0
+            modificado = cursor.rowcount > 0
+        self._invalidar(Paciente, paciente_id)
+        return modificado
     
+    @contextmanager
+    def unidad_de_trabajo(self, tamano_lote: int = TAMANO_LOTE_POR_DEFECTO) -> Iterator[UnidadDeTrabajo]:
+        """Abre una unidad de trabajo que se confirma al salir del bloque sin errores.
+        
+            with repo.unidad_de_trabajo() as uow:
+                paciente = uow.crear(Paciente(nombre="Ana", edad=30, peso_actual=60.0))
+                uow.crear(PlanComida(fecha="2023-06-15", cantidad=1.0, alimento_id=3), paciente=paciente)
+        
+        Si el bloque lanza una excepción no se escribe nada.
+        """
+        uow = UnidadDeTrabajo(self, tamano_lote)
+        yield uow
+        uow.confirmar()
+    
+    def escritor_agrupado(self, max_lote: Optional[int] = None,
+                          ventana: Optional[float] = None) -> "EscritorAgrupado":
+        """Crea un escritor en segundo plano que confirma juntas las escrituras sueltas.
+        
+        Conviene cuando muchos hilos o pedidos crean o actualizan filas de a una: en vez de
+        un COMMIT (y un fsync) por llamada hay uno por lote. Ver EscritorAgrupado; sin
+        max_lote ni ventana se usan MAX_LOTE_POR_DEFECTO y VENTANA_POR_DEFECTO.
+        """
+        # Se importa acá: concurrent.futures pesa en el arranque de los procesos que no lo usan
+        from app.repository.escritor_agrupado import EscritorAgrupado, MAX_LOTE_POR_DEFECTO, VENTANA_POR_DEFECTO
+        return EscritorAgrupado(self, max_lote if max_lote is not None else MAX_LOTE_POR_DEFECTO,
+                                ventana if ventana is not None else VENTANA_POR_DEFECTO)
+    
+    def respaldar(self, destino: str, paginas_por_paso: int = PAGINAS_POR_PASO_POR_DEFECTO,
+                  pausa: float = PAUSA_POR_DEFECTO,
+                  progreso: Optional[Callable[[int, int], None]] = None) -> Dict[str, float]:
+        """Copia la base a destino sin detener el servicio, de a paginas_por_paso páginas.
+        
+        Se copia desde la conexión de escritura: con el pool, las escrituras de otros hilos
+        esperan solo mientras dura cada paso y entran en la pausa entre pasos, y quedan
+        incluidas en la copia. progreso(copiadas, total) se llama después de cada paso. Ver
+        app.repository.respaldo.respaldar.
+        """
+        lock = self.pool._lock_escritura if self.pool else None
+        return respaldar(self.conn, destino, paginas_por_paso, pausa, progreso, lock)
+    
+    def instantanea(self, destino: str, paginas_por_paso: int = PAGINAS_POR_PASO_POR_DEFECTO,
+                    pausa: float = PAUSA_POR_DEFECTO, progreso: Optional[Callable[[int, int], None]] = None,
+                    **opciones) -> "NutricionistaRepo":
+        """Respalda la base en destino y la abre en solo lectura.
+        
+        El repositorio que se devuelve ve los datos tal como estaban al terminar la copia,
+        así un reporte pesado no compite con las escrituras de la base principal. Las
+        opciones se pasan a NutricionistaRepo (por ejemplo perfil="read_heavy").
+        """
+        self.respaldar(destino, paginas_por_paso, pausa, progreso)
+        return NutricionistaRepo(destino, solo_lectura=True, **opciones)
+    
+    @_instrumentado
     def crear_todo_nuevo(self, paciente: Paciente, alimento: Alimento, plan: PlanComida) -> Tuple[int, int, int]:
         try:
-            self.conn.execute("BEGIN TRANSACTION")
-            
-            # Crear paciente
-            cursor = self.conn.execute(
-                'INSERT INTO pacientes (nombre, edad, peso_actual) VALUES (?, ?, ?)',
-                (paciente.nombre, paciente.edad, paciente.peso_actual)
-            )
-            paciente_id = cursor.lastrowid
-            
-            # Crear alimento
-            cursor = self.conn.execute(
-                'INSERT INTO alimentos (nombre, calorias) VALUES (?, ?)',
-                (alimento.nombre, alimento.calorias)
-            )
-            alimento_id = cursor.lastrowid
-            
-            # Crear plan de comida
-            plan.paciente_id = paciente_id
-            plan.alimento_id = alimento_id
-            cursor = self.conn.execute(
-                'INSERT INTO plan_comidas (paciente_id, alimento_id, fecha, cantidad) VALUES (?, ?, ?, ?)',
-                (plan.paciente_id, plan.alimento_id, plan.fecha, plan.cantidad)
-            )
-            plan_id = cursor.lastrowid
-            
-            self.conn.commit()
-            return paciente_id, alimento_id, plan_id
-        
+            with self.unidad_de_trabajo() as uow:
+                uow.crear(paciente)
+                uow.crear(alimento)
+                uow.crear(plan, paciente=paciente, alimento=alimento)
         except Exception as e:
-            self.conn.rollback()
             print(f"Error en la transacción: {e}")
-            raise
\ No newline at end of file
+            raise
+        return paciente.id, alimento.id, plan.id
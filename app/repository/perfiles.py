@@ -0,0 +1,74 @@
+import sqlite3
+from typing import Dict, Optional, Tuple, Union
+
+# PRAGMAs de cada perfil, en el orden en que se aplican. page_size va primero porque solo
+# tiene efecto en una base vacía y antes de pasar a WAL (después queda fijo en el archivo).
+# cache_size negativo está en KiB; mmap_size en bytes.
+PERFILES: Dict[str, Tuple[Tuple[str, Union[int, str]], ...]] = {
+    # Cargas e importaciones grandes: cache amplio y sin fsync por transacción. En WAL un
+    # corte de energía puede perder las últimas transacciones pero no corromper la base.
+    'bulk_load': (
+        ('page_size', 8192),
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'OFF'),
+        ('cache_size', -262144),
+        ('temp_store', 'MEMORY'),
+        ('mmap_size', 268435456),
+    ),
+    # Tableros y reportes: las lecturas van por mmap sin copiar páginas al cache de SQLite
+    'read_heavy': (
+        ('page_size', 4096),
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('cache_size', -65536),
+        ('temp_store', 'MEMORY'),
+        ('mmap_size', 1073741824),
+    ),
+    # Equipos chicos o muchos procesos a la vez: poco cache, temporales en disco y sin mmap
+    'low_memory': (
+        ('page_size', 4096),
+        ('journal_mode', 'DELETE'),
+        ('synchronous', 'FULL'),
+        ('cache_size', -2048),
+        ('temp_store', 'FILE'),
+        ('mmap_size', 0),
+    ),
+}
+
+# Perfiles que al cerrar recalculan las estadísticas de todas las tablas con ANALYZE; los
+# demás usan PRAGMA optimize, que solo analiza lo que hace falta
+_ANALIZAR_AL_CERRAR = ('bulk_load',)
+
+# PRAGMAs que cambian el archivo y no los puede tocar una conexión de solo lectura (ni una
+# del pool, que siempre usa WAL)
+_PRAGMAS_DEL_ARCHIVO = ('page_size', 'journal_mode')
+
+
+def validar_perfil(perfil: Optional[str]) -> Optional[str]:
+    if perfil is not None and perfil not in PERFILES:
+        raise ValueError(f"Perfil desconocido: {perfil!r} (se espera uno de {', '.join(PERFILES)})")
+    return perfil
+
+
+def aplicar_perfil(conn: sqlite3.Connection, perfil: Optional[str], cambiar_archivo: bool = True) -> None:
+    """Aplica los PRAGMAs del perfil a la conexión (sin perfil, no cambia nada).
+
+    Con cambiar_archivo=False se omiten page_size y journal_mode.
+    """
+    if perfil is None:
+        return
+    for pragma, valor in PERFILES[validar_perfil(perfil)]:
+        if cambiar_archivo or pragma not in _PRAGMAS_DEL_ARCHIVO:
+            conn.execute(f'PRAGMA {pragma} = {valor}')
+
+
+def optimizar_al_cerrar(conn: sqlite3.Connection, perfil: Optional[str]) -> None:
+    """Actualiza las estadísticas del planificador antes de cerrar la conexión.
+
+    Si la base está ocupada por otro proceso (o la conexión ya se cerró) se deja para el
+    próximo cierre: no vale la pena que close() falle por esto.
+    """
+    try:
+        conn.execute('ANALYZE' if perfil in _ANALIZAR_AL_CERRAR else 'PRAGMA optimize')
+    except sqlite3.Error:
+        pass
@@ -0,0 +1,120 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from app.repository.perfiles import aplicar_perfil
+
+
+def abrir_conexion(db_path: str, solo_lectura: bool = False, **opciones) -> sqlite3.Connection:
+    """sqlite3.connect que, con solo_lectura, abre la base con una URI mode=ro.
+    
+    Una conexión de solo lectura no crea el archivo si no existe y cualquier escritura
+    falla con sqlite3.OperationalError.
+    """
+    if solo_lectura:
+        # En una URI de SQLite solo hay que escapar %, ? y # dentro de la ruta
+        ruta = os.path.abspath(db_path).replace('%', '%25').replace('?', '%3f').replace('#', '%23')
+        return sqlite3.connect(f'file:{ruta}?mode=ro', uri=True, **opciones)
+    return sqlite3.connect(db_path, **opciones)
+
+
+class PoolConexiones:
+    """Pool de conexiones SQLite en modo WAL: varios lectores concurrentes y un único escritor.
+    
+    Las conexiones de lectura se prestan por hilo (un hilo reutiliza la misma mientras
+    la tenga tomada) y la conexión de escritura se serializa con un lock, que es lo que
+    SQLite admite de todas formas: un solo escritor a la vez.
+    """
+    
+    def __init__(self, db_path: str, tamano: int = 4, timeout: float = 5.0,
+                 cached_statements: int = 128, solo_lectura: bool = False,
+                 perfil: Optional[str] = None):
+        if tamano < 1:
+            raise ValueError("tamano debe ser mayor que cero")
+        self.db_path = db_path
+        self.tamano = tamano
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.solo_lectura = solo_lectura
+        self.perfil = perfil
+        
+        self._disponibles: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lectoras: List[sqlite3.Connection] = []
+        self._lock_pool = threading.Lock()
+        self._local = threading.local()
+        
+        # Se llama con cada conexión nueva (por ejemplo, para instalar un trace callback)
+        self.al_conectar: Optional[Callable[[sqlite3.Connection], None]] = None
+        
+        self._lock_escritura = threading.RLock()
+        self.escritor = self._conectar()
+    
+    def _conectar(self) -> sqlite3.Connection:
+        # check_same_thread=False porque la conexión pasa de un hilo a otro a través del pool
+        conn = abrir_conexion(self.db_path, self.solo_lectura, timeout=self.timeout,
+                              check_same_thread=False, cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA busy_timeout = {int(self.timeout * 1000)}')
+        if not self.solo_lectura:
+            # El modo WAL queda guardado en el archivo; una conexión de solo lectura no puede cambiarlo
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+        # El pool siempre trabaja en WAL: del perfil solo se toman los PRAGMAs de la conexión
+        aplicar_perfil(conn, self.perfil, cambiar_archivo=False)
+        if self.al_conectar is not None:
+            self.al_conectar(conn)
+        return conn
+    
+    def conexiones(self) -> List[sqlite3.Connection]:
+        with self._lock_pool:
+            return [self.escritor, *self._lectoras]
+    
+    def _tomar_lectora(self) -> sqlite3.Connection:
+        try:
+            return self._disponibles.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock_pool:
+            if len(self._lectoras) < self.tamano:
+                conn = self._conectar()
+                self._lectoras.append(conn)
+                return conn
+        try:
+            return self._disponibles.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("No hay conexiones de lectura disponibles en el pool")
+    
+    @contextmanager
+    def lectura(self) -> Iterator[sqlite3.Connection]:
+        # El hilo reutiliza la conexión que ya tiene tomada (por ejemplo, un listado en
+        # curso). Los préstamos no siempre terminan en orden inverso: dos generadores iter_*
+        # intercalados en el mismo hilo cierran en cualquier orden, así que la conexión se
+        # devuelve cuando termina el último préstamo y no el primero que se abrió.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._tomar_lectora()
+            self._local.conn = conn
+            self._local.prestamos = 0
+        self._local.prestamos += 1
+        try:
+            yield conn
+        finally:
+            self._local.prestamos -= 1
+            if self._local.prestamos == 0:
+                self._local.conn = None
+                self._disponibles.put(conn)
+    
+    @contextmanager
+    def escritura(self) -> Iterator[sqlite3.Connection]:
+        with self._lock_escritura:
+            yield self.escritor
+    
+    def cerrar(self) -> None:
+        with self._lock_escritura, self._lock_pool:
+            for conn in self._lectoras:
+                conn.close()
+            self._lectoras.clear()
+            self.escritor.close()
@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, Optional
+
+# Páginas que se copian por paso: con páginas de 4 KiB son 4 MiB, que SQLite copia en
+# unos pocos milisegundos. Durante cada paso las escrituras del repositorio esperan.
+PAGINAS_POR_PASO_POR_DEFECTO = 1024
+
+# Segundos de pausa entre pasos, para que las escrituras pendientes entren y el disco no
+# quede ocupado solo con el respaldo
+PAUSA_POR_DEFECTO = 0.005
+
+
+def respaldar(origen: sqlite3.Connection, destino: str,
+              paginas_por_paso: int = PAGINAS_POR_PASO_POR_DEFECTO, pausa: float = PAUSA_POR_DEFECTO,
+              progreso: Optional[Callable[[int, int], None]] = None,
+              lock: Optional[threading.RLock] = None) -> Dict[str, float]:
+    """Copia la base de origen a destino con la API de respaldo en línea de SQLite.
+
+    La copia avanza de a paginas_por_paso páginas con una pausa entre pasos. Si se pasa
+    lock (el de la conexión de escritura), se toma durante cada paso y se suelta en la
+    pausa: las escrituras hechas por esa misma conexión entre pasos se copian también, así
+    que el resultado es la base tal como quedó al terminar. Una escritura de otra conexión
+    u otro proceso hace que SQLite empiece la copia de nuevo.
+
+    Se copia primero a un archivo temporal al lado de destino que se renombra al final,
+    así destino nunca queda a medio escribir. progreso(copiadas, total) se llama después de
+    cada paso. Devuelve las páginas copiadas, los pasos, los segundos que tomó y lo que
+    duró el paso más largo (lo máximo que una escritura pudo esperar por el respaldo).
+    """
+    if paginas_por_paso < 1:
+        raise ValueError("paginas_por_paso debe ser mayor que cero")
+    if pausa < 0:
+        raise ValueError("pausa no puede ser negativa")
+    carpeta = os.path.dirname(destino)
+    if carpeta and not os.path.isdir(carpeta):
+        os.makedirs(carpeta, exist_ok=True)
+    temporal = destino + '.parcial'
+    for sufijo in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(temporal + sufijo):
+            os.remove(temporal + sufijo)
+
+    pasos = 0
+    paginas = 0
+    paso_maximo = 0.0
+    inicio_paso = 0.0
+
+    def al_avanzar(estado: int, restantes: int, total: int) -> None:
+        nonlocal pasos, paginas, paso_maximo, inicio_paso
+        pasos += 1
+        paginas = total
+        paso_maximo = max(paso_maximo, time.perf_counter() - inicio_paso)
+        if progreso is not None:
+            progreso(total - restantes, total)
+        if restantes and lock is not None:
+            lock.release()
+            try:
+                time.sleep(pausa)
+            finally:
+                lock.acquire()
+        elif restantes:
+            time.sleep(pausa)
+        inicio_paso = time.perf_counter()
+
+    inicio = time.perf_counter()
+    copia = sqlite3.connect(temporal)
+    # El último paso confirma la copia: sin fsync ahí, las escrituras no esperan a que el
+    # archivo llegue al disco. Se sincroniza después, ya sin el lock.
+    copia.execute('PRAGMA synchronous = OFF')
+    try:
+        with lock if lock is not None else nullcontext():
+            inicio_paso = time.perf_counter()
+            origen.backup(copia, pages=paginas_por_paso, progress=al_avanzar)
+        # El respaldo queda en un solo archivo aunque el origen esté en WAL
+        copia.execute('PRAGMA journal_mode = DELETE')
+    except BaseException:
+        copia.close()
+        for sufijo in ('', '-journal'):
+            if os.path.exists(temporal + sufijo):
+                os.remove(temporal + sufijo)
+        raise
+    copia.close()
+    with open(temporal, 'rb+') as archivo:
+        os.fsync(archivo.fileno())
+    os.replace(temporal, destino)
+    return {'paginas': paginas, 'pasos': pasos, 'segundos': time.perf_counter() - inicio,
+            'paso_maximo': paso_maximo}
@@ -0,0 +1,171 @@
+"""Registro central de las sentencias SQL del repositorio.
+
+Todas las consultas son constantes de este módulo: así cada método ejecuta siempre el
+mismo objeto str y sqlite3 encuentra la sentencia ya preparada en el cache de la
+conexión, que se dimensiona con TAMANO_CACHE_SENTENCIAS para que entren todas.
+"""
+from typing import Dict
+
+from app.models import Paciente, Alimento, PlanComida
+
+# --- Esquema ---
+
+SQL_CREAR_PACIENTES = '''
+    CREATE TABLE IF NOT EXISTS pacientes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL,
+        edad INTEGER NOT NULL,
+        peso_actual REAL NOT NULL
+    )
+'''
+
+SQL_CREAR_ALIMENTOS = '''
+    CREATE TABLE IF NOT EXISTS alimentos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL,
+        calorias INTEGER NOT NULL
+    )
+'''
+
+SQL_CREAR_PLAN_COMIDAS = '''
+    CREATE TABLE IF NOT EXISTS plan_comidas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        paciente_id INTEGER NOT NULL,
+        alimento_id INTEGER NOT NULL,
+        fecha TEXT NOT NULL CHECK (date(fecha, '+0 days') IS fecha),
+        cantidad REAL NOT NULL,
+        FOREIGN KEY(paciente_id) REFERENCES pacientes(id),
+        FOREIGN KEY(alimento_id) REFERENCES alimentos(id)
+    )
+'''
+
+SQL_ULTIMO_ID = 'SELECT last_insert_rowid()'
+
+# --- Pacientes ---
+
+SQL_SELECT_PACIENTES = f"SELECT {', '.join(Paciente.COLUMNAS)} FROM pacientes"
+SQL_OBTENER_PACIENTE = SQL_SELECT_PACIENTES + ' WHERE id = ?'
+SQL_PAGINA_PACIENTES = SQL_SELECT_PACIENTES + ' WHERE id > ? ORDER BY id LIMIT ?'
+SQL_INSERTAR_PACIENTE = 'INSERT INTO pacientes (nombre, edad, peso_actual) VALUES (?, ?, ?)'
+SQL_ACTUALIZAR_PACIENTE = 'UPDATE pacientes SET nombre = ?, edad = ?, peso_actual = ? WHERE id = ?'
+SQL_ACTUALIZAR_PESO_PACIENTE = 'UPDATE pacientes SET peso_actual = ? WHERE id = ?'
+SQL_ELIMINAR_PACIENTE = 'DELETE FROM pacientes WHERE id = ?'
+
+# --- Alimentos ---
+
+SQL_SELECT_ALIMENTOS = f"SELECT {', '.join(Alimento.COLUMNAS)} FROM alimentos"
+SQL_OBTENER_ALIMENTO = SQL_SELECT_ALIMENTOS + ' WHERE id = ?'
+SQL_PAGINA_ALIMENTOS = SQL_SELECT_ALIMENTOS + ' WHERE id > ? ORDER BY id LIMIT ?'
+SQL_INSERTAR_ALIMENTO = 'INSERT INTO alimentos (nombre, calorias) VALUES (?, ?)'
+SQL_ACTUALIZAR_ALIMENTO = 'UPDATE alimentos SET nombre = ?, calorias = ? WHERE id = ?'
+SQL_ELIMINAR_ALIMENTO = 'DELETE FROM alimentos WHERE id = ?'
+
+# --- Planes de comida ---
+
+SQL_SELECT_PLANES = f"SELECT {', '.join(PlanComida.COLUMNAS)} FROM plan_comidas"
+SQL_OBTENER_PLAN = SQL_SELECT_PLANES + ' WHERE id = ?'
+SQL_PLANES_PACIENTE = SQL_SELECT_PLANES + ' WHERE paciente_id = ? ORDER BY fecha, id'
+SQL_PLANES_PACIENTE_RANGO = (SQL_SELECT_PLANES
+                             + ' WHERE paciente_id = ? AND fecha >= ? AND fecha <= ? ORDER BY fecha, id')
+SQL_INSERTAR_PLAN = 'INSERT INTO plan_comidas (paciente_id, alimento_id, fecha, cantidad) VALUES (?, ?, ?, ?)'
+SQL_ACTUALIZAR_PLAN = 'UPDATE plan_comidas SET paciente_id = ?, alimento_id = ?, fecha = ?, cantidad = ? WHERE id = ?'
+SQL_ELIMINAR_PLAN = 'DELETE FROM plan_comidas WHERE id = ?'
+
+SQL_PLANES_DETALLE = '''
+    SELECT 
+        pc.id, 
+        p.nombre AS paciente_nombre, 
+        a.nombre AS alimento_nombre,
+        pc.fecha, 
+        pc.cantidad,
+        a.calorias * pc.cantidad AS calorias_totales
+    FROM plan_comidas pc
+    JOIN pacientes p ON pc.paciente_id = p.id
+    JOIN alimentos a ON pc.alimento_id = a.id
+'''
+SQL_LISTAR_PLANES_DETALLE = SQL_PLANES_DETALLE + ' ORDER BY pc.id'
+SQL_PAGINA_PLANES_DETALLE = SQL_PLANES_DETALLE + ' WHERE pc.id > ? ORDER BY pc.id LIMIT ?'
+
+# Lee la tabla planes_paciente_detalle que mantienen los triggers: un recorrido de la clave
+# primaria (paciente_id, fecha, plan_id), sin JOIN.
+SQL_PLAN_DEL_PACIENTE = '''
+    SELECT plan_id AS id, alimento_id, alimento_nombre, fecha, cantidad, calorias_totales
+    FROM planes_paciente_detalle
+    WHERE paciente_id = ? AND fecha = ?
+    ORDER BY plan_id
+'''
+
+# --- Búsqueda de muchos ids a la vez ---
+# Los ids viajan en un único parámetro JSON que json_each despliega como tabla: la sentencia
+# es siempre la misma (una sola preparada, sin importar cuántos ids) y no se topa con el
+# límite de parámetros de SQLite como un IN (?, ?, ...) armado a medida.
+
+_IDS_JSON = 'IN (SELECT value FROM json_each(?))'
+SQL_OBTENER_PACIENTES = f'{SQL_SELECT_PACIENTES} WHERE id {_IDS_JSON}'
+SQL_OBTENER_ALIMENTOS = f'{SQL_SELECT_ALIMENTOS} WHERE id {_IDS_JSON}'
+SQL_OBTENER_PLANES = f'{SQL_SELECT_PLANES} WHERE id {_IDS_JSON}'
+SQL_PLANES_PACIENTES_RANGO = (f'{SQL_SELECT_PLANES} WHERE paciente_id {_IDS_JSON} AND fecha >= ? AND fecha <= ?'
+                              ' ORDER BY paciente_id, fecha, id')
+
+# --- Calorías diarias ---
+# Una variante por combinación de límites, para que cada una use el rango del índice
+# (paciente_id, fecha) en lugar de una condición "? IS NULL OR ..." que lo impide.
+
+_SQL_CALORIAS_DIA = 'SELECT fecha, total_calorias, cantidad_items FROM calorias_diarias WHERE paciente_id = ?'
+SQL_CALORIAS_DIA = _SQL_CALORIAS_DIA + ' ORDER BY fecha'
+SQL_CALORIAS_DIA_DESDE = _SQL_CALORIAS_DIA + ' AND fecha >= ? ORDER BY fecha'
+SQL_CALORIAS_DIA_HASTA = _SQL_CALORIAS_DIA + ' AND fecha <= ? ORDER BY fecha'
+SQL_CALORIAS_DIA_RANGO = _SQL_CALORIAS_DIA + ' AND fecha >= ? AND fecha <= ? ORDER BY fecha'
+
+# --- Búsqueda de texto completo ---
+# rank es el puntaje bm25 de FTS5: ordenar por él devuelve primero los mejores resultados.
+
+SQL_BUSCAR_ALIMENTOS = f'''
+    SELECT {', '.join('a.' + columna for columna in Alimento.COLUMNAS)}
+    FROM alimentos_fts
+    JOIN alimentos a ON a.id = alimentos_fts.rowid
+    WHERE alimentos_fts MATCH ?
+    ORDER BY rank
+    LIMIT ?
+'''
+SQL_BUSCAR_PACIENTES = f'''
+    SELECT {', '.join('p.' + columna for columna in Paciente.COLUMNAS)}
+    FROM pacientes_fts
+    JOIN pacientes p ON p.id = pacientes_fts.rowid
+    WHERE pacientes_fts MATCH ?
+    ORDER BY rank
+    LIMIT ?
+'''
+
+# Con la columna rank al final, para mezclar por puntaje resultados de varias bases
+SQL_BUSCAR_PACIENTES_PUNTAJE = f'''
+    SELECT {', '.join('p.' + columna for columna in Paciente.COLUMNAS)}, rank
+    FROM pacientes_fts
+    JOIN pacientes p ON p.id = pacientes_fts.rowid
+    WHERE pacientes_fts MATCH ?
+    ORDER BY rank
+    LIMIT ?
+'''
+
+# --- Fragmentos (bases con pacientes repartidos) ---
+# Cada fragmento reserva un rango de ids fijando sqlite_sequence; el catálogo de alimentos
+# se copia en todos con los mismos ids.
+
+SQL_SECUENCIAS = "SELECT name, seq FROM sqlite_sequence WHERE name IN ('pacientes', 'plan_comidas')"
+SQL_INSERTAR_SECUENCIA = 'INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)'
+SQL_ACTUALIZAR_SECUENCIA = 'UPDATE sqlite_sequence SET seq = ? WHERE name = ?'
+SQL_RANGO_IDS_PACIENTES = 'SELECT MIN(id), MAX(id) FROM pacientes'
+SQL_RANGO_IDS_PLANES = 'SELECT MIN(id), MAX(id) FROM plan_comidas'
+SQL_CATALOGO_ALIMENTOS = SQL_SELECT_ALIMENTOS + ' ORDER BY id'
+SQL_REPLICAR_ALIMENTO = '''
+    INSERT INTO alimentos (id, nombre, calorias) VALUES (?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET nombre = excluded.nombre, calorias = excluded.calorias
+'''
+
+
+REGISTRO: Dict[str, str] = {
+    nombre: sql for nombre, sql in globals().items() if nombre.startswith('SQL_')
+}
+
+# Margen sobre el registro para las consultas ad hoc (EXPLAIN, migraciones, reportes)
+TAMANO_CACHE_SENTENCIAS = max(128, 2 * len(REGISTRO))
@@ -0,0 +1,194 @@
+import sqlite3
+from contextlib import contextmanager
+from itertools import count
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING, Union
+
+from app.models import Paciente, Alimento, PlanComida
+from app.utils import fecha_canonica
+from app.repository.sentencias import (
+    SQL_INSERTAR_PACIENTE, SQL_INSERTAR_ALIMENTO, SQL_INSERTAR_PLAN,
+    SQL_ACTUALIZAR_PACIENTE, SQL_ACTUALIZAR_ALIMENTO, SQL_ACTUALIZAR_PLAN,
+    SQL_ELIMINAR_PACIENTE, SQL_ELIMINAR_ALIMENTO, SQL_ELIMINAR_PLAN
+)
+
+if TYPE_CHECKING:
+    from app.repository.nutricionista_repo import NutricionistaRepo
+
+Modelo = Union[Paciente, Alimento, PlanComida]
+
+# Orden de aplicación: primero lo que otros referencian al crear, y al revés al eliminar
+_ORDEN_CREACION = (Paciente, Alimento, PlanComida)
+_ORDEN_ELIMINACION = (PlanComida, Alimento, Paciente)
+
+_INSERTAR = {
+    Paciente: (SQL_INSERTAR_PACIENTE, lambda p: (p.nombre, p.edad, p.peso_actual)),
+    Alimento: (SQL_INSERTAR_ALIMENTO, lambda a: (a.nombre, a.calorias)),
+    PlanComida: (SQL_INSERTAR_PLAN, lambda pc: (pc.paciente_id, pc.alimento_id, pc.fecha, pc.cantidad)),
+}
+_ACTUALIZAR = {
+    Paciente: (SQL_ACTUALIZAR_PACIENTE, lambda p: (p.nombre, p.edad, p.peso_actual, p.id)),
+    Alimento: (SQL_ACTUALIZAR_ALIMENTO, lambda a: (a.nombre, a.calorias, a.id)),
+    PlanComida: (SQL_ACTUALIZAR_PLAN, lambda pc: (pc.paciente_id, pc.alimento_id, pc.fecha, pc.cantidad, pc.id)),
+}
+_ELIMINAR = {
+    Paciente: SQL_ELIMINAR_PACIENTE,
+    Alimento: SQL_ELIMINAR_ALIMENTO,
+    PlanComida: SQL_ELIMINAR_PLAN,
+}
+
+_numeros_savepoint = count(1)
+
+
+class _Grupo:
+    """Operaciones que se aplican juntas; si tiene savepoint, una falla solo revierte este grupo."""
+    
+    __slots__ = ('nombre', 'savepoint', 'crear', 'actualizar', 'eliminar', 'dependencias')
+    
+    def __init__(self, nombre: Optional[str] = None, savepoint: bool = False):
+        self.nombre = nombre
+        self.savepoint = savepoint
+        self.crear: Dict[type, List[Modelo]] = {modelo: [] for modelo in _ORDEN_CREACION}
+        self.actualizar: Dict[type, List[Modelo]] = {modelo: [] for modelo in _ORDEN_CREACION}
+        self.eliminar: Dict[type, List[int]] = {modelo: [] for modelo in _ORDEN_CREACION}
+        # (plan, paciente, alimento): el plan toma los ids de esos objetos al aplicarse
+        self.dependencias: List[Tuple[PlanComida, Optional[Paciente], Optional[Alimento]]] = []
+    
+    def vacio(self) -> bool:
+        return not any(self.crear[m] or self.actualizar[m] or self.eliminar[m] for m in _ORDEN_CREACION)
+
+
+class UnidadDeTrabajo:
+    """Acumula altas, modificaciones y bajas y las aplica juntas en una sola transacción.
+    
+    Las operaciones se agrupan por tabla y se envían con executemany. Un plan puede
+    referirse a un paciente o alimento que se crea en la misma unidad (pasándolos como
+    paciente=/alimento=); su id se resuelve al aplicar. Las operaciones dentro de
+    `with uow.grupo():` van en un SAVEPOINT: si fallan se revierten solo ellas y el
+    error queda en `errores`, mientras el resto de la unidad se confirma igual.
+    """
+    
+    def __init__(self, repo: "NutricionistaRepo", tamano_lote: int):
+        self._repo = repo
+        self._tamano_lote = tamano_lote
+        self._grupos: List[_Grupo] = [_Grupo()]
+        self._confirmada = False
+        self.errores: List[Tuple[Optional[str], sqlite3.Error]] = []
+    
+    @property
+    def _actual(self) -> _Grupo:
+        return self._grupos[-1]
+    
+    def _verificar_abierta(self) -> None:
+        if self._confirmada:
+            raise RuntimeError("La unidad de trabajo ya fue confirmada")
+    
+    def _preparar(self, obj: Modelo) -> None:
+        # La fecha se valida al registrar el plan y no al confirmar: un ValueError en medio
+        # de la transacción revertiría toda la unidad, no solo el grupo del plan
+        self._verificar_abierta()
+        if isinstance(obj, PlanComida):
+            obj.fecha = fecha_canonica(obj.fecha)
+    
+    def crear(self, obj: Modelo, paciente: Optional[Paciente] = None,
+              alimento: Optional[Alimento] = None) -> Modelo:
+        self._preparar(obj)
+        self._actual.crear[type(obj)].append(obj)
+        if paciente is not None or alimento is not None:
+            self._actual.dependencias.append((obj, paciente, alimento))
+        return obj
+    
+    def actualizar(self, obj: Modelo, paciente: Optional[Paciente] = None,
+                   alimento: Optional[Alimento] = None) -> Modelo:
+        self._preparar(obj)
+        self._actual.actualizar[type(obj)].append(obj)
+        if paciente is not None or alimento is not None:
+            self._actual.dependencias.append((obj, paciente, alimento))
+        return obj
+    
+    def eliminar(self, modelo: Union[type, Modelo], entidad_id: Optional[int] = None) -> None:
+        """Acepta una instancia (uow.eliminar(plan)) o el modelo y el id (uow.eliminar(PlanComida, 7))."""
+        self._verificar_abierta()
+        if not isinstance(modelo, type):
+            modelo, entidad_id = type(modelo), modelo.id
+        self._actual.eliminar[modelo].append(entidad_id)
+    
+    @contextmanager
+    def grupo(self, nombre: Optional[str] = None) -> Iterator["UnidadDeTrabajo"]:
+        self._verificar_abierta()
+        self._grupos.append(_Grupo(nombre, savepoint=True))
+        try:
+            yield self
+        finally:
+            # Lo que se agregue después del grupo vuelve a ir sin savepoint
+            self._grupos.append(_Grupo())
+    
+    def descartar(self) -> None:
+        self._grupos = [_Grupo()]
+    
+    def confirmar(self) -> None:
+        self._verificar_abierta()
+        try:
+            with self._repo._escritura() as conn:
+                if not conn.in_transaction:
+                    conn.execute('BEGIN')
+                for grupo in self._grupos:
+                    if grupo.vacio():
+                        continue
+                    if not grupo.savepoint:
+                        self._aplicar(conn, grupo)
+                        continue
+                    savepoint = f"uow_{next(_numeros_savepoint)}"
+                    conn.execute(f'SAVEPOINT {savepoint}')
+                    try:
+                        self._aplicar(conn, grupo)
+                    except sqlite3.Error as e:
+                        conn.execute(f'ROLLBACK TO {savepoint}')
+                        self._revertir_ids(grupo)
+                        self.errores.append((grupo.nombre, e))
+                    finally:
+                        conn.execute(f'RELEASE {savepoint}')
+        except Exception:
+            # Se revirtió toda la transacción: ningún id asignado es válido
+            for grupo in self._grupos:
+                self._revertir_ids(grupo)
+            raise
+        self._confirmada = True
+        self._invalidar_caches()
+    
+    def _aplicar(self, conn: sqlite3.Connection, grupo: _Grupo) -> None:
+        for modelo in _ORDEN_CREACION:
+            if modelo is PlanComida:
+                self._resolver_dependencias(grupo)
+            if grupo.crear[modelo]:
+                sql, a_fila = _INSERTAR[modelo]
+                self._repo._insertar_lotes_en(conn, sql, grupo.crear[modelo], a_fila, self._tamano_lote)
+        for modelo in _ORDEN_CREACION:
+            if grupo.actualizar[modelo]:
+                sql, a_fila = _ACTUALIZAR[modelo]
+                conn.executemany(sql, (a_fila(obj) for obj in grupo.actualizar[modelo]))
+        for modelo in _ORDEN_ELIMINACION:
+            if grupo.eliminar[modelo]:
+                conn.executemany(_ELIMINAR[modelo], ((entidad_id,) for entidad_id in grupo.eliminar[modelo]))
+    
+    @staticmethod
+    def _resolver_dependencias(grupo: _Grupo) -> None:
+        for plan, paciente, alimento in grupo.dependencias:
+            if paciente is not None:
+                plan.paciente_id = paciente.id
+            if alimento is not None:
+                plan.alimento_id = alimento.id
+    
+    @staticmethod
+    def _revertir_ids(grupo: _Grupo) -> None:
+        for objetos in grupo.crear.values():
+            for obj in objetos:
+                obj.id = None
+    
+    def _invalidar_caches(self) -> None:
+        self._repo._invalidar_plan_del_paciente()
+        for grupo in self._grupos:
+            for modelo in _ORDEN_CREACION:
+                for obj in grupo.actualizar[modelo]:
+                    self._repo._invalidar(modelo, obj.id)
+                for entidad_id in grupo.eliminar[modelo]:
+                    self._repo._invalidar(modelo, entidad_id)
@@ -0,0 +1,4 @@
+from app.transferencia.importar import importar, ResumenImportacion
+from app.transferencia.exportar import exportar
+
+__all__ = ['importar', 'exportar', 'ResumenImportacion']
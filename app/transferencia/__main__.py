@@ -0,0 +1,91 @@
+"""Importa y exporta pacientes, alimentos y planes en CSV o JSONL.
+
+Uso:
+    python -m app.transferencia importar planes planes.csv --rechazos rechazos.jsonl
+    python -m app.transferencia exportar planes_detalle planes.jsonl
+    python -m app.transferencia exportar pacientes - --formato csv > pacientes.csv
+
+El formato se deduce de la extensión (.csv, .jsonl o .ndjson) salvo que se indique con
+--formato; "-" usa la entrada o la salida estándar.
+Al importar, el código de salida es 1 si hubo filas rechazadas.
+"""
+import argparse
+import json
+import sys
+from contextlib import contextmanager
+from typing import Iterator, Optional, TextIO
+
+from app.repository import NutricionistaRepo
+from app.repository.perfiles import PERFILES
+from app.transferencia.exportar import CONSULTAS, TAMANO_LECTURA_EXPORTACION, exportar
+from app.transferencia.formatos import FORMATOS, detectar_formato
+from app.transferencia.importar import ENTIDADES, TAMANO_LOTE_IMPORTACION, ResumenImportacion, importar
+
+
+@contextmanager
+def _abrir(ruta: Optional[str], modo: str) -> Iterator[Optional[TextIO]]:
+    if ruta is None:
+        yield None
+    elif ruta == '-':
+        yield sys.stdin if 'r' in modo else sys.stdout
+    else:
+        # newline='' es lo que pide el módulo csv; para JSONL no cambia nada
+        with open(ruta, modo, encoding='utf-8', newline='') as archivo:
+            yield archivo
+
+
+def _mostrar_progreso(resumen: ResumenImportacion) -> None:
+    print(f"\rleídas {resumen.leidas}, importadas {resumen.importadas}, "
+          f"rechazadas {resumen.rechazadas} ({resumen.segundos:.1f} s)", end='', file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m app.transferencia',
+                                     description='Importación y exportación de datos en CSV o JSONL.')
+    parser.add_argument('--db', default='database/nutricion.db', help='base de datos (por defecto: %(default)s)')
+    parser.add_argument('--perfil', choices=sorted(PERFILES),
+                        help='perfil de PRAGMAs (por ejemplo bulk_load para importaciones grandes)')
+    subparsers = parser.add_subparsers(dest='accion', required=True)
+
+    parser_importar = subparsers.add_parser('importar', help='carga filas desde un archivo')
+    parser_importar.add_argument('entidad', choices=sorted(ENTIDADES))
+    parser_importar.add_argument('archivo', help='archivo de origen, o - para la entrada estándar')
+    parser_importar.add_argument('--formato', choices=FORMATOS)
+    parser_importar.add_argument('--lote', type=int, default=TAMANO_LOTE_IMPORTACION,
+                                 help='filas por transacción (por defecto: %(default)s)')
+    parser_importar.add_argument('--rechazos', help='archivo JSONL donde anotar las filas rechazadas')
+    parser_importar.add_argument('--silencioso', action='store_true', help='no mostrar el progreso')
+
+    parser_exportar = subparsers.add_parser('exportar', help='vuelca una tabla a un archivo')
+    parser_exportar.add_argument('entidad', choices=sorted(CONSULTAS))
+    parser_exportar.add_argument('archivo', help='archivo de destino, o - para la salida estándar')
+    parser_exportar.add_argument('--formato', choices=FORMATOS)
+    parser_exportar.add_argument('--lote', type=int, default=TAMANO_LECTURA_EXPORTACION,
+                                 help='filas por lectura del cursor (por defecto: %(default)s)')
+
+    args = parser.parse_args(argv)
+    if args.archivo == '-' and args.formato is None:
+        parser.error('con "-" hay que indicar --formato')
+    formato = detectar_formato(args.archivo, args.formato)
+
+    repo = NutricionistaRepo(args.db, perfil=args.perfil)
+    try:
+        if args.accion == 'exportar':
+            with _abrir(args.archivo, 'w') as archivo:
+                exportadas = exportar(repo, args.entidad, archivo, formato, args.lote)
+            print(f"exportadas {exportadas} filas", file=sys.stderr)
+            return 0
+
+        with _abrir(args.archivo, 'r') as archivo, _abrir(args.rechazos, 'w') as rechazos:
+            resumen = importar(repo, args.entidad, archivo, formato, args.lote, rechazos,
+                               None if args.silencioso else _mostrar_progreso)
+        if not args.silencioso:
+            print(file=sys.stderr)
+        print(json.dumps(resumen.como_dict(), ensure_ascii=False), file=sys.stderr)
+        return 1 if resumen.rechazadas else 0
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+from typing import Dict, TextIO
+
+from app.repository import NutricionistaRepo
+from app.repository.sentencias import (
+    SQL_LISTAR_PLANES_DETALLE, SQL_SELECT_ALIMENTOS, SQL_SELECT_PACIENTES, SQL_SELECT_PLANES
+)
+from app.transferencia.formatos import EscritorFilas
+
+# Filas que se leen del cursor y se escriben juntas
+TAMANO_LECTURA_EXPORTACION = 5000
+
+CONSULTAS: Dict[str, str] = {
+    'pacientes': SQL_SELECT_PACIENTES + ' ORDER BY id',
+    'alimentos': SQL_SELECT_ALIMENTOS + ' ORDER BY id',
+    'planes': SQL_SELECT_PLANES + ' ORDER BY id',
+    'planes_detalle': SQL_LISTAR_PLANES_DETALLE,
+}
+
+
+def exportar(repo: NutricionistaRepo, entidad: str, archivo: TextIO, formato: str,
+             tamano_lectura: int = TAMANO_LECTURA_EXPORTACION) -> int:
+    """Escribe la tabla pedida en CSV o JSONL y devuelve la cantidad de filas exportadas.
+
+    Las filas pasan del cursor al archivo de a tamano_lectura, como tuplas y sin armar
+    modelos, así que la memoria no depende del tamaño de la tabla.
+    """
+    if entidad not in CONSULTAS:
+        raise ValueError(f"Entidad desconocida: {entidad!r} (se espera una de {', '.join(CONSULTAS)})")
+    if tamano_lectura < 1:
+        raise ValueError("tamano_lectura debe ser mayor que cero")
+
+    exportadas = 0
+    with repo.lectura() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(CONSULTAS[entidad])
+        escritor = EscritorFilas(archivo, formato, [columna[0] for columna in cursor.description])
+        while True:
+            filas = cursor.fetchmany(tamano_lectura)
+            if not filas:
+                break
+            escritor.escribir(filas)
+            exportadas += len(filas)
+        cursor.close()
+    return exportadas
@@ -0,0 +1,70 @@
+import csv
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+FORMATOS = ('csv', 'jsonl')
+
+
+def detectar_formato(ruta: str, formato: Optional[str] = None) -> str:
+    """Devuelve el formato pedido o, si no se indica, el que corresponde a la extensión."""
+    if formato is None:
+        extension = os.path.splitext(ruta)[1].lower().lstrip('.')
+        formato = 'jsonl' if extension in ('jsonl', 'ndjson') else extension
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato!r} (se espera uno de {', '.join(FORMATOS)})")
+    return formato
+
+
+def leer_filas(archivo: TextIO, formato: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Recorre el archivo fila por fila sin cargarlo entero.
+
+    Produce (número de línea, fila, error): si la línea no se pudo interpretar, error
+    explica por qué y la fila es None o trae lo que se pudo leer; si no, error es None.
+    """
+    if formato == 'csv':
+        lector = csv.DictReader(archivo)
+        for fila in lector:
+            if None in fila:
+                fila['_sobrantes'] = fila.pop(None)
+                yield lector.line_num, fila, "la fila tiene más columnas que el encabezado"
+            else:
+                yield lector.line_num, fila, None
+        return
+
+    for numero, linea in enumerate(archivo, start=1):
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except ValueError as e:
+            yield numero, None, f"JSON inválido: {e}"
+            continue
+        if isinstance(fila, dict):
+            yield numero, fila, None
+        else:
+            yield numero, None, "se esperaba un objeto JSON por línea"
+
+
+class EscritorFilas:
+    """Escribe filas (tuplas) en CSV o JSONL a medida que llegan."""
+
+    __slots__ = ('_archivo', '_formato', '_columnas', '_csv')
+
+    def __init__(self, archivo: TextIO, formato: str, columnas: List[str]):
+        self._archivo = archivo
+        self._formato = formato
+        self._columnas = columnas
+        self._csv = None
+        if formato == 'csv':
+            self._csv = csv.writer(archivo)
+            self._csv.writerow(columnas)
+
+    def escribir(self, filas: List[tuple]) -> None:
+        if self._csv is not None:
+            self._csv.writerows(filas)
+            return
+        columnas = self._columnas
+        self._archivo.writelines(
+            json.dumps(dict(zip(columnas, fila)), ensure_ascii=False) + '\n' for fila in filas
+        )
@@ -0,0 +1,231 @@
+import json
+import sqlite3
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, TextIO, Tuple
+
+from app.repository import NutricionistaRepo
+from app.repository.sentencias import SQL_INSERTAR_ALIMENTO, SQL_INSERTAR_PACIENTE, SQL_INSERTAR_PLAN
+from app.transferencia.formatos import leer_filas
+from app.utils import normalizar_fecha
+
+# Filas que se validan e insertan juntas en cada transacción
+TAMANO_LOTE_IMPORTACION = 5000
+
+# Máximo de ids por consulta IN al verificar claves foráneas (SQLite admite 999 parámetros
+# en versiones viejas)
+_IDS_POR_CONSULTA = 500
+
+Fila = Dict[str, Any]
+Rechazo = Tuple[int, str, Optional[Fila]]
+
+
+def _texto(fila: Fila, columna: str) -> Optional[str]:
+    valor = fila.get(columna)
+    if isinstance(valor, str):
+        valor = valor.strip()
+        return valor or None
+    return None
+
+
+def _entero(fila: Fila, columna: str) -> Optional[int]:
+    valor = fila.get(columna)
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        return valor
+    if isinstance(valor, str):
+        valor = valor.strip()
+        if valor.isdigit() or (valor[:1] == '-' and valor[1:].isdigit()):
+            return int(valor)
+    return None
+
+
+def _real(fila: Fila, columna: str) -> Optional[float]:
+    valor = fila.get(columna)
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    if isinstance(valor, str) and valor.strip():
+        try:
+            return float(valor)
+        except ValueError:
+            return None
+    return None
+
+
+def _convertir_paciente(fila: Fila) -> Tuple[Optional[tuple], Optional[str]]:
+    nombre = _texto(fila, 'nombre')
+    edad = _entero(fila, 'edad')
+    peso = _real(fila, 'peso_actual')
+    if nombre is None:
+        return None, "falta nombre"
+    if edad is None:
+        return None, "edad no es un entero"
+    if peso is None:
+        return None, "peso_actual no es un número"
+    return (nombre, edad, peso), None
+
+
+def _convertir_alimento(fila: Fila) -> Tuple[Optional[tuple], Optional[str]]:
+    nombre = _texto(fila, 'nombre')
+    calorias = _real(fila, 'calorias')
+    if nombre is None:
+        return None, "falta nombre"
+    if calorias is None:
+        return None, "calorias no es un número"
+    return (nombre, calorias), None
+
+
+def _convertir_plan(fila: Fila) -> Tuple[Optional[tuple], Optional[str]]:
+    paciente_id = _entero(fila, 'paciente_id')
+    alimento_id = _entero(fila, 'alimento_id')
+    fecha = _texto(fila, 'fecha')
+    if fecha is not None:
+        fecha = normalizar_fecha(fecha)
+    cantidad = _real(fila, 'cantidad')
+    if paciente_id is None:
+        return None, "paciente_id no es un entero"
+    if alimento_id is None:
+        return None, "alimento_id no es un entero"
+    if fecha is None:
+        return None, f"fecha inválida: {fila.get('fecha')!r}"
+    if cantidad is None:
+        return None, "cantidad no es un número"
+    return (paciente_id, alimento_id, fecha, cantidad), None
+
+
+# entidad -> (sentencia de inserción, conversión de fila, claves foráneas como (posición, columna, tabla))
+ENTIDADES: Dict[str, Tuple[str, Callable[[Fila], Tuple[Optional[tuple], Optional[str]]],
+                           Tuple[Tuple[int, str, str], ...]]] = {
+    'pacientes': (SQL_INSERTAR_PACIENTE, _convertir_paciente, ()),
+    'alimentos': (SQL_INSERTAR_ALIMENTO, _convertir_alimento, ()),
+    'planes': (SQL_INSERTAR_PLAN, _convertir_plan, ((0, 'paciente_id', 'pacientes'), (1, 'alimento_id', 'alimentos'))),
+}
+
+
+class ResumenImportacion:
+    __slots__ = ('leidas', 'importadas', 'rechazadas', 'segundos')
+
+    def __init__(self):
+        self.leidas = 0
+        self.importadas = 0
+        self.rechazadas = 0
+        self.segundos = 0.0
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {columna: getattr(self, columna) for columna in self.__slots__}
+
+    def __repr__(self):
+        return (f"ResumenImportacion(leidas={self.leidas}, importadas={self.importadas}, "
+                f"rechazadas={self.rechazadas}, segundos={self.segundos:.2f})")
+
+
+class _VerificadorClaves:
+    """Comprueba de a lotes que los ids referenciados existan, recordando los ya vistos."""
+
+    __slots__ = ('_existentes',)
+
+    def __init__(self):
+        self._existentes: Dict[str, Set[int]] = {}
+
+    def faltantes(self, conn: sqlite3.Connection, tabla: str, ids: Set[int]) -> Set[int]:
+        existentes = self._existentes.setdefault(tabla, set())
+        pendientes = list(ids - existentes)
+        for inicio in range(0, len(pendientes), _IDS_POR_CONSULTA):
+            parte = pendientes[inicio:inicio + _IDS_POR_CONSULTA]
+            marcadores = ', '.join('?' * len(parte))
+            cursor = conn.execute(f'SELECT id FROM {tabla} WHERE id IN ({marcadores})', parte)
+            existentes.update(fila[0] for fila in cursor)
+        return ids - existentes
+
+
+def importar(repo: NutricionistaRepo, entidad: str, archivo: TextIO, formato: str,
+             tamano_lote: int = TAMANO_LOTE_IMPORTACION, rechazos: Optional[TextIO] = None,
+             progreso: Optional[Callable[[ResumenImportacion], None]] = None) -> ResumenImportacion:
+    """Importa pacientes, alimentos o planes desde un archivo CSV o JSONL.
+
+    El archivo se recorre en lotes de tamano_lote filas, así la memoria no depende de su
+    tamaño. Cada lote se valida (tipos, fechas y, para los planes, que existan el paciente
+    y el alimento con una consulta por lote) y se inserta con executemany en su propia
+    transacción. Las filas rechazadas se escriben en `rechazos` como JSONL con la línea y
+    el motivo, y no frenan la importación. `progreso` se llama después de cada lote.
+    """
+    if entidad not in ENTIDADES:
+        raise ValueError(f"Entidad desconocida: {entidad!r} (se espera una de {', '.join(ENTIDADES)})")
+    if tamano_lote < 1:
+        raise ValueError("tamano_lote debe ser mayor que cero")
+
+    sql, convertir, claves = ENTIDADES[entidad]
+    verificador = _VerificadorClaves()
+    resumen = ResumenImportacion()
+    inicio = time.perf_counter()
+
+    def rechazar(lote_rechazos: Iterable[Rechazo]) -> None:
+        for linea, motivo, fila in lote_rechazos:
+            resumen.rechazadas += 1
+            if rechazos is not None:
+                rechazos.write(json.dumps({'linea': linea, 'motivo': motivo, 'fila': fila},
+                                          ensure_ascii=False) + '\n')
+
+    filas = leer_filas(archivo, formato)
+    while True:
+        lote = list(islice(filas, tamano_lote))
+        if not lote:
+            break
+        resumen.leidas += len(lote)
+
+        validas: List[Tuple[int, tuple, Fila]] = []
+        rechazadas: List[Rechazo] = []
+        for linea, fila, error in lote:
+            if error is None:
+                valores, error = convertir(fila)
+            if error is None:
+                validas.append((linea, valores, fila))
+            else:
+                rechazadas.append((linea, error, fila))
+
+        with repo.escritura() as conn:
+            if not conn.in_transaction:
+                conn.execute('BEGIN')
+            for posicion, columna, tabla in claves:
+                faltan = verificador.faltantes(conn, tabla, {valores[posicion] for _, valores, _ in validas})
+                if faltan:
+                    rechazadas.extend(
+                        (linea, f"{columna} {valores[posicion]} no existe", fila)
+                        for linea, valores, fila in validas if valores[posicion] in faltan
+                    )
+                    validas = [v for v in validas if v[1][posicion] not in faltan]
+            resumen.importadas += _insertar_lote(conn, sql, validas, rechazadas)
+        repo.invalidar_caches()
+
+        rechazadas.sort(key=lambda rechazo: rechazo[0])
+        rechazar(rechazadas)
+        resumen.segundos = time.perf_counter() - inicio
+        if progreso is not None:
+            progreso(resumen)
+
+    resumen.segundos = time.perf_counter() - inicio
+    return resumen
+
+
+def _insertar_lote(conn: sqlite3.Connection, sql: str, validas: List[Tuple[int, tuple, Fila]],
+                   rechazadas: List[Rechazo]) -> int:
+    """Inserta el lote con executemany; si alguna fila viola una restricción, fila por fila."""
+    if not validas:
+        return 0
+    conn.execute('SAVEPOINT importacion_lote')
+    try:
+        conn.executemany(sql, (valores for _, valores, _ in validas))
+        return len(validas)
+    except sqlite3.IntegrityError:
+        conn.execute('ROLLBACK TO importacion_lote')
+    finally:
+        conn.execute('RELEASE importacion_lote')
+
+    # Una sentencia que falla se deshace sola, así que se puede seguir con el resto del lote
+    insertadas = 0
+    for linea, valores, fila in validas:
+        try:
+            conn.execute(sql, valores)
+            insertadas += 1
+        except sqlite3.IntegrityError as e:
+            rechazadas.append((linea, str(e), fila))
+    return insertadas
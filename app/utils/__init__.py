@@ -1,3 +1,3 @@
-from app.utils.helpers import validar_fecha, calcular_calorias_totales
+from app.utils.helpers import validar_fecha, validar_fechas, normalizar_fecha, fecha_canonica, calcular_calorias_totales
 
-__all__ = ['validar_fecha', 'calcular_calorias_totales']
\ No newline at end of file
+__all__ = ['validar_fecha', 'validar_fechas', 'normalizar_fecha', 'fecha_canonica', 'calcular_calorias_totales']
\ No newline at end of file
@@ -1,12 +1,70 @@
-from datetime import datetime
+import re
+import sys
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+# Mismo formato que acepta datetime.strptime(fecha, '%Y-%m-%d'): año de 4 dígitos y
+# mes/día con o sin cero a la izquierda (el día también con un espacio, como en strptime)
+_PATRON_FECHA = re.compile(r'(\d{4})-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])')
+_DIAS_POR_MES = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+@lru_cache(maxsize=8192)
+def normalizar_fecha(fecha_str: str) -> Optional[str]:
+    """Devuelve la fecha en la forma canónica YYYY-MM-DD, o None si no es una fecha válida.
+    
+    La base solo guarda fechas canónicas, así "2023-6-5" se guarda como "2023-06-05" y las
+    comparaciones de texto ordenan igual que las fechas. El cache ayuda en las cargas
+    masivas, donde las mismas fechas se repiten miles de veces.
+    """
+    coincidencia = _PATRON_FECHA.fullmatch(fecha_str)
+    if coincidencia is None:
+        return None
+    anio, mes, dia = int(coincidencia[1]), int(coincidencia[2]), int(coincidencia[3])
+    if anio == 0:
+        return None
+    if mes == 2 and dia == 29:
+        if not (anio % 4 == 0 and (anio % 100 != 0 or anio % 400 == 0)):
+            return None
+    elif dia > _DIAS_POR_MES[mes - 1]:
+        return None
+    return f"{anio:04d}-{mes:02d}-{dia:02d}"
+
+def fecha_canonica(fecha_str: str) -> str:
+    """Como normalizar_fecha, pero lanza ValueError si la fecha no es válida.
+    
+    Es la que usan los caminos de escritura: la base solo acepta fechas canónicas.
+    """
+    canonica = normalizar_fecha(fecha_str) if isinstance(fecha_str, str) else None
+    if canonica is None:
+        raise ValueError(f"Fecha inválida: {fecha_str!r}")
+    return canonica
 
 def validar_fecha(fecha_str: str) -> bool:
-    """Valida que una fecha tenga formato YYYY-MM-DD."""
-    try:
-        datetime.strptime(fecha_str, '%Y-%m-%d')
-        return True
-    except ValueError:
-        return False
+    """Valida que una fecha tenga formato YYYY-MM-DD.
+    
+    Da el mismo resultado que datetime.strptime pero sin armar y atrapar una excepción
+    por cada fecha inválida.
+    """
+    return normalizar_fecha(fecha_str) is not None
+
+def validar_fechas(fechas: Iterable[str]) -> List[bool]:
+    """Valida muchas fechas de una vez; cada valor distinto se valida una sola vez.
+    
+    Si recibe un arreglo de NumPy devuelve un arreglo booleano del mismo largo.
+    """
+    # NumPy es opcional y no se importa acá (tarda más que todo el arranque del repositorio):
+    # si nadie lo importó, fechas no puede ser un arreglo de NumPy
+    np = sys.modules.get('numpy')
+    if np is not None and isinstance(fechas, np.ndarray):
+        return np.array(validar_fechas(fechas.tolist()), dtype=bool)
+    vistas = {}
+    resultado = []
+    for fecha in fechas:
+        valida = vistas.get(fecha)
+        if valida is None:
+            valida = vistas[fecha] = validar_fecha(fecha)
+        resultado.append(valida)
+    return resultado
 
 def calcular_calorias_totales(cantidad: float, calorias_por_unidad: int) -> float:
     """Calcula el total de calorías basado en la cantidad y calorías unitarias."""
@@ -0,0 +1,258 @@
+"""Suite de benchmarks reproducible de NutricionistaRepo.
+
+Genera un conjunto de datos sintético a la escala pedida, corre las cargas de trabajo
+estándar y emite los resultados en JSON para comparar entre versiones.
+
+Uso:
+    python -m benchmarks --escala chica --salida resultados.json
+    python -m benchmarks --escala chica --comparar resultados_anteriores.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.models import PlanComida
+from app.repository import NutricionistaRepo
+from app.repository.perfiles import PERFILES
+from benchmarks.datos_sinteticos import ESCALAS, Escala, FECHA_FIN, poblar, muestra
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def _resultado(operaciones: int, duracion: float, latencias: Optional[List[float]] = None, **extra) -> Dict:
+    resultado = {
+        'operaciones': operaciones,
+        'segundos': round(duracion, 6),
+        'ops_por_segundo': round(operaciones / duracion, 1) if duracion else None,
+    }
+    if latencias:
+        resultado.update({
+            'latencia_p50_ms': round(statistics.median(latencias) * 1000, 4),
+            'latencia_p95_ms': round(_percentil(latencias, 0.95) * 1000, 4),
+            'latencia_p99_ms': round(_percentil(latencias, 0.99) * 1000, 4),
+        })
+    resultado.update(extra)
+    return resultado
+
+
+def _medir_operaciones(operacion: Callable[[int], object], argumentos: List[int]) -> Dict:
+    latencias = []
+    inicio = time.perf_counter()
+    for argumento in argumentos:
+        t0 = time.perf_counter()
+        operacion(argumento)
+        latencias.append(time.perf_counter() - t0)
+    return _resultado(len(argumentos), time.perf_counter() - inicio, latencias)
+
+
+# --- Cargas de trabajo ---
+
+def carga_masiva(repo: NutricionistaRepo, escala: Escala, semilla: int) -> Tuple[Dict, Dict[str, range]]:
+    inicio = time.perf_counter()
+    pacientes, alimentos, planes = poblar(repo, escala, semilla)
+    duracion = time.perf_counter() - inicio
+    resultado = _resultado(len(pacientes) + len(alimentos) + len(planes), duracion,
+                           filas_por_tabla={'pacientes': len(pacientes), 'alimentos': len(alimentos),
+                                            'plan_comidas': len(planes)})
+    return resultado, {'pacientes': pacientes, 'alimentos': alimentos, 'planes': planes}
+
+
+def busquedas_puntuales(repo: NutricionistaRepo, ids: Dict[str, range], aleatorio: random.Random,
+                        operaciones: int) -> Dict:
+    return {
+        'obtener_paciente': _medir_operaciones(repo.obtener_paciente, muestra(ids['pacientes'], operaciones, aleatorio)),
+        'obtener_alimento': _medir_operaciones(repo.obtener_alimento, muestra(ids['alimentos'], operaciones, aleatorio)),
+        'obtener_plan_comida': _medir_operaciones(repo.obtener_plan_comida, muestra(ids['planes'], operaciones, aleatorio)),
+    }
+
+
+def listado_por_paciente(repo: NutricionistaRepo, ids: Dict[str, range], aleatorio: random.Random,
+                         operaciones: int) -> Dict:
+    filas = 0
+
+    def listar(paciente_id: int) -> None:
+        nonlocal filas
+        filas += len(repo.listar_planes_paciente(paciente_id))
+
+    resultado = _medir_operaciones(listar, muestra(ids['pacientes'], operaciones, aleatorio))
+    resultado['filas'] = filas
+    return resultado
+
+
+def agregacion_calorias(repo: NutricionistaRepo, ids: Dict[str, range], aleatorio: random.Random,
+                        operaciones: int) -> Dict:
+    desde = FECHA_FIN.replace(month=1, day=1).isoformat()
+    hasta = FECHA_FIN.isoformat()
+    por_dia = _medir_operaciones(lambda paciente_id: repo.calorias_por_dia(paciente_id, desde, hasta),
+                                 muestra(ids['pacientes'], operaciones, aleatorio))
+
+    # Referencia: el mismo total calculado sobre plan_comidas sin la tabla resumen
+    def desde_planes(paciente_id: int) -> None:
+        repo.conn.execute('''
+            SELECT pc.fecha, SUM(a.calorias * pc.cantidad)
+            FROM plan_comidas pc JOIN alimentos a ON pc.alimento_id = a.id
+            WHERE pc.paciente_id = ? AND pc.fecha BETWEEN ? AND ?
+            GROUP BY pc.fecha
+        ''', (paciente_id, desde, hasta)).fetchall()
+
+    sin_resumen = _medir_operaciones(desde_planes, muestra(ids['pacientes'], operaciones, aleatorio))
+    return {'calorias_por_dia': por_dia, 'group_by_sobre_planes': sin_resumen}
+
+
+def mixta(repo: NutricionistaRepo, ids: Dict[str, range], aleatorio: random.Random,
+          operaciones: int, proporcion_escrituras: float = 0.1) -> Dict:
+    lecturas: List[float] = []
+    escrituras: List[float] = []
+    fecha = FECHA_FIN.isoformat()
+    inicio = time.perf_counter()
+    for _ in range(operaciones):
+        paciente_id = aleatorio.choice(ids['pacientes'])
+        t0 = time.perf_counter()
+        if aleatorio.random() < proporcion_escrituras:
+            if aleatorio.random() < 0.5:
+                repo.crear_plan_comida(PlanComida(paciente_id=paciente_id,
+                                                  alimento_id=aleatorio.choice(ids['alimentos']),
+                                                  fecha=fecha, cantidad=1.0))
+            else:
+                repo.actualizar_peso_paciente(paciente_id, round(aleatorio.uniform(50, 110), 1))
+            escrituras.append(time.perf_counter() - t0)
+        else:
+            if aleatorio.random() < 0.5:
+                repo.obtener_paciente(paciente_id)
+            else:
+                repo.calorias_por_dia(paciente_id, fecha, fecha)
+            lecturas.append(time.perf_counter() - t0)
+    duracion = time.perf_counter() - inicio
+    return _resultado(operaciones, duracion, lecturas + escrituras,
+                      lecturas=_resultado(len(lecturas), sum(lecturas), lecturas) if lecturas else None,
+                      escrituras=_resultado(len(escrituras), sum(escrituras), escrituras) if escrituras else None)
+
+
+CARGAS = ('carga_masiva', 'busquedas_puntuales', 'listado_por_paciente', 'agregacion_calorias', 'mixta')
+
+
+def _version_codigo() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar(escala_nombre: str, semilla: int, operaciones: int, cargas: List[str],
+             db_path: Optional[str] = None, opciones_repo: Optional[Dict] = None) -> Dict:
+    escala = ESCALAS[escala_nombre]
+    aleatorio = random.Random(semilla)
+    resultados: Dict = {
+        'metadatos': {
+            'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'version': _version_codigo(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'plataforma': platform.platform(),
+            'escala': escala_nombre,
+            'tamanos': escala.como_dict(),
+            'semilla': semilla,
+            'operaciones': operaciones,
+            'opciones_repo': opciones_repo or {},
+        },
+        'cargas': {},
+    }
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = db_path or os.path.join(carpeta, 'benchmark.db')
+        repo = NutricionistaRepo(ruta, **(opciones_repo or {}))
+        try:
+            # La carga masiva siempre corre porque las demás necesitan los datos
+            print(f"Cargando escala '{escala_nombre}' ({escala.planes} planes)...", file=sys.stderr)
+            resultados['cargas']['carga_masiva'], ids = carga_masiva(repo, escala, semilla)
+            for nombre in cargas:
+                if nombre == 'carga_masiva':
+                    continue
+                print(f"Corriendo {nombre}...", file=sys.stderr)
+                resultados['cargas'][nombre] = globals()[nombre](repo, ids, aleatorio, operaciones)
+        finally:
+            repo.close()
+    return resultados
+
+
+def _aplanar(datos: Dict, prefijo: str = '') -> Dict[str, float]:
+    plano = {}
+    for clave, valor in datos.items():
+        nombre = f"{prefijo}{clave}"
+        if isinstance(valor, dict):
+            plano.update(_aplanar(valor, nombre + '.'))
+        elif isinstance(valor, (int, float)) and (clave.startswith('latencia') or clave in ('segundos', 'ops_por_segundo')):
+            plano[nombre] = valor
+    return plano
+
+
+def comparar(anterior: Dict, actual: Dict) -> None:
+    """Muestra la variación de cada métrica respecto de una corrida anterior."""
+    metricas_anteriores = _aplanar(anterior['cargas'])
+    for nombre, valor in _aplanar(actual['cargas']).items():
+        previo = metricas_anteriores.get(nombre)
+        if not previo:
+            continue
+        cambio = (valor - previo) / previo * 100
+        # En ops_por_segundo subir es mejorar; en tiempos y latencias, bajar
+        empeora = cambio < 0 if nombre.endswith('ops_por_segundo') else cambio > 0
+        marca = ' <-- regresión' if empeora and abs(cambio) > 10 else ''
+        print(f"{nombre:<60} {previo:>12.4f} -> {valor:>12.4f} ({cambio:+6.1f}%){marca}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.splitlines()[0])
+    parser.add_argument('--escala', choices=sorted(ESCALAS), default='mini')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--operaciones', type=int, default=2000,
+                        help='operaciones por carga de trabajo (salvo la carga masiva)')
+    parser.add_argument('--cargas', nargs='+', choices=CARGAS, default=list(CARGAS))
+    parser.add_argument('--db', help='ruta de la base a crear (por defecto, un archivo temporal)')
+    parser.add_argument('--pool', type=int, help='usar el pool WAL con este tamaño')
+    parser.add_argument('--cache', type=int, help='activar el cache LRU con este tamaño')
+    parser.add_argument('--perfil', choices=sorted(PERFILES), help='perfil de PRAGMAs del repositorio')
+    parser.add_argument('--salida', help='archivo JSON de resultados (por defecto, stdout)')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior para comparar')
+    args = parser.parse_args(argv)
+
+    if args.db and os.path.exists(args.db):
+        parser.error(f"{args.db} ya existe; los benchmarks necesitan una base nueva")
+
+    opciones_repo = {}
+    if args.pool:
+        opciones_repo['tamano_pool'] = args.pool
+    if args.cache:
+        opciones_repo['tamano_cache'] = args.cache
+    if args.perfil:
+        opciones_repo['perfil'] = args.perfil
+
+    resultados = ejecutar(args.escala, args.semilla, args.operaciones, args.cargas, args.db, opciones_repo)
+
+    texto = json.dumps(resultados, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto + '\n')
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            comparar(json.load(archivo), resultados)
+
+
+if __name__ == '__main__':
+    main()
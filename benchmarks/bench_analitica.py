@@ -0,0 +1,86 @@
+"""Compara el total de calorías por paciente y día calculado de tres formas:
+bucle fila por fila en Python, AnaliticaPlanes (vectorizado si hay NumPy) y GROUP BY en SQL.
+
+Uso:
+    python -m benchmarks.bench_analitica [cantidad_planes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from app.models import Paciente, Alimento, PlanComida
+from app.repository import NutricionistaRepo
+from app.reportes import analitica
+from app.reportes.analitica import AnaliticaPlanes
+
+
+def _poblar(repo: NutricionistaRepo, cantidad: int) -> None:
+    aleatorio = random.Random(42)
+    pacientes = repo.crear_pacientes_bulk(
+        Paciente(nombre=f"Paciente {i}", edad=30, peso_actual=70.0) for i in range(500))
+    alimentos = repo.crear_alimentos_bulk(
+        Alimento(nombre=f"Alimento {i}", calorias=aleatorio.randint(20, 600)) for i in range(200))
+    repo.crear_planes_comida_bulk(
+        PlanComida(paciente_id=aleatorio.choice(pacientes), alimento_id=aleatorio.choice(alimentos),
+                   fecha=f"2023-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1, 28):02d}",
+                   cantidad=aleatorio.choice((0.5, 1.0, 2.0)))
+        for _ in range(cantidad)
+    )
+
+
+def _bucle_python(repo: NutricionistaRepo) -> dict:
+    totales: dict = {}
+    cursor = repo.conn.execute('''
+        SELECT pc.paciente_id, pc.fecha, a.calorias * pc.cantidad
+        FROM plan_comidas pc JOIN alimentos a ON pc.alimento_id = a.id
+    ''')
+    for paciente_id, fecha, calorias in cursor:
+        clave = (paciente_id, fecha)
+        totales[clave] = totales.get(clave, 0.0) + calorias
+    return totales
+
+
+def _analitica(repo: NutricionistaRepo) -> dict:
+    return AnaliticaPlanes.cargar(repo.conn).calorias_por_paciente_dia()
+
+
+def _group_by(repo: NutricionistaRepo) -> dict:
+    cursor = repo.conn.execute('''
+        SELECT pc.paciente_id, pc.fecha, SUM(a.calorias * pc.cantidad)
+        FROM plan_comidas pc JOIN alimentos a ON pc.alimento_id = a.id
+        GROUP BY pc.paciente_id, pc.fecha
+    ''')
+    return {(paciente_id, fecha): total for paciente_id, fecha, total in cursor}
+
+
+def _medir(nombre: str, calcular, repo: NutricionistaRepo) -> None:
+    inicio = time.perf_counter()
+    resultado = calcular(repo)
+    print(f"{nombre:<32} {time.perf_counter() - inicio:8.3f} s  {len(resultado):8} grupos")
+
+
+def main(cantidad: int = 500000) -> None:
+    with tempfile.TemporaryDirectory() as carpeta:
+        repo = NutricionistaRepo(os.path.join(carpeta, "bench.db"))
+        try:
+            _poblar(repo, cantidad)
+            motor = "NumPy" if analitica.np is not None else "array.array"
+            _medir("Bucle fila por fila", _bucle_python, repo)
+            _medir(f"AnaliticaPlanes ({motor})", _analitica, repo)
+            _medir("GROUP BY en SQL", _group_by, repo)
+
+            datos = AnaliticaPlanes.cargar(repo.conn)
+            for nombre, calcular in (("  solo agrupar por día", datos.calorias_por_paciente_dia),
+                                     ("  solo agrupar por semana", datos.calorias_por_paciente_semana),
+                                     ("  top 10 alimentos", datos.top_alimentos)):
+                inicio = time.perf_counter()
+                calcular()
+                print(f"{nombre:<32} {time.perf_counter() - inicio:8.3f} s")
+        finally:
+            repo.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
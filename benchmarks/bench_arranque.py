@@ -0,0 +1,71 @@
+"""Mide el arranque de un proceso corto: importar el repositorio, construirlo y hacer la
+primera consulta, como un cron o una invocación de la línea de comandos.
+
+Cada medición corre en un proceso nuevo, así se paga la importación de los módulos
+(el intérprete ya está levantado cuando empieza el reloj). Se compara abrir la base
+para escribir contra abrirla con solo_lectura=True (URI con mode=ro). El esquema ya
+está al día en todas las corridas, que es el caso de cada arranque salvo el primero.
+
+Uso:
+    python -m benchmarks.bench_arranque [repeticiones]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from app.repository import NutricionistaRepo
+from benchmarks.datos_sinteticos import ESCALAS, poblar
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Corre en el proceso hijo: mide cada etapa por separado y las imprime como JSON
+_SCRIPT = '''
+import json, sys, time
+inicio = time.perf_counter()
+from app.repository import NutricionistaRepo
+importado = time.perf_counter()
+repo = NutricionistaRepo(sys.argv[1], solo_lectura=sys.argv[2] == "1")
+construido = time.perf_counter()
+repo.obtener_paciente(1)
+consultado = time.perf_counter()
+repo.close()
+print(json.dumps({"importar": importado - inicio, "construir": construido - importado,
+                  "primera consulta": consultado - construido, "total": consultado - inicio}))
+'''
+
+
+def _medir(db_path: str, solo_lectura: bool, repeticiones: int) -> dict:
+    etapas = {}
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, '-c', _SCRIPT, db_path, '1' if solo_lectura else '0'],
+            cwd=_RAIZ, capture_output=True, text=True, check=True,
+        ).stdout
+        for etapa, segundos in json.loads(salida).items():
+            etapas.setdefault(etapa, []).append(segundos)
+    return etapas
+
+
+def main(repeticiones: int = 30) -> None:
+    with tempfile.TemporaryDirectory() as carpeta:
+        db_path = os.path.join(carpeta, "bench.db")
+        repo = NutricionistaRepo(db_path)
+        poblar(repo, ESCALAS['mini'])
+        repo.close()
+
+        print(f"Arranque en proceso nuevo, mediana de {repeticiones} corridas (ms):")
+        print(f"  {'':<16}{'importar':>10}{'construir':>11}{'1ª consulta':>13}{'total':>9}")
+        for descripcion, solo_lectura in (("escritura", False), ("solo_lectura", True)):
+            etapas = _medir(db_path, solo_lectura, repeticiones)
+            columnas = ''.join(
+                f"{statistics.median(etapas[etapa]) * 1000:{ancho}.2f}"
+                for etapa, ancho in (('importar', 10), ('construir', 11), ('primera consulta', 13), ('total', 9))
+            )
+            print(f"  {descripcion:<16}{columnas}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,91 @@
+"""Mide la latencia del event loop mientras se atienden consultas concurrentes.
+
+Compara llamar a NutricionistaRepo directamente desde corrutinas (bloquea el loop)
+contra AsyncNutricionistaRepo (las consultas corren en su executor).
+
+Uso:
+    python -m benchmarks.bench_async [cantidad_planes] [tareas_concurrentes]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from app.models import Paciente, Alimento, PlanComida
+from app.repository import NutricionistaRepo, AsyncNutricionistaRepo
+
+
+async def _monitor_latencia(demoras: list, detener: asyncio.Event, intervalo: float = 0.001) -> None:
+    """Registra cuánto se atrasa el loop en despertar respecto del intervalo pedido."""
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(intervalo)
+        demoras.append(time.perf_counter() - inicio - intervalo)
+
+
+async def _carga(llamar, tareas: int) -> float:
+    demoras: list = []
+    detener = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_latencia(demoras, detener))
+    inicio = time.perf_counter()
+    await asyncio.gather(*(llamar(i) for i in range(tareas)))
+    duracion = time.perf_counter() - inicio
+    detener.set()
+    await monitor
+    demoras.sort()
+    if demoras:
+        p99 = demoras[min(len(demoras) - 1, int(len(demoras) * 0.99))]
+        print(f"    total {duracion:7.3f} s  muestras {len(demoras):6}  "
+              f"p99 {p99 * 1000:8.2f} ms  máx {demoras[-1] * 1000:8.2f} ms")
+    else:
+        print(f"    total {duracion:7.3f} s  el loop no pudo correr ni una vez durante la carga")
+    return duracion
+
+
+def _preparar(db_path: str, cantidad: int) -> None:
+    repo = NutricionistaRepo(db_path)
+    try:
+        paciente_id = repo.crear_paciente(Paciente(nombre="Bench", edad=30, peso_actual=70.0))
+        alimento_id = repo.crear_alimento(Alimento(nombre="Manzana", calorias=52))
+        repo.crear_planes_comida_bulk(
+            PlanComida(paciente_id=paciente_id, alimento_id=alimento_id,
+                       fecha="2023-06-15", cantidad=1.0)
+            for _ in range(cantidad)
+        )
+    finally:
+        repo.close()
+
+
+async def main(cantidad: int = 50000, tareas: int = 20) -> None:
+    with tempfile.TemporaryDirectory() as carpeta:
+        db_path = os.path.join(carpeta, "bench.db")
+        _preparar(db_path, cantidad)
+
+        print("NutricionistaRepo llamado desde el loop:")
+        repo = NutricionistaRepo(db_path)
+
+        async def bloqueante(i: int):
+            await asyncio.sleep(0)
+            repo.obtener_paciente(1)
+            return repo.listar_planes_comida(despues_de_id=i * 100, limite=5000)
+
+        await _carga(bloqueante, tareas)
+        calorias = repo.calorias_por_dia(1, "2023-6-1", "2023-6-30")
+        repo.close()
+
+        print("AsyncNutricionistaRepo (4 hilos):")
+        async with AsyncNutricionistaRepo(db_path, hilos=4) as repo_async:
+            async def asincrona(i: int):
+                await repo_async.obtener_paciente(1)
+                return await repo_async.listar_planes_comida(despues_de_id=i * 100, limite=5000)
+
+            await _carga(asincrona, tareas)
+
+            # La fachada tiene que dar lo mismo que el repositorio sincrónico
+            assert await repo_async.calorias_por_dia(1, "2023-6-1", "2023-6-30") == calorias
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*argumentos))
@@ -0,0 +1,71 @@
+"""Compara la búsqueda por nombre con FTS5 contra el LIKE '%x%' que recorre toda la tabla.
+
+Se cargan pacientes y alimentos sintéticos con un segundo apellido inventado (para que
+los nombres sean variados, como en un padrón real) y, para cada término, se mide el
+tiempo de buscar_pacientes/buscar_alimentos contra el SELECT con LIKE equivalente. La
+columna "coinciden" muestra cuántos resultados trae cada camino: LIKE distingue acentos
+("martinez" no encuentra "Martínez") y FTS5 no.
+
+Los términos muy comunes ("martínez" aparece en miles de filas) son el peor caso de
+FTS5, que tiene que puntuar todas las coincidencias para ordenarlas por relevancia,
+mientras que LIKE con LIMIT corta en cuanto junta 20 filas, sin ordenar.
+
+Uso:
+    python -m benchmarks.bench_busqueda [pacientes]
+"""
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+from app.repository import NutricionistaRepo
+from benchmarks.datos_sinteticos import generar_pacientes, generar_alimentos
+
+SILABAS = ("ber", "ta", "ni", "ro", "mal", "que", "so", "ga", "lle", "zu", "vi", "ña", "do", "ran", "chi")
+TERMINOS_PACIENTES = ("martinez", "Martínez", "ana lop", "bertani", "ñado", "quesoga")
+TERMINOS_ALIMENTOS = ("manz", "pollo", "salmon", "zuvi", "rochi")
+
+
+def _con_apellido_inventado(objetos, aleatorio: random.Random):
+    for obj in objetos:
+        apellido = ''.join(aleatorio.choice(SILABAS) for _ in range(aleatorio.randint(2, 4)))
+        obj.nombre = f"{obj.nombre} {apellido.capitalize()}"
+        yield obj
+
+
+def _por_llamada(funcion, llamadas: int) -> float:
+    return min(timeit.repeat(funcion, number=llamadas, repeat=3)) / llamadas * 1e6
+
+
+def _comparar(repo: NutricionistaRepo, tabla: str, buscar, terminos, llamadas: int) -> None:
+    sql_like = f"SELECT * FROM {tabla} WHERE nombre LIKE ? LIMIT 20"
+    for termino in terminos:
+        parametro = (f"%{termino}%",)
+        con_like = len(repo.conn.execute(sql_like, parametro).fetchall())
+        con_fts = len(buscar(termino))
+        print(f"{tabla:<10} {termino!r:<16} "
+              f"{_por_llamada(lambda: repo.conn.execute(sql_like, parametro).fetchall(), llamadas):10.1f} "
+              f"{_por_llamada(lambda: buscar(termino), llamadas):10.1f}"
+              f"   {con_like:>3} / {con_fts:<3}")
+
+
+def main(pacientes: int = 100_000) -> None:
+    aleatorio = random.Random(42)
+    with tempfile.TemporaryDirectory() as carpeta:
+        repo = NutricionistaRepo(os.path.join(carpeta, "bench.db"))
+        repo.crear_pacientes_bulk(_con_apellido_inventado(generar_pacientes(pacientes, aleatorio), aleatorio))
+        repo.crear_alimentos_bulk(
+            _con_apellido_inventado(generar_alimentos(max(1, pacientes // 2), aleatorio), aleatorio)
+        )
+        llamadas = 20
+
+        print(f"{'tabla':<10} {'término':<16} {'LIKE':>10} {'FTS5':>10}   coinciden (LIKE / FTS5)  "
+              f"(µs por búsqueda, hasta 20 resultados)")
+        _comparar(repo, "pacientes", repo.buscar_pacientes, TERMINOS_PACIENTES, llamadas)
+        _comparar(repo, "alimentos", repo.buscar_alimentos, TERMINOS_ALIMENTOS, llamadas)
+        repo.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,96 @@
+"""Compara escrituras sueltas desde muchos hilos: una transacción por llamada (el camino de
+siempre, con el pool para poder compartir el repositorio) contra el escritor agrupado, que
+confirma juntas las operaciones que llegan en la misma ventana.
+
+Cada hilo alterna crear_plan_comida y actualizar_peso_paciente y espera el resultado de
+cada una antes de mandar la siguiente, como un handler de una API. Se mide con WAL y
+synchronous=NORMAL (lo que usa el pool) y con synchronous=FULL (perfil low_memory), donde
+cada COMMIT espera un fsync.
+
+Uso:
+    python -m benchmarks.bench_escritor [hilos] [operaciones_por_hilo]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, List, Optional
+
+from app.models import PlanComida
+from app.repository import NutricionistaRepo
+from benchmarks.datos_sinteticos import ESCALAS, FECHA_FIN, poblar
+
+
+def _correr(hilos: int, por_hilo: int, operacion: Callable[[int, int], object]) -> List[float]:
+    latencias: List[List[float]] = [[] for _ in range(hilos)]
+    barrera = threading.Barrier(hilos)
+
+    def trabajar(numero: int) -> None:
+        propias = latencias[numero]
+        barrera.wait()
+        for i in range(por_hilo):
+            inicio = time.perf_counter()
+            operacion(numero, i)
+            propias.append(time.perf_counter() - inicio)
+
+    trabajadores = [threading.Thread(target=trabajar, args=(numero,)) for numero in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    return [latencia for propias in latencias for latencia in propias]
+
+
+def _mostrar(descripcion: str, latencias: List[float], segundos: float, transacciones: int) -> None:
+    ordenadas = sorted(latencias)
+    p99 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))]
+    print(f"  {descripcion:<26} {len(latencias) / segundos:9.0f} ops/s {transacciones / segundos:8.0f} commits/s"
+          f"   p50 {statistics.median(latencias) * 1000:7.2f} ms   p99 {p99 * 1000:7.2f} ms")
+
+
+def _medir(db_path: str, perfil: Optional[str], hilos: int, por_hilo: int) -> None:
+    fecha = FECHA_FIN.isoformat()
+    repo = NutricionistaRepo(db_path, tamano_pool=4, perfil=perfil)
+
+    def por_llamada(numero: int, i: int) -> None:
+        if i % 2:
+            repo.actualizar_peso_paciente(numero + 1, 60.0 + i % 40)
+        else:
+            repo.crear_plan_comida(PlanComida(paciente_id=numero + 1, alimento_id=i % 50 + 1, fecha=fecha, cantidad=1.0))
+
+    inicio = time.perf_counter()
+    latencias = _correr(hilos, por_hilo, por_llamada)
+    segundos = time.perf_counter() - inicio
+    _mostrar("una transacción por llamada", latencias, segundos, len(latencias))
+
+    with repo.escritor_agrupado() as escritor:
+        def agrupada(numero: int, i: int) -> None:
+            if i % 2:
+                escritor.actualizar_peso_paciente(numero + 1, 60.0 + i % 40).result()
+            else:
+                escritor.crear_plan_comida(PlanComida(paciente_id=numero + 1, alimento_id=i % 50 + 1,
+                                                      fecha=fecha, cantidad=1.0)).result()
+
+        inicio = time.perf_counter()
+        latencias = _correr(hilos, por_hilo, agrupada)
+        segundos = time.perf_counter() - inicio
+    _mostrar("escritor agrupado", latencias, segundos, escritor.transacciones)
+    repo.close()
+
+
+def main(hilos: int = 16, por_hilo: int = 200) -> None:
+    with tempfile.TemporaryDirectory() as carpeta:
+        db_path = os.path.join(carpeta, "bench.db")
+        repo = NutricionistaRepo(db_path)
+        poblar(repo, ESCALAS['mini'])
+        repo.close()
+        print(f"{hilos} hilos, {por_hilo} escrituras cada uno:")
+        for descripcion, perfil in (("WAL, synchronous=NORMAL", None), ("WAL, synchronous=FULL", 'low_memory')):
+            print(descripcion)
+            _medir(db_path, perfil, hilos, por_hilo)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16, int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -0,0 +1,112 @@
+"""Mide la validación de fechas y las consultas de planes por rango de fechas.
+
+Validación: datetime.strptime dentro de try/except (la implementación anterior de
+validar_fecha) contra validar_fecha y validar_fechas, con fechas repetidas como en una
+carga real y un 5% de fechas inválidas.
+
+Rango: planes_por_paciente_y_rango, que recorre solo el tramo del índice
+(paciente_id, fecha), contra traer todos los planes del paciente y filtrar en Python, y
+contra filtrar con date(fecha), que obliga a evaluar la función en cada fila.
+
+Uso:
+    python -m benchmarks.bench_fechas [escala]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app.models import PlanComida
+from app.repository import NutricionistaRepo
+from app.repository.sentencias import SQL_SELECT_PLANES
+from app.utils import validar_fecha, validar_fechas
+from app.utils.helpers import normalizar_fecha
+from benchmarks.datos_sinteticos import ESCALAS, FECHA_FIN, poblar
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _validar_con_strptime(fecha: str) -> bool:
+    try:
+        datetime.strptime(fecha, '%Y-%m-%d')
+        return True
+    except ValueError:
+        return False
+
+
+def _medir(descripcion: str, funcion, repeticiones: int = 3) -> float:
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    print(f"  {descripcion:<44} {mejor * 1000:10.1f} ms")
+    return mejor
+
+
+def bench_validacion(cantidad: int = 1_000_000) -> None:
+    aleatorio = random.Random(42)
+    dias = [(FECHA_FIN - timedelta(days=d)).isoformat() for d in range(730)]
+    invalidas = ['2023-02-30', '2023-13-01', '15/06/2023', '', '2023-06-31']
+    fechas = [aleatorio.choice(invalidas) if aleatorio.random() < 0.05 else aleatorio.choice(dias)
+              for _ in range(cantidad)]
+    print(f"Validación de {cantidad} fechas ({len(set(fechas))} distintas):")
+    _medir("strptime con try/except (antes)", lambda: [_validar_con_strptime(f) for f in fechas])
+    _medir("validar_fecha (regex + cache)", lambda: [validar_fecha(f) for f in fechas])
+    _medir("validar_fechas (lista)", lambda: validar_fechas(fechas))
+    if np is not None:
+        arreglo = np.array(fechas)
+        _medir("validar_fechas (arreglo NumPy)", lambda: validar_fechas(arreglo))
+    normalizar_fecha.cache_clear()
+
+
+def bench_rango(escala: str, rangos_dias=(7, 90)) -> None:
+    with tempfile.TemporaryDirectory() as carpeta:
+        repo = NutricionistaRepo(os.path.join(carpeta, "bench.db"))
+        pacientes, _, _ = poblar(repo, ESCALAS[escala])
+        # El paciente con más planes: la distribución Zipf concentra los planes en los primeros ids
+        paciente_id = pacientes[0]
+        total = len(repo.listar_planes_paciente(paciente_id))
+        hasta = FECHA_FIN.isoformat()
+        cursor = repo.conn.cursor()
+        cursor.row_factory = PlanComida.row_factory
+
+        for dias in rangos_dias:
+            desde = (FECHA_FIN - timedelta(days=dias)).isoformat()
+            en_rango = len(repo.planes_por_paciente_y_rango(paciente_id, desde, hasta))
+            print(f"\nPlanes del paciente {paciente_id} en los últimos {dias} días "
+                  f"({en_rango} de {total}, escala {escala}), 100 consultas:")
+
+            def filtrando_en_python():
+                for _ in range(100):
+                    [p for p in repo.listar_planes_paciente(paciente_id) if desde <= p.fecha <= hasta]
+
+            def con_date():
+                for _ in range(100):
+                    cursor.execute(
+                        SQL_SELECT_PLANES + ' WHERE paciente_id = ? AND date(fecha) BETWEEN ? AND ?',
+                        (paciente_id, desde, hasta)
+                    ).fetchall()
+
+            def con_indice():
+                for _ in range(100):
+                    repo.planes_por_paciente_y_rango(paciente_id, desde, hasta)
+
+            _medir("listar_planes_paciente + filtro en Python", filtrando_en_python)
+            _medir("WHERE date(fecha) BETWEEN ...", con_date)
+            _medir("planes_por_paciente_y_rango", con_indice)
+        repo.close()
+
+
+def main(escala: str = 'mini') -> None:
+    bench_validacion()
+    bench_rango(escala)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else 'mini')
@@ -0,0 +1,81 @@
+"""Mide cómo escalan las escrituras con la cantidad de fragmentos.
+
+Varios hilos hacen crear_plan_comida (una transacción por llamada) sobre pacientes
+repartidos al azar. Con un solo fragmento todos esperan al mismo escritor; con varios,
+cada base tiene el suyo y los COMMIT de bases distintas corren a la vez. Se mide con
+synchronous=FULL (perfil low_memory), donde cada COMMIT espera un fsync, y con NORMAL.
+
+También se mide lo que cuesta el reparto en las lecturas que consultan todos los
+fragmentos (una página de pacientes y una búsqueda por nombre).
+
+Uso:
+    python -m benchmarks.bench_fragmentos [hilos] [operaciones_por_hilo]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from app.models import Alimento, Paciente, PlanComida
+from app.repository import NutricionistaRepoFragmentado
+from benchmarks.datos_sinteticos import FECHA_FIN
+
+
+def _medir_escrituras(repo: NutricionistaRepoFragmentado, pacientes, hilos: int, por_hilo: int) -> float:
+    fecha = FECHA_FIN.isoformat()
+    barrera = threading.Barrier(hilos + 1)
+
+    def trabajar(numero: int) -> None:
+        aleatorio = random.Random(numero)
+        barrera.wait()
+        for i in range(por_hilo):
+            repo.crear_plan_comida(PlanComida(paciente_id=aleatorio.choice(pacientes), alimento_id=i % 50 + 1,
+                                              fecha=fecha, cantidad=1.0))
+
+    trabajadores = [threading.Thread(target=trabajar, args=(numero,)) for numero in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for trabajador in trabajadores:
+        trabajador.join()
+    return hilos * por_hilo / (time.perf_counter() - inicio)
+
+
+def _medir_lectura(funcion, repeticiones: int = 20) -> float:
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def _medir(carpeta: str, fragmentos: int, perfil: Optional[str], hilos: int, por_hilo: int) -> None:
+    rutas = [os.path.join(carpeta, f"{perfil or 'normal'}-{fragmentos}-{numero}.db") for numero in range(fragmentos)]
+    repo = NutricionistaRepoFragmentado(rutas, tamano_pool=2, perfil=perfil)
+    repo.crear_alimentos_bulk(Alimento(nombre=f"Alimento {i}", calorias=100.0 + i) for i in range(50))
+    pacientes = repo.crear_pacientes_bulk(Paciente(nombre=f"Paciente {i}", edad=30, peso_actual=70.0)
+                                          for i in range(1000))
+    por_segundo = _medir_escrituras(repo, pacientes, hilos, por_hilo)
+    pagina = _medir_lectura(lambda: repo.listar_pacientes(despues_de_id=0, limite=100))
+    busqueda = _medir_lectura(lambda: repo.buscar_pacientes("paciente 12"))
+    print(f"  {fragmentos} fragmento(s): {por_segundo:8.0f} escrituras/s"
+          f"   página de 100 pacientes {pagina * 1000:6.2f} ms   búsqueda {busqueda * 1000:6.2f} ms")
+    repo.close()
+
+
+def main(hilos: int = 8, por_hilo: int = 200) -> None:
+    print(f"{hilos} hilos, {por_hilo} escrituras cada uno, {os.cpu_count()} núcleos")
+    with tempfile.TemporaryDirectory() as carpeta:
+        for descripcion, perfil in (("WAL, synchronous=FULL", 'low_memory'), ("WAL, synchronous=NORMAL", None)):
+            print(descripcion)
+            for fragmentos in (1, 2, 4):
+                _medir(carpeta, fragmentos, perfil, hilos, por_hilo)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8, int(sys.argv[2]) if len(sys.argv) > 2 else 200)
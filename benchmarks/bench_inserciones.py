@@ -0,0 +1,50 @@
+"""Compara la inserción fila por fila contra la carga masiva con executemany.
+
+Uso:
+    python -m benchmarks.bench_inserciones [cantidad_planes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from app.models import Paciente, Alimento, PlanComida
+from app.repository import NutricionistaRepo
+
+
+def _generar_planes(cantidad: int, paciente_id: int, alimento_id: int):
+    for i in range(cantidad):
+        yield PlanComida(paciente_id=paciente_id, alimento_id=alimento_id,
+                         fecha=f"2023-06-{i % 28 + 1:02d}", cantidad=1.0)
+
+
+def _medir(nombre: str, cantidad: int, cargar) -> float:
+    with tempfile.TemporaryDirectory() as carpeta:
+        repo = NutricionistaRepo(os.path.join(carpeta, "bench.db"))
+        try:
+            paciente_id = repo.crear_paciente(Paciente(nombre="Bench", edad=30, peso_actual=70.0))
+            alimento_id = repo.crear_alimento(Alimento(nombre="Manzana", calorias=52))
+            inicio = time.perf_counter()
+            cargar(repo, _generar_planes(cantidad, paciente_id, alimento_id))
+            duracion = time.perf_counter() - inicio
+        finally:
+            repo.close()
+    print(f"{nombre:<25} {cantidad:>8} filas  {duracion:8.3f} s  {cantidad / duracion:12.0f} filas/s")
+    return duracion
+
+
+def main(cantidad: int = 10000) -> None:
+    def fila_por_fila(repo, planes):
+        for plan in planes:
+            repo.crear_plan_comida(plan)
+
+    def masivo(repo, planes):
+        repo.crear_planes_comida_bulk(planes)
+
+    antes = _medir("crear_plan_comida", cantidad, fila_por_fila)
+    despues = _medir("crear_planes_comida_bulk", cantidad, masivo)
+    print(f"Aceleración: {antes / despues:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,72 @@
+"""Compara memoria y velocidad al listar planes: sqlite3.Row + dict + modelo contra modelo con __slots__.
+
+Uso:
+    python -m benchmarks.bench_modelos [cantidad_planes]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from app.models import Paciente, Alimento, PlanComida
+from app.repository import NutricionistaRepo
+from app.repository.sentencias import SQL_SELECT_PLANES
+
+
+class PlanComidaConDict:
+    """Representación anterior: instancia común con __dict__, armada campo por campo desde un Row."""
+
+    def __init__(self, id=None, paciente_id=0, alimento_id=0, fecha="", cantidad=0.0):
+        self.id = id
+        self.paciente_id = paciente_id
+        self.alimento_id = alimento_id
+        self.fecha = fecha
+        self.cantidad = cantidad
+
+
+def _con_row(conn: sqlite3.Connection) -> list:
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    return [PlanComidaConDict(**dict(row)) for row in cursor.execute(SQL_SELECT_PLANES)]
+
+
+def _con_slots(conn: sqlite3.Connection) -> list:
+    cursor = conn.cursor()
+    cursor.row_factory = PlanComida.row_factory
+    return cursor.execute(SQL_SELECT_PLANES).fetchall()
+
+
+def _medir(nombre: str, conn: sqlite3.Connection, listar) -> None:
+    inicio = time.perf_counter()
+    listar(conn)
+    duracion = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    resultado = listar(conn)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nombre:<20} {len(resultado):>9} filas  {duracion:8.3f} s  "
+          f"{memoria / len(resultado):8.1f} bytes/fila retenidos")
+
+
+def main(cantidad: int = 200000) -> None:
+    with tempfile.TemporaryDirectory() as carpeta:
+        repo = NutricionistaRepo(os.path.join(carpeta, "bench.db"))
+        try:
+            paciente_id = repo.crear_paciente(Paciente(nombre="Bench", edad=30, peso_actual=70.0))
+            alimento_id = repo.crear_alimento(Alimento(nombre="Manzana", calorias=52))
+            repo.crear_planes_comida_bulk(
+                PlanComida(paciente_id=paciente_id, alimento_id=alimento_id,
+                           fecha="2023-06-15", cantidad=float(i % 5))
+                for i in range(cantidad)
+            )
+            _medir("Row + dict + modelo", repo.conn, _con_row)
+            _medir("__slots__ + fábrica", repo.conn, _con_slots)
+        finally:
+            repo.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
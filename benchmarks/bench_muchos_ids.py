@@ -0,0 +1,69 @@
+"""Mide el costo de armar un reporte de planes con su paciente y su alimento.
+
+- N+1: se listan los planes y se pide obtener_paciente y obtener_alimento por cada uno.
+- Por lotes: los mismos planes, pero pacientes y alimentos se piden de una vez con
+  obtener_pacientes y obtener_alimentos.
+- planes_con_detalle: una sola consulta con JOIN que devuelve todo junto.
+
+También se mide obtener_planes_comida contra un obtener_plan_comida por id.
+
+Uso:
+    python -m benchmarks.bench_muchos_ids [escala] [pacientes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from app.repository import NutricionistaRepo
+from benchmarks.datos_sinteticos import ESCALAS, FECHA_FIN, muestra, poblar
+
+
+def _medir(descripcion: str, funcion, repeticiones: int = 5) -> float:
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    print(f"  {descripcion:<40} {mejor * 1000:9.2f} ms")
+    return mejor
+
+
+def main(escala: str = 'chica', cantidad_pacientes: int = 100) -> None:
+    aleatorio = random.Random(3)
+    hasta = FECHA_FIN.isoformat()
+    desde = (FECHA_FIN - timedelta(days=90)).isoformat()
+    with tempfile.TemporaryDirectory() as carpeta:
+        repo = NutricionistaRepo(os.path.join(carpeta, "bench.db"))
+        pacientes, _, planes = poblar(repo, ESCALAS[escala])
+        elegidos = muestra(pacientes, cantidad_pacientes, aleatorio)
+        total = len(repo.planes_con_detalle(elegidos, desde, hasta))
+        print(f"Escala {escala}: {cantidad_pacientes} pacientes, {total} planes entre {desde} y {hasta}")
+
+        def n_mas_1():
+            for paciente_id in elegidos:
+                for plan in repo.planes_por_paciente_y_rango(paciente_id, desde, hasta):
+                    repo.obtener_paciente(plan.paciente_id)
+                    repo.obtener_alimento(plan.alimento_id)
+
+        def por_lotes():
+            lista = [plan for paciente_id in elegidos
+                     for plan in repo.planes_por_paciente_y_rango(paciente_id, desde, hasta)]
+            repo.obtener_pacientes(plan.paciente_id for plan in lista)
+            repo.obtener_alimentos(plan.alimento_id for plan in lista)
+
+        _medir("N+1 (obtener_paciente/alimento por plan)", n_mas_1)
+        _medir("obtener_pacientes + obtener_alimentos", por_lotes)
+        _medir("planes_con_detalle", lambda: repo.planes_con_detalle(elegidos, desde, hasta))
+
+        ids = muestra(planes, 5000, aleatorio)
+        print(f"{len(ids)} planes por id:")
+        _medir("obtener_plan_comida por id", lambda: [repo.obtener_plan_comida(plan_id) for plan_id in ids])
+        _medir("obtener_planes_comida", lambda: repo.obtener_planes_comida(ids))
+        repo.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else 'chica', int(sys.argv[2]) if len(sys.argv) > 2 else 100)
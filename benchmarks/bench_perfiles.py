@@ -0,0 +1,58 @@
+"""Compara los perfiles de PRAGMAs (bulk_load, read_heavy, low_memory) contra los valores
+por defecto de SQLite sobre las cargas de trabajo de la suite.
+
+Cada perfil corre `python -m benchmarks --perfil ...` en un proceso aparte, así la
+memoria máxima (RSS) que se informa es la de ese perfil y no se mezcla con la de los otros.
+
+Uso:
+    python -m benchmarks.bench_perfiles [escala] [operaciones]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, Optional, Tuple
+
+from app.repository.perfiles import PERFILES
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _correr(perfil: Optional[str], escala: str, operaciones: int, carpeta: str) -> Tuple[Dict, float]:
+    """Devuelve los resultados de la suite y la memoria máxima del proceso en MiB."""
+    salida = os.path.join(carpeta, f"{perfil or 'defecto'}.json")
+    comando = [sys.executable, '-m', 'benchmarks', '--escala', escala, '--operaciones', str(operaciones),
+               '--salida', salida]
+    if perfil:
+        comando += ['--perfil', perfil]
+    proceso = subprocess.Popen(comando, cwd=_RAIZ, stderr=subprocess.DEVNULL)
+    _, estado, uso = os.wait4(proceso.pid, 0)
+    if os.waitstatus_to_exitcode(estado) != 0:
+        raise RuntimeError(f"falló la corrida con perfil {perfil!r}")
+    with open(salida, encoding='utf-8') as archivo:
+        resultados = json.load(archivo)
+    # En Linux ru_maxrss está en KiB
+    return resultados, uso.ru_maxrss / 1024
+
+
+def main(escala: str = 'chica', operaciones: int = 2000) -> None:
+    columnas = (
+        ('carga (s)', lambda c: c['carga_masiva']['segundos']),
+        ('obtener p50', lambda c: c['busquedas_puntuales']['obtener_plan_comida']['latencia_p50_ms']),
+        ('listado p50', lambda c: c['listado_por_paciente']['latencia_p50_ms']),
+        ('calorías p50', lambda c: c['agregacion_calorias']['calorias_por_dia']['latencia_p50_ms']),
+        ('mixta ops/s', lambda c: c['mixta']['ops_por_segundo']),
+    )
+    print(f"Escala {escala}, {operaciones} operaciones por carga (latencias en ms):")
+    print(f"  {'perfil':<12}" + ''.join(f"{nombre:>14}" for nombre, _ in columnas) + f"{'RSS máx (MiB)':>15}")
+    with tempfile.TemporaryDirectory() as carpeta:
+        for perfil in (None, *PERFILES):
+            resultados, rss = _correr(perfil, escala, operaciones, carpeta)
+            cargas = resultados['cargas']
+            valores = ''.join(f"{extraer(cargas):>14.3f}" for _, extraer in columnas)
+            print(f"  {perfil or 'por defecto':<12}{valores}{rss:>15.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else 'chica', int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
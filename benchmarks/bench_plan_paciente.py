@@ -0,0 +1,109 @@
+"""Latencia de plan_del_paciente (tabla materializada) contra el JOIN de tres tablas.
+
+- Caliente: se consulta repetidamente el mismo grupo de pacientes con la conexión
+  abierta, como un tablero que se refresca; las páginas ya están en el cache de SQLite.
+  Se compara SQL contra SQL (JOIN contra planes_paciente_detalle) y, aparte, el método
+  del repositorio con y sin el cache en memoria (tamano_cache).
+- Frío: cada consulta usa una conexión nueva y un paciente que no se leyó antes, así
+  que SQLite arranca con el cache de páginas vacío (el del sistema operativo sigue
+  caliente; no se puede vaciar sin privilegios).
+
+También se mide cuánto encarecen los triggers de la tabla materializada la carga
+masiva de planes.
+
+Uso:
+    python -m benchmarks.bench_plan_paciente [escala]
+"""
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+from app.repository import NutricionistaRepo
+from app.repository.sentencias import SQL_PLAN_DEL_PACIENTE, SQL_PLANES_DETALLE
+from benchmarks.datos_sinteticos import ESCALAS, FECHA_FIN, generar_planes, poblar
+
+SQL_JOIN_PACIENTE_FECHA = SQL_PLANES_DETALLE + ' WHERE pc.paciente_id = ? AND pc.fecha = ? ORDER BY pc.id'
+
+
+def _latencias(consulta: Callable[[int], object], pacientes: List[int]) -> List[float]:
+    latencias = []
+    for paciente_id in pacientes:
+        inicio = time.perf_counter()
+        consulta(paciente_id)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+def _mostrar(descripcion: str, latencias: List[float]) -> None:
+    ordenadas = sorted(latencias)
+    p99 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))]
+    print(f"  {descripcion:<34} p50 {statistics.median(latencias) * 1e6:8.1f} µs   p99 {p99 * 1e6:8.1f} µs")
+
+
+def main(escala: str = 'chica') -> None:
+    fecha = FECHA_FIN.isoformat()
+    aleatorio = random.Random(7)
+    with tempfile.TemporaryDirectory() as carpeta:
+        db_path = os.path.join(carpeta, "bench.db")
+        repo = NutricionistaRepo(db_path)
+        pacientes, alimentos, _ = poblar(repo, ESCALAS[escala])
+
+        # Pacientes con plan en la fecha consultada, como los que abre el tablero
+        con_plan = [fila[0] for fila in repo.conn.execute(
+            'SELECT DISTINCT paciente_id FROM plan_comidas WHERE fecha = ?', (fecha,))]
+        aleatorio.shuffle(con_plan)
+        calientes = con_plan[:20] * 100
+        frios = con_plan[20:220]
+        items = statistics.mean(len(repo.plan_del_paciente(p, fecha)) for p in con_plan[:20])
+        print(f"Escala {escala}: {len(con_plan)} pacientes con plan el {fecha}, "
+              f"{items:.1f} ítems en promedio")
+
+        print("Caliente (20 pacientes, 100 veces cada uno):")
+        _mostrar("SQL: JOIN de tres tablas", _latencias(
+            lambda p: repo.conn.execute(SQL_JOIN_PACIENTE_FECHA, (p, fecha)).fetchall(), calientes))
+        _mostrar("SQL: tabla materializada", _latencias(
+            lambda p: repo.conn.execute(SQL_PLAN_DEL_PACIENTE, (p, fecha)).fetchall(), calientes))
+        _mostrar("plan_del_paciente sin cache", _latencias(lambda p: repo.plan_del_paciente(p, fecha), calientes))
+        con_cache = NutricionistaRepo(db_path, tamano_cache=1000)
+        _mostrar("plan_del_paciente con cache", _latencias(lambda p: con_cache.plan_del_paciente(p, fecha), calientes))
+        con_cache.close()
+
+        print(f"Frío (conexión nueva por consulta, {len(frios) // 2} pacientes por variante):")
+
+        def join_frio(paciente_id: int):
+            conn = sqlite3.connect(db_path)
+            conn.execute(SQL_JOIN_PACIENTE_FECHA, (paciente_id, fecha)).fetchall()
+            conn.close()
+
+        def materializado_frio(paciente_id: int):
+            conn = sqlite3.connect(db_path)
+            conn.execute(SQL_PLAN_DEL_PACIENTE, (paciente_id, fecha)).fetchall()
+            conn.close()
+
+        # La apertura de la conexión se mide en las dos variantes; lo que cambia es la consulta
+        _mostrar("SQL: JOIN de tres tablas", _latencias(join_frio, frios[::2]))
+        _mostrar("SQL: tabla materializada", _latencias(materializado_frio, frios[1::2]))
+
+        print("Costo en escritura (crear_planes_comida_bulk de 50.000 planes):")
+        planes = list(generar_planes(50_000, pacientes, alimentos, aleatorio))
+        inicio = time.perf_counter()
+        repo.crear_planes_comida_bulk(planes)
+        con_triggers = time.perf_counter() - inicio
+        for nombre in ('insert', 'update', 'delete'):
+            repo.conn.execute(f'DROP TRIGGER trg_plan_comidas_{nombre}_detalle')
+        for plan in planes:
+            plan.id = None
+        inicio = time.perf_counter()
+        repo.crear_planes_comida_bulk(planes)
+        sin_triggers = time.perf_counter() - inicio
+        print(f"  sin tabla materializada {sin_triggers:.2f} s, con tabla materializada {con_triggers:.2f} s")
+        repo.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else 'chica')
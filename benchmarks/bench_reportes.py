@@ -0,0 +1,61 @@
+"""Mide cómo escala el resumen mensual de todos los pacientes con la cantidad de procesos.
+
+Como referencia se mide también el camino de siempre: un paciente a la vez sobre un
+único NutricionistaRepo (calorias_por_dia y planes_por_paciente_y_rango por paciente).
+Después se corre generar_resumenes con 1 (en el mismo proceso), 2, 4, ... procesos hasta
+el máximo pedido. Con más procesos que núcleos solo se ve el costo de repartir el trabajo.
+
+Uso:
+    python -m benchmarks.bench_reportes [escala] [max_procesos]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from app.repository import NutricionistaRepo
+from app.reportes import generar_resumenes
+from benchmarks.datos_sinteticos import ESCALAS, FECHA_FIN, poblar
+
+
+def _medir(funcion, repeticiones: int = 3) -> float:
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main(escala: str = 'chica', max_procesos: int = 0) -> None:
+    max_procesos = max_procesos or os.cpu_count() or 1
+    desde = FECHA_FIN.replace(day=1).isoformat()
+    hasta = FECHA_FIN.isoformat()
+    with tempfile.TemporaryDirectory() as carpeta:
+        db_path = os.path.join(carpeta, "bench.db")
+        repo = NutricionistaRepo(db_path)
+        pacientes, _, _ = poblar(repo, ESCALAS[escala])
+
+        def por_paciente():
+            for paciente_id in pacientes:
+                repo.calorias_por_dia(paciente_id, desde, hasta)
+                repo.planes_por_paciente_y_rango(paciente_id, desde, hasta)
+
+        print(f"Escala {escala}: {len(pacientes)} pacientes, mes {desde} a {hasta}, "
+              f"{os.cpu_count()} núcleos")
+        referencia = _medir(por_paciente)
+        print(f"  {'un paciente a la vez (NutricionistaRepo)':<42} {referencia * 1000:9.1f} ms")
+        repo.close()
+
+        procesos = 1
+        base = None
+        while procesos <= max_procesos:
+            segundos = _medir(lambda: generar_resumenes(db_path, desde, hasta, trabajadores=procesos))
+            base = base or segundos
+            print(f"  {f'generar_resumenes, {procesos} proceso(s)':<42} {segundos * 1000:9.1f} ms"
+                  f"   aceleración x{base / segundos:.2f}")
+            procesos *= 2
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else 'chica', int(sys.argv[2]) if len(sys.argv) > 2 else 0)
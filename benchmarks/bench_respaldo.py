@@ -0,0 +1,99 @@
+"""Mide la latencia de las escrituras mientras se respalda la base en línea.
+
+Un hilo hace crear_plan_comida en un repositorio con pool (como un servicio que atiende
+pedidos) y se miden sus latencias:
+
+- con el respaldo copiando toda la base en un solo paso (la escritura espera la copia);
+- con respaldar por pasos, con los valores por defecto y con pasos más chicos;
+- sin respaldo, durante el mismo tiempo que tarda el respaldo por pasos.
+
+Además de las latencias se muestra el paso más largo, que es lo máximo que una escritura
+espera por el lock; el resto de la diferencia es competencia por el disco.
+
+Para acercarse a una base de varios GB se puede usar la escala grande (10 millones de planes).
+
+Uso:
+    python -m benchmarks.bench_respaldo [escala]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, List
+
+from app.models import PlanComida
+from app.repository import NutricionistaRepo
+from app.repository.respaldo import PAGINAS_POR_PASO_POR_DEFECTO, PAUSA_POR_DEFECTO
+from benchmarks.datos_sinteticos import ESCALAS, FECHA_FIN, poblar
+
+
+def _con_escrituras(repo: NutricionistaRepo, tarea: Callable[[], None]) -> List[float]:
+    """Corre tarea mientras otro hilo escribe planes; devuelve las latencias de las escrituras."""
+    latencias: List[float] = []
+    terminar = threading.Event()
+    fecha = FECHA_FIN.isoformat()
+
+    def escribir() -> None:
+        i = 0
+        while not terminar.is_set():
+            inicio = time.perf_counter()
+            repo.crear_plan_comida(PlanComida(paciente_id=i % 100 + 1, alimento_id=i % 50 + 1,
+                                              fecha=fecha, cantidad=1.0))
+            latencias.append(time.perf_counter() - inicio)
+            i += 1
+            # Un pedido por milisegundo, más o menos
+            time.sleep(0.001)
+
+    escritor = threading.Thread(target=escribir)
+    escritor.start()
+    try:
+        tarea()
+    finally:
+        terminar.set()
+        escritor.join()
+    return latencias
+
+
+def _mostrar(descripcion: str, latencias: List[float], segundos: float, paso_maximo: float = 0.0) -> None:
+    ordenadas = sorted(latencias)
+    p99 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))]
+    print(f"  {descripcion:<34} {segundos:7.2f} s {len(latencias):7d} escrituras"
+          f"   p50 {statistics.median(latencias) * 1000:6.2f} ms   p99 {p99 * 1000:7.2f} ms"
+          f"   máx {ordenadas[-1] * 1000:8.2f} ms   paso más largo {paso_maximo * 1000:7.2f} ms")
+
+
+def main(escala: str = 'chica') -> None:
+    with tempfile.TemporaryDirectory() as carpeta:
+        db_path = os.path.join(carpeta, "bench.db")
+        repo = NutricionistaRepo(db_path)
+        poblar(repo, ESCALAS[escala])
+        repo.close()
+        repo = NutricionistaRepo(db_path, tamano_pool=2)
+        paginas = repo.conn.execute('PRAGMA page_count').fetchone()[0]
+        tamano = paginas * repo.conn.execute('PRAGMA page_size').fetchone()[0]
+        print(f"Escala {escala}: {tamano / 2 ** 20:.0f} MiB ({paginas} páginas)")
+        destino = os.path.join(carpeta, "respaldo.db")
+
+        variantes = (
+            ("un solo paso", paginas + 1, 0.0),
+            (f"{PAGINAS_POR_PASO_POR_DEFECTO} páginas, pausa {PAUSA_POR_DEFECTO * 1000:g} ms",
+             PAGINAS_POR_PASO_POR_DEFECTO, PAUSA_POR_DEFECTO),
+            (f"128 páginas, pausa {PAUSA_POR_DEFECTO * 1000:g} ms", 128, PAUSA_POR_DEFECTO),
+        )
+        duracion = None
+        for descripcion, por_paso, pausa in variantes:
+            resultado = {}
+            latencias = _con_escrituras(repo, lambda: resultado.update(repo.respaldar(destino, por_paso, pausa)))
+            if por_paso == PAGINAS_POR_PASO_POR_DEFECTO:
+                duracion = resultado['segundos']
+            _mostrar(descripcion, latencias, resultado['segundos'], resultado['paso_maximo'])
+
+        latencias = _con_escrituras(repo, lambda: time.sleep(duracion))
+        _mostrar("sin respaldo", latencias, duracion)
+        repo.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else 'chica')
@@ -0,0 +1,82 @@
+"""Mide el costo por llamada de obtener_paciente y crear_plan_comida.
+
+"Antes" reproduce la implementación previa (literal SQL armado en cada llamada y un
+cursor nuevo por ejecución); "después" usa el repositorio con el registro de
+sentencias y los cursores reutilizables. También se muestra el efecto de dejar a
+sqlite3 sin cache de sentencias preparadas.
+
+Las variantes se miden por turnos, varias rondas, y se toma el mejor tiempo de cada
+una: medir una variante entera y después la otra deja que el ruido del equipo (otro
+proceso, la frecuencia del procesador) caiga todo de un lado. Las diferencias son de
+décimas de microsegundo, así que sin esto el orden de las columnas llega a invertirse.
+
+Uso:
+    python -m benchmarks.bench_sentencias [llamadas]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import timeit
+
+from app.models import Paciente, Alimento, PlanComida
+from app.repository import NutricionistaRepo
+
+
+def _antes_obtener_paciente(conn: sqlite3.Connection, paciente_id: int):
+    cursor = conn.cursor()
+    cursor.row_factory = Paciente.row_factory
+    return cursor.execute("SELECT id, nombre, edad, peso_actual FROM pacientes" + ' WHERE id = ?',
+                          (paciente_id,)).fetchone()
+
+
+def _antes_crear_plan(conn: sqlite3.Connection, plan: PlanComida) -> int:
+    with conn:
+        cursor = conn.execute(
+            'INSERT INTO plan_comidas (paciente_id, alimento_id, fecha, cantidad) VALUES (?, ?, ?, ?)',
+            (plan.paciente_id, plan.alimento_id, plan.fecha, plan.cantidad)
+        )
+        return cursor.lastrowid
+
+
+def _por_llamada(funciones, llamadas: int, rondas: int = 15) -> list:
+    """Mejor tiempo por llamada (µs) de cada función, midiéndolas por turnos en cada ronda."""
+    mejores = [float('inf')] * len(funciones)
+    for _ in range(rondas):
+        for i, funcion in enumerate(funciones):
+            mejores[i] = min(mejores[i], timeit.timeit(funcion, number=llamadas) / llamadas * 1e6)
+    return mejores
+
+
+def main(llamadas: int = 20000) -> None:
+    with tempfile.TemporaryDirectory() as carpeta:
+        db_path = os.path.join(carpeta, "bench.db")
+        repo = NutricionistaRepo(db_path)
+        paciente_id = repo.crear_paciente(Paciente(nombre="Bench", edad=30, peso_actual=70.0))
+        alimento_id = repo.crear_alimento(Alimento(nombre="Manzana", calorias=52))
+        plan = PlanComida(paciente_id=paciente_id, alimento_id=alimento_id, fecha="2023-06-15", cantidad=1.0)
+
+        # Las escrituras se miden en memoria para que el fsync no tape el costo de la llamada
+        repo.conn.execute('PRAGMA synchronous = OFF')
+        sin_cache = sqlite3.connect(db_path, cached_statements=0)
+        sin_cache.execute('PRAGMA synchronous = OFF')
+
+        print(f"{'operación':<22} {'antes':>10} {'después':>10} {'sin cache':>10}  (µs por llamada)")
+        lecturas = _por_llamada([
+            lambda: _antes_obtener_paciente(repo.conn, paciente_id),
+            lambda: repo.obtener_paciente(paciente_id),
+            lambda: _antes_obtener_paciente(sin_cache, paciente_id),
+        ], max(1, llamadas // 10))
+        print(f"{'obtener_paciente':<22} " + ' '.join(f"{valor:10.2f}" for valor in lecturas))
+        escrituras = _por_llamada([
+            lambda: _antes_crear_plan(repo.conn, plan),
+            lambda: repo.crear_plan_comida(plan),
+            lambda: _antes_crear_plan(sin_cache, plan),
+        ], max(1, llamadas // 100))
+        print(f"{'crear_plan_comida':<22} " + ' '.join(f"{valor:10.2f}" for valor in escrituras))
+        sin_cache.close()
+        repo.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,110 @@
+"""Generador de datos sintéticos y reproducibles para el esquema de nutrición.
+
+Las distribuciones imitan un consultorio real: pocos pacientes concentran muchos
+planes (distribución tipo Zipf) y las fechas se agrupan en los meses recientes.
+"""
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+from app.models import Paciente, Alimento, PlanComida
+from app.repository import NutricionistaRepo
+
+
+class Escala:
+    __slots__ = ('pacientes', 'alimentos', 'planes')
+
+    def __init__(self, pacientes: int, alimentos: int, planes: int):
+        self.pacientes = pacientes
+        self.alimentos = alimentos
+        self.planes = planes
+
+    def como_dict(self) -> Dict[str, int]:
+        return {'pacientes': self.pacientes, 'alimentos': self.alimentos, 'planes': self.planes}
+
+
+ESCALAS: Dict[str, Escala] = {
+    'mini': Escala(pacientes=200, alimentos=100, planes=20_000),
+    'chica': Escala(pacientes=1_000, alimentos=500, planes=200_000),
+    'mediana': Escala(pacientes=10_000, alimentos=5_000, planes=1_000_000),
+    'grande': Escala(pacientes=10_000, alimentos=5_000, planes=10_000_000),
+}
+
+NOMBRES = ("Ana", "Carlos", "Laura", "Jorge", "María", "Lucía", "Martín", "Sofía", "Diego",
+           "Valentina", "Julián", "Camila", "Tomás", "Florencia", "Nicolás", "Agustina")
+APELLIDOS = ("López", "Martínez", "García", "Fernández", "Rodríguez", "González", "Pérez",
+             "Sánchez", "Romero", "Díaz", "Álvarez", "Torres", "Ruiz", "Gómez", "Núñez")
+ALIMENTOS_BASE = (("Manzana", 52), ("Banana", 89), ("Yogur natural", 59), ("Pollo a la plancha", 165),
+                  ("Arroz blanco", 130), ("Lentejas", 116), ("Pan integral", 247), ("Queso fresco", 264),
+                  ("Huevo", 155), ("Avena", 389), ("Palta", 160), ("Salmón", 208), ("Brócoli", 34),
+                  ("Papa hervida", 87), ("Nueces", 654), ("Leche descremada", 35), ("Fideos", 131),
+                  ("Carne magra", 250), ("Tomate", 18), ("Chocolate amargo", 546))
+
+# Días hacia atrás que cubren los planes y media de la distribución exponencial de fechas
+DIAS_HISTORIA = 730
+MEDIA_ANTIGUEDAD = 120
+FECHA_FIN = date(2024, 12, 31)
+
+
+def generar_pacientes(cantidad: int, aleatorio: random.Random) -> Iterator[Paciente]:
+    for _ in range(cantidad):
+        yield Paciente(
+            nombre=f"{aleatorio.choice(NOMBRES)} {aleatorio.choice(APELLIDOS)}",
+            edad=aleatorio.randint(18, 85),
+            peso_actual=round(aleatorio.gauss(72.0, 12.0), 1)
+        )
+
+
+def generar_alimentos(cantidad: int, aleatorio: random.Random) -> Iterator[Alimento]:
+    for i in range(cantidad):
+        nombre, calorias = ALIMENTOS_BASE[i % len(ALIMENTOS_BASE)]
+        variante = i // len(ALIMENTOS_BASE)
+        yield Alimento(
+            nombre=nombre if variante == 0 else f"{nombre} {variante}",
+            calorias=max(5, int(calorias * aleatorio.uniform(0.8, 1.2)))
+        )
+
+
+def pesos_zipf(cantidad: int, exponente: float = 0.8) -> List[float]:
+    """Pesos acumulados para elegir ids con sesgo: el id de rango k pesa 1 / k^exponente."""
+    acumulado = 0.0
+    pesos = []
+    for rango in range(1, cantidad + 1):
+        acumulado += 1.0 / rango ** exponente
+        pesos.append(acumulado)
+    return pesos
+
+
+def generar_planes(cantidad: int, paciente_ids: range, alimento_ids: range,
+                   aleatorio: random.Random, tamano_lote: int = 10_000) -> Iterator[PlanComida]:
+    pesos_pacientes = pesos_zipf(len(paciente_ids))
+    pesos_alimentos = pesos_zipf(len(alimento_ids), exponente=1.0)
+    fechas = [(FECHA_FIN - timedelta(days=d)).isoformat() for d in range(DIAS_HISTORIA)]
+    generados = 0
+    while generados < cantidad:
+        lote = min(tamano_lote, cantidad - generados)
+        pacientes = aleatorio.choices(paciente_ids, cum_weights=pesos_pacientes, k=lote)
+        alimentos = aleatorio.choices(alimento_ids, cum_weights=pesos_alimentos, k=lote)
+        for paciente_id, alimento_id in zip(pacientes, alimentos):
+            antiguedad = int(aleatorio.expovariate(1.0 / MEDIA_ANTIGUEDAD)) % DIAS_HISTORIA
+            yield PlanComida(
+                paciente_id=paciente_id,
+                alimento_id=alimento_id,
+                fecha=fechas[antiguedad],
+                cantidad=aleatorio.choice((0.5, 1.0, 1.0, 1.5, 2.0, 3.0))
+            )
+        generados += lote
+
+
+def poblar(repo: NutricionistaRepo, escala: Escala, semilla: int = 42) -> Tuple[range, range, range]:
+    """Carga la escala completa con las APIs masivas y devuelve los rangos de ids creados."""
+    aleatorio = random.Random(semilla)
+    pacientes = repo.crear_pacientes_bulk(generar_pacientes(escala.pacientes, aleatorio))
+    alimentos = repo.crear_alimentos_bulk(generar_alimentos(escala.alimentos, aleatorio))
+    planes = repo.crear_planes_comida_bulk(
+        generar_planes(escala.planes, pacientes, alimentos, aleatorio), tamano_lote=5_000)
+    return pacientes, alimentos, planes
+
+
+def muestra(ids: range, cantidad: int, aleatorio: random.Random) -> List[int]:
+    return [aleatorio.choice(ids) for _ in range(cantidad)]
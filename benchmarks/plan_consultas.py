@@ -0,0 +1,64 @@
+"""Verifica con EXPLAIN QUERY PLAN que las consultas frecuentes usan los índices de plan_comidas.
+
+Uso:
+    python -m benchmarks.plan_consultas
+"""
+import os
+import tempfile
+
+from app.repository import NutricionistaRepo
+from app.repository.migraciones import explicar_consulta
+from app.repository.sentencias import SQL_PLANES_PACIENTE_RANGO, SQL_PLANES_PACIENTES_RANGO
+
+# (descripción, consulta, parámetros, índice que debe aparecer en el plan)
+CONSULTAS_FRECUENTES = [
+    ("Planes de un paciente",
+     'SELECT * FROM plan_comidas WHERE paciente_id = ?',
+     (1,), 'idx_plan_comidas_paciente_fecha'),
+    ("Planes de un paciente en un rango de fechas",
+     'SELECT * FROM plan_comidas WHERE paciente_id = ? AND fecha BETWEEN ? AND ?',
+     (1, '2023-06-01', '2023-06-30'), 'idx_plan_comidas_paciente_fecha'),
+    ("planes_por_paciente_y_rango",
+     SQL_PLANES_PACIENTE_RANGO,
+     (1, '2023-06-01', '2023-06-30'), 'idx_plan_comidas_paciente_fecha'),
+    ("planes_con_detalle (varios pacientes)",
+     SQL_PLANES_PACIENTES_RANGO,
+     ('[1, 2, 3]', '2023-06-01', '2023-06-30'), 'idx_plan_comidas_paciente_fecha'),
+    ("Planes que usan un alimento",
+     'SELECT * FROM plan_comidas WHERE alimento_id = ?',
+     (1,), 'idx_plan_comidas_alimento'),
+    ("Planes de una fecha con detalle",
+     '''SELECT pc.id, p.nombre, a.nombre, a.calorias * pc.cantidad
+        FROM plan_comidas pc
+        JOIN pacientes p ON pc.paciente_id = p.id
+        JOIN alimentos a ON pc.alimento_id = a.id
+        WHERE pc.fecha = ?''',
+     ('2023-06-15',), 'idx_plan_comidas_fecha'),
+]
+
+
+def verificar(repo: NutricionistaRepo) -> bool:
+    todo_ok = True
+    for descripcion, sql, parametros, indice in CONSULTAS_FRECUENTES:
+        plan = explicar_consulta(repo.conn, sql, parametros)
+        usa_indice = any(indice in detalle for detalle in plan)
+        todo_ok = todo_ok and usa_indice
+        print(f"[{'OK' if usa_indice else 'FALLA'}] {descripcion}")
+        for detalle in plan:
+            print(f"       {detalle}")
+    return todo_ok
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as carpeta:
+        repo = NutricionistaRepo(os.path.join(carpeta, "plan.db"))
+        try:
+            ok = verificar(repo)
+        finally:
+            repo.close()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()